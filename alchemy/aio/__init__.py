@@ -0,0 +1,17 @@
+from alchemy.aio.main import (
+    AsyncAlchemy,
+    AsyncAlchemyCore,
+    AsyncAlchemyNFT,
+    AsyncAlchemyTransact,
+    gather,
+)
+from alchemy.aio.provider import AsyncAlchemyProvider
+
+__all__ = [
+    'AsyncAlchemy',
+    'AsyncAlchemyCore',
+    'AsyncAlchemyNFT',
+    'AsyncAlchemyTransact',
+    'AsyncAlchemyProvider',
+    'gather',
+]
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import inspect
+from typing import Any, Awaitable, Callable, List, Optional
+
+from web3 import Web3
+
+from alchemy.aio.provider import AsyncAlchemyProvider
+from alchemy.config import AlchemyConfig
+from alchemy.core import AlchemyCore
+from alchemy.nft import AlchemyNFT
+from alchemy.provider import AlchemyProvider
+from alchemy.recorder import PendingRequest, RequestRecorder, recording
+from alchemy.transact import AlchemyTransact
+from alchemy.types import Network
+
+
+# methods returning iterators that send requests while being iterated
+ITERATOR_PREFIXES = ('iter_', 'stream_', 'crawl_')
+
+
+class AsyncNamespace:
+    """
+    Awaitable view of a synchronous namespace.
+
+    Every method of the wrapped namespace becomes a coroutine function with the
+    same arguments and return value, e.g. `await alchemy.nft.get_nfts_for_owner(owner)`.
+    Properties such as `core.block_number` become awaitables.
+
+    The wrapped method runs with its requests recorded instead of sent: each
+    request it makes is awaited on the non-blocking provider and the method is
+    then replayed with the response, so request building and response parsing
+    are shared with the synchronous client.
+
+    Methods that poll with `time.sleep`, such as `wait_for_transaction_receipt`,
+    still block the event loop. Methods returning lazy iterators, i.e. the
+    `iter_*`, `stream_*` and `crawl_*` methods, fetch pages as they are
+    iterated, which a recorded replay cannot do, so they are not available;
+    use the synchronous client for them.
+    """
+
+    def __init__(self, namespace: Any, provider: AsyncAlchemyProvider) -> None:
+        """Initializes class attributes"""
+        self._namespace = namespace
+        self._provider = provider
+
+    def __getattr__(self, name: str) -> Any:
+        if isinstance(inspect.getattr_static(self._namespace, name, None), property):
+            return self._run(lambda: getattr(self._namespace, name))
+
+        attr = getattr(self._namespace, name)
+        if not callable(attr):
+            return attr
+        if name.startswith(ITERATOR_PREFIXES) or inspect.isgeneratorfunction(attr):
+            raise AttributeError(
+                f'{name} returns a lazy iterator, which AsyncAlchemy does not '
+                'support; use the synchronous Alchemy client instead'
+            )
+
+        @functools.wraps(attr)
+        async def call(*args: Any, **kwargs: Any) -> Any:
+            return await self._run(functools.partial(attr, *args, **kwargs))
+
+        return call
+
+    async def _run(self, func: Callable[[], Any]) -> Any:
+        recorder = RequestRecorder()
+        while True:
+            try:
+                return recording(recorder, func)
+            except PendingRequest as pending:
+                request = pending
+            recorder.record(request, await self._provider.execute(request))
+
+
+class AsyncAlchemyCore(AsyncNamespace):
+    """
+    Awaitable equivalent of `AlchemyCore`, accessed via `alchemy.core`.
+    """
+
+
+class AsyncAlchemyNFT(AsyncNamespace):
+    """
+    Awaitable equivalent of `AlchemyNFT`, accessed via `alchemy.nft`.
+    """
+
+
+class AsyncAlchemyTransact(AsyncNamespace):
+    """
+    Awaitable equivalent of `AlchemyTransact`, accessed via `alchemy.transact`.
+    """
+
+
+class AsyncAlchemy:
+    """
+    The asyncio Alchemy client. Offers the same namespaces as `Alchemy` with
+    awaitable methods, sending requests with a non-blocking HTTP client.
+
+        >>> async with AsyncAlchemy('your_api_key') as alchemy:
+        ...     metadata = await alchemy.core.get_token_metadata(usdt_contract)
+
+    :var config: current config of Alchemy object
+    :var provider: non-blocking provider for making requests to Alchemy API
+    :var core: Namespace contains the core eth json-rpc calls and Alchemy's Enhanced APIs.
+    :var nft: Namespace contains methods for Alchemy's NFT API.
+    :var transact: Namespace contains methods for sending transactions and checking on the state of submitted transactions
+    """
+
+    config: AlchemyConfig
+    provider: AsyncAlchemyProvider
+    core: AsyncAlchemyCore
+    nft: AsyncAlchemyNFT
+    transact: AsyncAlchemyTransact
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        network: Optional[Network] = None,
+        **kwargs: Any,
+    ) -> None:
+        """
+        Initializes class attributes. Accepts the same arguments as `Alchemy`.
+
+        :param api_key: The API key to use for Alchemy
+        :param network: The network to use for Alchemy
+        """
+        self.config = AlchemyConfig(api_key, network, **kwargs)
+        self.provider = AsyncAlchemyProvider(self.config)
+        self._sync_provider = AlchemyProvider(self.config)
+        web3 = Web3(provider=self._sync_provider)
+        self.core = AsyncAlchemyCore(AlchemyCore(web3), self.provider)
+        self.nft = AsyncAlchemyNFT(AlchemyNFT(web3), self.provider)
+        self.transact = AsyncAlchemyTransact(AlchemyTransact(web3), self.provider)
+
+    async def close(self) -> None:
+        """
+        Closes the underlying HTTP session and stops the background threads.
+        """
+        await self.provider.close()
+        self._sync_provider.close()
+
+    async def __aenter__(self) -> AsyncAlchemy:
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
+
+
+async def gather(
+    *aws: Awaitable[Any], limit: Optional[int] = None, return_exceptions: bool = False
+) -> List[Any]:
+    """
+    Like `asyncio.gather`, but runs at most `limit` awaitables at a time.
+
+        >>> results = await gather(
+        ...     *(alchemy.nft.get_nfts_for_owner(owner) for owner in owners), limit=50
+        ... )
+
+    :param aws: awaitables to run.
+    :param limit: The maximum number of awaitables running concurrently.
+        Runs all of them at once if omitted.
+    :param return_exceptions: Whether to return exceptions as results
+        instead of raising the first one.
+    :return: list of results in the order of `aws`
+    """
+    if not limit:
+        return await asyncio.gather(*aws, return_exceptions=return_exceptions)
+
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(aw: Awaitable[Any]) -> Any:
+        async with semaphore:
+            return await aw
+
+    return await asyncio.gather(
+        *(run(aw) for aw in aws), return_exceptions=return_exceptions
+    )
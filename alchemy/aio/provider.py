@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+from web3.types import RPCEndpoint, RPCResponse
+
+from alchemy.__version__ import __version__
+from alchemy.config import AlchemyConfig
+from alchemy.dispatch import parse_params
+from alchemy.exceptions import AlchemyError
+from alchemy.metrics import Measurement, track
+from alchemy.recorder import (
+    PendingRequest,
+    PendingRpcRequest,
+    PendingApiRequest,
+    api_method,
+)
+from alchemy.transport import DEFAULT_POOL_IDLE_TIMEOUT
+from alchemy.types import AlchemyApiType
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    aiohttp = None
+
+
+class AsyncAlchemyProvider:
+    """
+    Non-blocking counterpart of `AlchemyProvider` built on aiohttp. It sends
+    both JSON-RPC and NFT REST requests over one pooled client session.
+
+    :var config: current config of Alchemy object
+    :var url: base connection url
+    """
+
+    def __init__(self, config: AlchemyConfig) -> None:
+        """Initializes class attributes"""
+        if aiohttp is None:
+            raise AlchemyError(
+                'AsyncAlchemy requires aiohttp. '
+                'Install it with `pip install alchemy-sdk[async]`.'
+            )
+        self.config = config
+        self.url = config.get_request_url(AlchemyApiType.BASE)
+        self.request_counter = itertools.count()
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Client session, created on first use inside the running event loop"""
+        if self._session is None or self._session.closed:
+            # only HTTPTransport caps its pool, other transports set no limit
+            transport = self.config.transport
+            pool_block = getattr(transport, 'pool_block', False)
+            connector = aiohttp.TCPConnector(
+                limit=0,
+                limit_per_host=transport.pool_maxsize if pool_block else 0,
+                keepalive_timeout=getattr(
+                    transport, 'pool_idle_timeout', DEFAULT_POOL_IDLE_TIMEOUT
+                ),
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.config.request_timeout),
+            )
+        return self._session
+
+    async def close(self) -> None:
+        """
+        Closes the client session and its pooled connections.
+        """
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def make_request(
+        self,
+        method: Union[RPCEndpoint, str],
+        params: List[Any],
+        method_name: Optional[str] = None,
+        headers: Optional[dict] = None,
+    ) -> RPCResponse:
+        request_data = self.config.codec.dumps(
+            {
+                'jsonrpc': '2.0',
+                'method': method,
+                'params': params or [],
+                'id': next(self.request_counter),
+            }
+        )
+        headers = {
+            **(headers or {}),
+            'Content-Type': 'application/json',
+            'Alchemy-Python-Sdk-Method': method_name,
+            'Alchemy-Python-Sdk-Version': __version__,
+        }
+        with track(self.config.metrics, method_name or method) as measurement:
+            body = await self._route(
+                self.url,
+                lambda url: self._request(
+                    'POST',
+                    url,
+                    url,
+                    (method,),
+                    measurement,
+                    data=request_data,
+                    headers=headers,
+                ),
+            )
+            return self.config.codec.loads(body)
+
+    async def api_request(self, url: str, method_name: str, **options: Any) -> Any:
+        headers = {
+            **options.get('headers', {}),
+            'Alchemy-Python-Sdk-Method': method_name,
+            'Alchemy-Python-Sdk-Version': __version__,
+        }
+        with track(self.config.metrics, method_name) as measurement:
+            body = await self._route(
+                url,
+                lambda endpoint_url: self._request(
+                    options.get('rest_method', 'GET'),
+                    endpoint_url,
+                    endpoint_url.rsplit('/', 1)[0],
+                    (api_method(endpoint_url),),
+                    measurement,
+                    params=encode_query(options.get('params')),
+                    json=options.get('data'),
+                    headers=headers,
+                ),
+            )
+            return self.config.codec.loads(body)
+
+    async def execute(self, request: PendingRequest) -> Any:
+        """
+        Sends a request recorded from a synchronous namespace method.
+
+        :param request: the recorded request.
+        :return: the raw response to replay
+        """
+        if isinstance(request, PendingRpcRequest):
+            return await self.make_request(
+                request.method, request.params, request.method_name, request.headers
+            )
+        if isinstance(request, PendingApiRequest):
+            return await self.api_request(
+                request.url, request.method_name, **request.options
+            )
+        raise AlchemyError(f'Unsupported request: {request!r}')
+
+    async def _route(
+        self, url: str, request: Callable[[str], Awaitable[bytes]]
+    ) -> bytes:
+        try:
+            if self.config.router is None:
+                return await request(url)
+            return await self.config.router.call_async(url, request)
+        except aiohttp.ClientResponseError as err:
+            raise AlchemyError(f'Response: {err.message}') from err
+        except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+            raise AlchemyError(str(err)) from err
+
+    async def _request(
+        self,
+        rest_method: str,
+        url: str,
+        endpoint: str,
+        methods: Tuple[str, ...],
+        measurement: Measurement,
+        **kwargs: Any,
+    ) -> bytes:
+        # requests drops headers set to None, aiohttp refuses them
+        kwargs['headers'] = {
+            key: value for key, value in kwargs['headers'].items() if value is not None
+        }
+        hedger = self.config.hedger
+        if hedger is not None and len(methods) == 1:
+            return await hedger.call_async(
+                methods[0],
+                lambda: self._send(
+                    rest_method, url, endpoint, methods, measurement, **kwargs
+                ),
+            )
+        return await self._send(
+            rest_method, url, endpoint, methods, measurement, **kwargs
+        )
+
+    async def _send(
+        self,
+        rest_method: str,
+        url: str,
+        endpoint: str,
+        methods: Tuple[str, ...],
+        measurement: Measurement,
+        **kwargs: Any,
+    ) -> bytes:
+        limiter = self.config.rate_limiter
+        retry = self.config.retry_policy.start(endpoint)
+        while True:
+            retry.begin()
+            try:
+                if limiter is not None:
+                    delay = limiter.reserve(limiter.cost(methods))
+                    if delay:
+                        await asyncio.sleep(delay)
+                async with self.session.request(rest_method, url, **kwargs) as response:
+                    body = await response.read()
+                measurement.transferred(len(kwargs.get('data') or b''), len(body))
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                delay = retry.failed()
+                if delay is None:
+                    raise
+            except BaseException as err:
+                retry.aborted(err)
+                raise
+            else:
+                if response.status < 400:
+                    retry.succeeded()
+                    return body
+                delay = retry.failed(
+                    response.status, response.headers.get('Retry-After')
+                )
+                if delay is None:
+                    raise aiohttp.ClientResponseError(
+                        response.request_info,
+                        response.history,
+                        status=response.status,
+                        message=str(body),
+                        headers=response.headers,
+                    )
+            await asyncio.sleep(delay)
+            measurement.retried()
+
+
+def encode_query(params: Optional[Dict[str, Any]]) -> List[Tuple[str, str]]:
+    """
+    Encodes query params the same way `requests` does: `None` values are
+    dropped and list values are repeated.
+    """
+    query: List[Tuple[str, str]] = []
+    for key, value in (parse_params(dict(params or {})) or {}).items():
+        values = value if isinstance(value, (list, tuple)) else [value]
+        for item in values:
+            if item is not None:
+                query.append((key, str(item)))
+    return query
@@ -25,6 +25,8 @@ class Alchemy:
     :var core: Namespace contains the core eth json-rpc calls and Alchemy's Enhanced APIs.
     :var nft: Namespace contains methods for Alchemy's NFT API.
     :var transact: Namespace contains methods for sending transactions and checking on the state of submitted transactions
+    :var ws: Namespace contains methods for subscribing to events over WebSocket.
+        The connection is opened by the first subscription.
     :var ens: Web3 quick access to common Ethereum Name Service functions, like getting the address for a name.
     """
 
@@ -217,6 +219,37 @@ class Alchemy:
         :param request_timeout: The timeout after which request should fail
         :param url: The optional hardcoded URL to send requests to instead of
             using the network and api_key.
+        :param pool_connections: The number of per-host connection pools to keep.
+        :param pool_maxsize: The maximum number of keep-alive connections per host.
+        :param pool_block: Whether to cap concurrent connections per host at
+            `pool_maxsize` instead of opening extra, non-pooled connections.
+        :param pool_idle_timeout: Seconds after which the connections to an idle
+            host are closed. `None` keeps them open until the client is closed.
+        :param transport: An existing HTTPTransport or HTTP2Transport to share
+            pooled connections with another client.
+        :param http2: Whether to send requests over multiplexed HTTP/2
+            connections. Requires httpx with HTTP/2 support. Defaults to False.
+        :param max_batch_size: The maximum number of calls per JSON-RPC batch.
+        :param batch_window: Seconds to wait for concurrent calls to send them
+            as one JSON-RPC batch. Disabled by default.
+        :param batch_window_size: The number of queued calls that sends a batch
+            before the window has passed.
+        :param single_flight: Whether identical concurrent requests share one
+            network request. Defaults to True.
+        :param cache: `True` or a ResponseCache to answer repeated calls from
+            memory. Defaults to None (disabled).
+        :param rate_limit: Compute units per second, or a ComputeUnitLimiter,
+            to delay requests before they are throttled. Defaults to None.
+        :param retry_policy: A RetryPolicy replacing the default one built from
+            `max_retries`.
+        :param hedging: `True` or a RequestHedger to re-send slow read calls
+            and use the first response. Defaults to None (disabled).
+        :param endpoints: A list of Endpoint, or an EndpointRouter, to spread
+            requests over several api keys or nodes with automatic failover.
+        :param codec: The JSON codec, `'json'`, `'orjson'` or a JsonCodec.
+            Defaults to orjson when it is installed.
+        :param metrics: `True` or a MetricsRegistry to record latency, retries,
+            errors and payload sizes per method. Defaults to None (disabled).
         """
         self.config = AlchemyConfig(api_key, network, **kwargs)
         self.provider = AlchemyProvider(self.config)
@@ -230,3 +263,15 @@ class Alchemy:
 
     def isConnected(self) -> bool:
         return self.provider.isConnected()
+
+    def close(self) -> None:
+        """
+        Stops the background threads of the client.
+        """
+        self.provider.close()
+
+    def __enter__(self) -> Alchemy:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
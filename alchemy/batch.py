@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Tuple
+
+from web3.types import RPCResponse
+
+from alchemy.dispatch import api_request
+from alchemy.exceptions import AlchemyError
+from alchemy.recorder import (
+    PendingRequest,
+    PendingApiRequest,
+    RequestRecorder,
+    recording,
+)
+
+
+class BatchResult:
+    """
+    Placeholder for the result of a call made inside a batch. The value is
+    available once the batch has been executed.
+    """
+
+    _unset = object()
+
+    def __init__(self) -> None:
+        self._value: Any = self._unset
+        self._error: Optional[BaseException] = None
+
+    @property
+    def done(self) -> bool:
+        """Whether the call has been resolved to a value or an error"""
+        return self._value is not self._unset or self._error is not None
+
+    def result(self) -> Any:
+        """
+        Returns the value of the call.
+
+        :raises AlchemyError: if the batch has not been executed yet or the
+            call failed.
+        """
+        if self._error is not None:
+            raise self._error
+        if self._value is self._unset:
+            raise AlchemyError('Batch has not been executed yet')
+        return self._value
+
+    def exception(self) -> Optional[BaseException]:
+        return self._error
+
+    def _set_result(self, value: Any) -> None:
+        self._value = value
+
+    def _set_error(self, error: BaseException) -> None:
+        self._error = error
+
+
+class _BatchCall:
+    def __init__(self, func: Callable, args: tuple, kwargs: dict) -> None:
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.recorder = RequestRecorder()
+        self.result = BatchResult()
+
+    def run(self) -> Optional[PendingRequest]:
+        try:
+            value = recording(
+                self.recorder, lambda: self.func(*self.args, **self.kwargs)
+            )
+        except PendingRequest as request:
+            return request
+        self.result._set_result(value)
+        return None
+
+
+class Batch:
+    """
+    Collects calls of a namespace and sends them as JSON-RPC batches.
+
+    Any method of the wrapped namespace can be called on the batch, e.g.
+    `b.get_token_metadata(address)`, `b.get_block('latest')` or
+    `b.send('eth_chainId', [])`. Each call returns a BatchResult that is
+    resolved when the batch is executed, which happens automatically when
+    leaving the `with` block:
+
+        >>> with alchemy.core.batch() as b:
+        ...     metadata = b.get_token_metadata(usdt_contract)
+        ...     block = b.get_block('latest')
+        >>> metadata.result().symbol
+        'USDT'
+
+    Calls that need several sequential requests are resolved in several
+    rounds; each round is sent as a single batch.
+    """
+
+    def __init__(self, namespace: Any, max_batch_size: Optional[int] = None) -> None:
+        """Initializes class attributes"""
+        self._namespace = namespace
+        self._provider = namespace.provider
+        self._max_batch_size = max_batch_size
+        self._pending: List[Tuple[_BatchCall, PendingRequest]] = []
+        self._pending_api: List[Tuple[_BatchCall, PendingApiRequest]] = []
+
+    def __enter__(self) -> Batch:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if exc_type is None:
+            self.execute()
+
+    def __getattr__(self, name: str) -> Callable[..., BatchResult]:
+        func = getattr(self._namespace, name)
+        if not callable(func):
+            raise AttributeError(name)
+
+        def call(*args: Any, **kwargs: Any) -> BatchResult:
+            batch_call = _BatchCall(func, args, kwargs)
+            self._enqueue(batch_call, batch_call.run())
+            return batch_call.result
+
+        return call
+
+    def execute(self) -> None:
+        """
+        Sends all collected calls and resolves their results.
+
+        REST calls of the NFT API cannot be batched and are sent one by one.
+        """
+        while self._pending or self._pending_api:
+            pending, self._pending = self._pending, []
+            pending_api, self._pending_api = self._pending_api, []
+            for batch_call, request in pending_api:
+                try:
+                    response = api_request(
+                        request.url,
+                        request.method_name,
+                        request.config,
+                        **request.options,
+                    )
+                except AlchemyError as err:
+                    batch_call.result._set_error(err)
+                    continue
+                self._resume(batch_call, request, response)
+            if not pending:
+                continue
+
+            try:
+                responses = self._provider.make_batch_request(
+                    [(request.method, request.params) for _, request in pending],
+                    max_batch_size=self._max_batch_size,
+                )
+            except AlchemyError as err:
+                for batch_call, _ in pending:
+                    batch_call.result._set_error(err)
+                continue
+            for (batch_call, request), response in zip(pending, responses):
+                self._resume(batch_call, request, response)
+
+    def _resume(
+        self, batch_call: _BatchCall, request: PendingRequest, response: Any
+    ) -> None:
+        batch_call.recorder.record(request, response)
+        try:
+            next_request = batch_call.run()
+        except Exception as err:
+            batch_call.result._set_error(err)
+            return
+        self._enqueue(batch_call, next_request)
+
+    def _enqueue(
+        self, batch_call: _BatchCall, request: Optional[PendingRequest]
+    ) -> None:
+        if isinstance(request, PendingApiRequest):
+            self._pending_api.append((batch_call, request))
+        elif request is not None:
+            self._pending.append((batch_call, request))
+
+
+class BatchDispatcher:
+    """
+    Buffers `make_request` calls coming from many threads and sends them as
+    JSON-RPC batches. A batch is sent once `max_size` calls are queued or
+    `window` seconds after the first queued call, whichever happens first.
+    Each caller blocks until its own response arrives.
+
+    The dispatcher starts a background thread on the first call, which runs
+    until `close` is called.
+
+    :var window: The maximum number of seconds a call waits for other calls.
+    :var max_size: The number of queued calls that triggers an immediate send.
+    :var max_workers: The maximum number of batches in flight at once.
+    """
+
+    def __init__(
+        self, provider: Any, window: float, max_size: int, max_workers: int = 4
+    ) -> None:
+        """Initializes class attributes"""
+        self.provider = provider
+        self.window = window
+        self.max_size = max_size
+        self.max_workers = max_workers
+        self._queue: List[Tuple[str, Any, Future]] = []
+        self._deadline = 0.0
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='alchemy-batch'
+        )
+
+    def submit(self, method: str, params: Any) -> RPCResponse:
+        """
+        Queues a call and blocks until its response is available.
+
+        :raises AlchemyError: if the batch containing the call failed or the
+            dispatcher is closed.
+        """
+        future: Future = Future()
+        with self._condition:
+            if self._closed:
+                raise AlchemyError('The batch dispatcher is closed')
+            if not self._queue:
+                self._deadline = time.monotonic() + self.window
+            self._queue.append((method, params, future))
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name='alchemy-batch-dispatcher', daemon=True
+                )
+                self._thread.start()
+            self._condition.notify()
+        return future.result()
+
+    def close(self) -> None:
+        """
+        Sends the queued calls and stops the background thread and the
+        workers sending batches.
+        """
+        with self._condition:
+            self._closed = True
+            thread = self._thread
+            self._condition.notify()
+        if thread is not None:
+            thread.join()
+        self._executor.shutdown(wait=True)
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._queue and not self._closed:
+                    self._condition.wait()
+                if not self._queue:
+                    return
+                while len(self._queue) < self.max_size and not self._closed:
+                    remaining = self._deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                calls = self._queue[: self.max_size]
+                del self._queue[: self.max_size]
+                if self._queue:
+                    self._deadline = time.monotonic() + self.window
+            self._executor.submit(self._send, calls)
+
+    def _send(self, calls: List[Tuple[str, Any, Future]]) -> None:
+        try:
+            responses = self.provider.make_batch_request(
+                [(method, params) for method, params, _ in calls],
+                max_batch_size=self.max_size,
+            )
+        except BaseException as err:
+            for _, _, future in calls:
+                future.set_exception(err)
+            return
+        for (_, _, future), response in zip(calls, responses):
+            future.set_result(response)
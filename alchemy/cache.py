@@ -0,0 +1,484 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from alchemy.exceptions import AlchemyError
+from alchemy.recorder import api_method, api_request_key, request_key
+
+FOREVER = math.inf
+DEFAULT_MAX_ENTRIES = 10_000
+DEFAULT_LATEST_TTL = 1.0
+DEFAULT_FINALITY_DEPTH = 64
+DEFAULT_DISK_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_DISK_MIN_TTL = 3600.0
+
+# method -> TTL in seconds, used for calls that are not pinned to a block
+DEFAULT_TTLS: Dict[str, float] = {
+    'eth_chainId': FOREVER,
+    'net_version': FOREVER,
+    'alchemy_getTokenMetadata': 3600.0,
+    'getContractMetadata': 3600.0,
+    'getContractMetadataBatch': 3600.0,
+    'getNFTMetadata': 300.0,
+    'getNFTMetadataBatch': 300.0,
+}
+
+# method -> position of the block hash param
+BLOCK_HASH_PARAMS = {
+    'eth_getBlockByHash': 0,
+    'eth_getBlockTransactionCountByHash': 0,
+    'eth_getTransactionByBlockHashAndIndex': 0,
+    'eth_getUncleByBlockHashAndIndex': 0,
+    'eth_getUncleCountByBlockHash': 0,
+}
+
+# method -> position of the block number, tag or EIP-1898 block param
+BLOCK_PARAMS = {
+    'eth_getBlockByNumber': 0,
+    'eth_getBlockTransactionCountByNumber': 0,
+    'eth_getTransactionByBlockNumberAndIndex': 0,
+    'eth_getUncleByBlockNumberAndIndex': 0,
+    'eth_getUncleCountByBlockNumber': 0,
+    'eth_getBalance': 1,
+    'eth_getCode': 1,
+    'eth_getTransactionCount': 1,
+    'eth_call': 1,
+    'eth_getStorageAt': 2,
+}
+
+# methods taking a filter object with `blockHash` or `blockNumber`/`toBlock`
+FILTER_METHODS = {'eth_getLogs', 'alchemy_getTransactionReceipts'}
+
+# methods whose result is immutable once the transaction is final
+TRANSACTION_METHODS = {'eth_getTransactionByHash', 'eth_getTransactionReceipt'}
+
+
+class LRUCache:
+    """
+    Thread-safe in-memory store of raw response bodies, evicting the least
+    recently used entry once `max_entries` is reached.
+
+    Any object with the same `get`, `set` and `clear` methods can be passed
+    to ResponseCache as its store.
+
+    :var max_entries: The maximum number of entries kept.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        """Initializes class attributes"""
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Hashable, Tuple[bytes, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: bytes, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class DiskCache:
+    """
+    Persistent store of raw response bodies in a SQLite database, used as a
+    second tier behind the in-memory store of a ResponseCache so that
+    immutable data survives process restarts.
+
+    The database runs in WAL mode, so several processes on one host can read
+    and write the same file concurrently. Once the file holds more than
+    `max_bytes` of bodies, the least recently read entries are evicted.
+    Entries are keyed by a hash of the request, so the API key contained in
+    the request url is not written to disk.
+
+    :var path: The path of the SQLite database file.
+    :var max_bytes: The maximum total size of stored bodies.
+    :var min_ttl: Only responses cached for at least this number of seconds
+        are written to disk.
+    """
+
+    _check_every = 100
+    _touch_interval = 60.0
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = DEFAULT_DISK_MAX_BYTES,
+        min_ttl: float = DEFAULT_DISK_MIN_TTL,
+    ) -> None:
+        """Initializes class attributes"""
+        self.path = os.path.expanduser(path)
+        self.max_bytes = max_bytes
+        self.min_ttl = min_ttl
+        self._local = threading.local()
+        self._writes = 0
+        self._lock = threading.Lock()
+        with self._connection() as connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS entries ('
+                'key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, '
+                'expires_at REAL, accessed_at REAL NOT NULL)'
+            )
+            connection.execute(
+                'CREATE INDEX IF NOT EXISTS entries_accessed_at '
+                'ON entries (accessed_at)'
+            )
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        now = time.time()
+        connection = self._connection()
+        row = connection.execute(
+            'SELECT value, expires_at, accessed_at FROM entries WHERE key = ?',
+            (self._hash(key),),
+        ).fetchone()
+        if row is None:
+            return None
+        value, expires_at, accessed_at = row
+        if expires_at is not None and expires_at <= now:
+            return None
+        if now - accessed_at > self._touch_interval:
+            with connection:
+                connection.execute(
+                    'UPDATE entries SET accessed_at = ? WHERE key = ?',
+                    (now, self._hash(key)),
+                )
+        return bytes(value)
+
+    def set(self, key: Hashable, value: bytes, ttl: float) -> None:
+        now = time.time()
+        expires_at = None if ttl == FOREVER else now + ttl
+        connection = self._connection()
+        with connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)',
+                (self._hash(key), value, len(value), expires_at, now),
+            )
+        with self._lock:
+            self._writes += 1
+            check = self._writes % self._check_every == 1
+        if check:
+            self.evict()
+
+    def evict(self) -> None:
+        """
+        Drops expired entries, then the least recently read ones until the
+        stored bodies fit in 90% of `max_bytes`.
+        """
+        connection = self._connection()
+        with connection:
+            connection.execute(
+                'DELETE FROM entries WHERE expires_at <= ?', (time.time(),)
+            )
+            (size,) = connection.execute(
+                'SELECT COALESCE(SUM(size), 0) FROM entries'
+            ).fetchone()
+            if size <= self.max_bytes:
+                return
+            target = self.max_bytes * 0.9
+            rows = connection.execute(
+                'SELECT key, size FROM entries ORDER BY accessed_at'
+            )
+            evicted = []
+            for key, entry_size in rows:
+                if size <= target:
+                    break
+                evicted.append((key,))
+                size -= entry_size
+            connection.executemany('DELETE FROM entries WHERE key = ?', evicted)
+
+    def clear(self) -> None:
+        with self._connection() as connection:
+            connection.execute('DELETE FROM entries')
+
+    def close(self) -> None:
+        """
+        Closes the database connection of the calling thread.
+        """
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+        return connection
+
+    @staticmethod
+    def _hash(key: Hashable) -> str:
+        encoded = json.dumps(key, separators=(',', ':'), default=str).encode()
+        return hashlib.sha256(encoded).hexdigest()
+
+
+class ResponseCache:
+    """
+    Caches responses of JSON-RPC and NFT REST calls according to how long
+    their result can be trusted:
+
+    - calls pinned to a block hash, to a finalized block number or to a
+      finalized transaction are cached forever,
+    - calls on `latest`, `pending` or a recent block are cached for
+      `latest_ttl` seconds (`0` bypasses the cache),
+    - methods listed in `ttls` are cached for the given number of seconds,
+    - any other call, and any error response, is not cached.
+
+    A block is considered final once it is `finality_depth` blocks behind the
+    head, which is learned from `eth_blockNumber` and `latest` block
+    responses passing through the cache. Until one is seen, the head is
+    resolved with `resolve_head` the first time finality must be decided,
+    so that e.g. receipts looked up by hash in a fresh process are cached.
+
+    With a `disk` tier, responses cached for at least `disk.min_ttl` seconds,
+    i.e. immutable data and metadata, are also written to disk and read back
+    after the in-memory store missed:
+
+        >>> cache = ResponseCache(disk=DiskCache('~/.cache/alchemy.sqlite'))
+        >>> alchemy = Alchemy(api_key, network, cache=cache)
+
+    :var store: The store holding the cached bodies, an LRUCache by default.
+    :var disk: The optional persistent DiskCache tier.
+    :var ttls: TTLs in seconds by JSON-RPC or REST method name.
+    :var latest_ttl: TTL in seconds of calls on the moving head of the chain.
+    :var finality_depth: The number of blocks after which a block is final.
+    :var head: The highest block number seen, or None.
+    :var resolve_head: Optional function returning the current block
+        number, set by the provider using the cache.
+    :var hits: The number of calls answered from the cache.
+    :var misses: The number of cacheable calls sent to the network.
+    :var disk_hits: The number of hits answered by the disk tier.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttls: Optional[Dict[str, float]] = None,
+        latest_ttl: float = DEFAULT_LATEST_TTL,
+        finality_depth: int = DEFAULT_FINALITY_DEPTH,
+        store: Any = None,
+        disk: Optional[DiskCache] = None,
+    ) -> None:
+        """Initializes class attributes"""
+        self.store = store if store is not None else LRUCache(max_entries)
+        self.disk = disk
+        self.ttls: Dict[str, float] = {**DEFAULT_TTLS, **(ttls or {})}
+        self.latest_ttl = latest_ttl
+        self.finality_depth = finality_depth
+        self.head: Optional[int] = None
+        self.resolve_head: Optional[Callable[[], Any]] = None
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self._lock = threading.Lock()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns hit and miss counters of the cache.
+        """
+        with self._lock:
+            hits, misses, disk_hits = self.hits, self.misses, self.disk_hits
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'disk_hits': disk_hits,
+            'hit_ratio': hits / total if total else 0.0,
+        }
+
+    def clear(self) -> None:
+        """
+        Drops all cached responses and resets the counters.
+        """
+        self.store.clear()
+        if self.disk is not None:
+            self.disk.clear()
+        with self._lock:
+            self.hits = self.misses = self.disk_hits = 0
+
+    def get_rpc(self, url: str, method: str, params: Any) -> Optional[bytes]:
+        """
+        Returns the cached body of a JSON-RPC call, or None.
+        """
+        ttl = self.rpc_ttl(method, params)
+        if not ttl:
+            return None
+        return self._get((url, *request_key(method, params)), ttl)
+
+    def put_rpc(
+        self,
+        url: str,
+        method: str,
+        params: Any,
+        response: Dict[str, Any],
+        raw_response: bytes,
+    ) -> None:
+        """
+        Stores the body of a successful JSON-RPC response, if cacheable.
+        """
+        result = response.get('result')
+        self._observe_head(method, params, result)
+        if response.get('error') or result is None:
+            return
+        ttl = self.rpc_ttl(method, params, result)
+        if ttl:
+            self._set((url, *request_key(method, params)), raw_response, ttl)
+
+    def get_api(self, url: str, options: Dict[str, Any]) -> Optional[bytes]:
+        """
+        Returns the cached body of a REST call, or None.
+        """
+        ttl = self.api_ttl(url, options)
+        if not ttl:
+            return None
+        return self._get(api_request_key(url, options), ttl)
+
+    def put_api(self, url: str, options: Dict[str, Any], content: bytes) -> None:
+        """
+        Stores the body of a successful REST response, if cacheable.
+        """
+        ttl = self.api_ttl(url, options)
+        if ttl:
+            self._set(api_request_key(url, options), content, ttl)
+
+    def rpc_ttl(self, method: str, params: Any, result: Any = None) -> float:
+        """
+        Returns how long a JSON-RPC call can be cached, `0` if it cannot.
+
+        :param method: JSON-RPC method
+        :param params: params of the call
+        :param result: result of the call, if already known
+        :return: TTL in seconds, FOREVER for immutable results
+        """
+        if method in self.ttls:
+            return self.ttls[method]
+        params = params or []
+        if method in BLOCK_HASH_PARAMS:
+            return FOREVER
+        if method in BLOCK_PARAMS:
+            index = BLOCK_PARAMS[method]
+            return self._block_ttl(params[index] if len(params) > index else None)
+        if method in FILTER_METHODS and params and isinstance(params[0], dict):
+            block_filter = params[0]
+            if block_filter.get('blockHash'):
+                return FOREVER
+            return self._block_ttl(
+                block_filter.get('blockNumber', block_filter.get('toBlock'))
+            )
+        if method in TRANSACTION_METHODS:
+            if result is None:
+                # the result decides, so the call can only be looked up
+                return FOREVER
+            block_number = result.get('blockNumber')
+            if block_number is None:
+                return 0
+            return FOREVER if self._is_final(block_number) else 0
+        return 0
+
+    def api_ttl(self, url: str, options: Dict[str, Any]) -> float:
+        """
+        Returns how long a REST call can be cached, `0` if it cannot.
+        """
+        for values in (options.get('params'), options.get('data')):
+            if isinstance(values, dict) and values.get('refreshCache'):
+                return 0
+        return self.ttls.get(api_method(url), 0)
+
+    def _get(self, key: Hashable, ttl: float) -> Optional[bytes]:
+        value = self.store.get(key)
+        from_disk = False
+        if value is None and self.disk is not None and ttl >= self.disk.min_ttl:
+            value = self.disk.get(key)
+            if value is not None:
+                from_disk = True
+                self.store.set(key, value, ttl)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.disk_hits += from_disk
+        return value
+
+    def _set(self, key: Hashable, value: bytes, ttl: float) -> None:
+        self.store.set(key, value, ttl)
+        if self.disk is not None and ttl >= self.disk.min_ttl:
+            self.disk.set(key, value, ttl)
+
+    def _block_ttl(self, block: Any) -> float:
+        if isinstance(block, dict):
+            if block.get('blockHash'):
+                return FOREVER
+            block = block.get('blockNumber')
+        if block is None or block in ('latest', 'pending', 'safe', 'finalized'):
+            return self.latest_ttl
+        if block == 'earliest':
+            return FOREVER
+        if isinstance(block, str) and len(block) == 66:
+            return FOREVER
+        return FOREVER if self._is_final(block) else self.latest_ttl
+
+    def _is_final(self, block_number: Any) -> bool:
+        try:
+            number = _to_int(block_number)
+        except (TypeError, ValueError):
+            return False
+        head = self.head
+        if head is None and self.resolve_head is not None:
+            try:
+                head = _to_int(self.resolve_head())
+            except (AlchemyError, TypeError, ValueError):
+                return False
+            with self._lock:
+                if self.head is None or head > self.head:
+                    self.head = head
+        return head is not None and number <= head - self.finality_depth
+
+    def _observe_head(self, method: str, params: Any, result: Any) -> None:
+        if method == 'eth_blockNumber':
+            number = result
+        elif method == 'eth_getBlockByNumber' and params and params[0] == 'latest':
+            number = result.get('number') if isinstance(result, dict) else None
+        else:
+            return
+        try:
+            number = _to_int(number)
+        except (TypeError, ValueError):
+            return
+        with self._lock:
+            if self.head is None or number > self.head:
+                self.head = number
+
+
+def _to_int(value: Any) -> int:
+    if isinstance(value, int):
+        return value
+    return int(value, 16) if value.startswith('0x') else int(value)
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Optional, Union
+
+from hexbytes import HexBytes
+from web3.datastructures import AttributeDict
+
+from alchemy.exceptions import AlchemyError
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, AttributeDict):
+        return dict(obj)
+    if isinstance(obj, (HexBytes, bytes)):
+        return HexBytes(obj).hex()
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+class JsonCodec:
+    """
+    Standard library JSON codec, the base of all codecs.
+
+    :var name: The name the codec is selected by on the config.
+    """
+
+    name = 'json'
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj, default=_default).encode()
+
+    def loads(self, data: Union[bytes, bytearray, str]) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(JsonCodec):
+    """
+    JSON codec backed by orjson, faster than the standard library at both
+    encoding and decoding.
+
+    Objects orjson cannot encode, such as integers outside the 64-bit range,
+    are encoded by the standard library. When decoding, orjson reads such
+    integers as floats and loses precision, without any error. JSON-RPC
+    encodes quantities as hex strings, so Alchemy responses do not contain
+    them, but the `json` codec must be used for endpoints that return them.
+    Checking every response for them would cost about as much as decoding
+    it with the standard library.
+    """
+
+    name = 'orjson'
+
+    def __init__(self) -> None:
+        """Initializes class attributes"""
+        if orjson is None:
+            raise AlchemyError('The orjson codec requires orjson to be installed')
+
+    def dumps(self, obj: Any) -> bytes:
+        try:
+            return orjson.dumps(obj, default=_default)
+        except orjson.JSONEncodeError:
+            return super().dumps(obj)
+
+    def loads(self, data: Union[bytes, bytearray, str]) -> Any:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # raise the same errors as the standard library
+            return super().loads(data)
+
+
+CODECS = {'json': JsonCodec, 'orjson': OrjsonCodec}
+
+
+def get_codec(codec: Optional[Union[str, JsonCodec]] = None) -> JsonCodec:
+    """
+    Returns the codec selected by a config.
+
+    :param codec: A JsonCodec, the name of one, or None for the fastest
+        codec installed.
+    :return: JsonCodec
+    """
+    if isinstance(codec, JsonCodec):
+        return codec
+    if codec is None:
+        return OrjsonCodec() if orjson is not None else JsonCodec()
+    if codec not in CODECS:
+        raise AlchemyError(f'Unknown codec: {codec}')
+    return CODECS[codec]()
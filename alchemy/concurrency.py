@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import contextvars
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Deque, Dict, Iterable, Iterator, Tuple, TypeVar
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+DEFAULT_MAX_WORKERS = 8
+
+
+def map_unordered(
+    func: Callable[[T], R],
+    items: Iterable[T],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    thread_name_prefix: str = 'alchemy-worker',
+) -> Iterator[Tuple[T, Future]]:
+    """
+    Calls `func` with each item on a pool of `max_workers` threads, and
+    yields each item with the future of its call as calls complete.
+
+    Items are consumed lazily: at most twice `max_workers` calls are queued
+    at once, so `items` can be a generator over millions of inputs. Calls
+    not started yet are cancelled when the generator is closed.
+
+    Calls run in a copy of the context the generator is advanced in, so
+    that context variables set around the consuming loop apply to them.
+
+    :param func: The function to call with each item.
+    :param items: The items to call `func` with.
+    :param max_workers: The maximum number of calls running at once.
+    :return: iterator of (item, completed future)
+    """
+    executor = ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix=thread_name_prefix
+    )
+    pending: Dict[Future, T] = {}
+    items = iter(items)
+    try:
+        while True:
+            for item in items:
+                future = executor.submit(contextvars.copy_context().run, func, item)
+                pending[future] = item
+                if len(pending) >= 2 * max_workers:
+                    break
+            if not pending:
+                return
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield pending.pop(future), future
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+def map_ordered(
+    func: Callable[[T], R],
+    items: Iterable[T],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    thread_name_prefix: str = 'alchemy-worker',
+) -> Iterator[R]:
+    """
+    Calls `func` with each item on a pool of `max_workers` threads, and
+    yields the results in the order of `items`. The first error raised by a
+    call is raised when its result is reached.
+
+    Like `map_unordered`, items are consumed lazily with at most twice
+    `max_workers` calls queued, calls run in a copy of the caller's context,
+    and calls not started yet are cancelled when the generator is closed.
+
+    :param func: The function to call with each item.
+    :param items: The items to call `func` with.
+    :param max_workers: The maximum number of calls running at once.
+    :return: iterator of results
+    """
+    executor = ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix=thread_name_prefix
+    )
+    pending: Deque[Future] = deque()
+    try:
+        for item in items:
+            future = executor.submit(contextvars.copy_context().run, func, item)
+            pending.append(future)
+            if len(pending) >= 2 * max_workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
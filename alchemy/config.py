@@ -1,11 +1,28 @@
 from typing import Optional
 
+from alchemy.cache import ResponseCache
+from alchemy.codec import JsonCodec, get_codec
 from alchemy.exceptions import AlchemyError
+from alchemy.hedging import RequestHedger
+from alchemy.metrics import MetricsRegistry
+from alchemy.ratelimit import ComputeUnitLimiter
+from alchemy.retry import RetryPolicy
+from alchemy.routing import Endpoint, EndpointRouter
+from alchemy.singleflight import SingleFlight
+from alchemy.transport import (
+    BaseTransport,
+    HTTPTransport,
+    HTTP2Transport,
+    DEFAULT_POOL_CONNECTIONS,
+    DEFAULT_POOL_MAXSIZE,
+    DEFAULT_POOL_IDLE_TIMEOUT,
+)
 from alchemy.types import AlchemyApiType, Network
 
 DEFAULT_ALCHEMY_API_KEY = 'demo'
 DEFAULT_NETWORK = Network.ETH_MAINNET
 DEFAULT_MAX_RETRIES = 5
+DEFAULT_MAX_BATCH_SIZE = 100
 
 
 class AlchemyConfig:
@@ -19,10 +36,83 @@ class AlchemyConfig:
         using the network and api_key.
     :var request_timeout: The optional Request timeout provided in `s`
         for NFT and NOTIFY API. Defaults is None.
+    :var max_batch_size: The maximum number of JSON-RPC calls sent in one
+        batch request. Larger batches are split automatically.
+    :var batch_window: Enables transparent batching of concurrent JSON-RPC
+        calls. Calls made within `batch_window` seconds of each other are
+        sent together as one batch. Defaults to None (disabled).
+    :var batch_window_size: The number of queued calls that sends a batch
+        before the window has passed. Defaults to `max_batch_size`.
+    :var single_flight: Deduplicates identical concurrent requests, so that
+        callers asking for the same thing at the same time share one request.
+        Calls with side effects or server-side state, e.g. sending
+        transactions or polling filters, and calls with custom headers are
+        always sent on their own. Set to `False` on the constructor to
+        disable it.
+    :var cache: The optional ResponseCache answering repeated calls locally.
+        Pass `cache=True` to the constructor for a cache with default
+        policies, or a ResponseCache instance to tune it or share it between
+        several clients. Defaults to None (disabled).
+    :var rate_limiter: The optional ComputeUnitLimiter delaying requests to
+        stay within a compute units per second budget. Pass the budget as
+        `rate_limit` to the constructor, or a ComputeUnitLimiter instance to
+        share one budget between several clients. Defaults to None (disabled).
+    :var retry_policy: The RetryPolicy deciding which failed requests are
+        retried and when, with a circuit breaker per endpoint. Defaults to a
+        policy making at most `max_retries` attempts. A policy instance can be
+        passed in to tune it or share its circuit breakers between clients.
+    :var hedger: The optional RequestHedger re-sending idempotent read calls
+        that are slower than usual and using the first response. Pass
+        `hedging=True` to the constructor to enable it with default settings,
+        or a RequestHedger instance to tune it. Defaults to None (disabled).
+    :var router: The optional EndpointRouter spreading requests over several
+        endpoints by weight and observed latency, and failing over between
+        them. Pass a list of Endpoint as `endpoints` to the constructor, or an
+        EndpointRouter instance to tune it. Endpoints without api key or
+        network use the ones of the config. Defaults to None (single endpoint).
+    :var codec: The JsonCodec encoding requests and decoding responses of
+        all clients using the config. Defaults to orjson when it is installed,
+        the standard library otherwise. Pass `codec='json'` or `'orjson'` to
+        the constructor to pick one, or a JsonCodec instance. Note that
+        orjson decodes integers outside the 64-bit range as floats, losing
+        precision: use `codec='json'` for endpoints returning such numbers.
+    :var metrics: The optional MetricsRegistry recording the latency, retries,
+        errors and payload sizes of requests per SDK method. Pass
+        `metrics=True` to the constructor to enable it, or a MetricsRegistry
+        instance to share it between clients or add exporters. Responses
+        served from the cache are not recorded. Defaults to None (disabled).
+    :var transport: The HTTP transport shared by JSON-RPC and NFT requests.
+        Keeps pooled keep-alive connections per host. A transport instance
+        can be passed in to share its pools between several clients. Its
+        `stats` report the compressed and decompressed bytes per SDK method.
+        Pass `http2=True` to the constructor to multiplex requests over a few
+        HTTP/2 connections instead, or an HTTP2Transport instance to tune it.
     """
 
     def __init__(
-        self, api_key, network, max_retries=None, url=None, request_timeout=None
+        self,
+        api_key,
+        network,
+        max_retries=None,
+        url=None,
+        request_timeout=None,
+        pool_connections=None,
+        pool_maxsize=None,
+        pool_block=False,
+        pool_idle_timeout=DEFAULT_POOL_IDLE_TIMEOUT,
+        transport=None,
+        max_batch_size=None,
+        batch_window=None,
+        batch_window_size=None,
+        single_flight=True,
+        cache=None,
+        rate_limit=None,
+        retry_policy=None,
+        hedging=None,
+        endpoints=None,
+        codec=None,
+        http2=False,
+        metrics=None,
     ) -> None:
         """Initializes class attributes"""
         self.api_key: str = self.get_api_key(api_key)
@@ -30,6 +120,48 @@ class AlchemyConfig:
         self.max_retries: int = max_retries or DEFAULT_MAX_RETRIES
         self.url: Optional[str] = url
         self.request_timeout: Optional[float] = request_timeout
+        self.max_batch_size: int = max_batch_size or DEFAULT_MAX_BATCH_SIZE
+        self.batch_window: Optional[float] = batch_window
+        self.batch_window_size: Optional[int] = batch_window_size
+        self.single_flight: Optional[SingleFlight] = (
+            SingleFlight() if single_flight else None
+        )
+        self.cache: Optional[ResponseCache] = (
+            ResponseCache() if cache is True else cache or None
+        )
+        self.rate_limiter: Optional[ComputeUnitLimiter] = (
+            rate_limit
+            if rate_limit is None or isinstance(rate_limit, ComputeUnitLimiter)
+            else ComputeUnitLimiter(rate_limit)
+        )
+        self.retry_policy: RetryPolicy = retry_policy or RetryPolicy(
+            max_attempts=self.max_retries
+        )
+        self.hedger: Optional[RequestHedger] = (
+            RequestHedger() if hedging is True else hedging or None
+        )
+        self.router: Optional[EndpointRouter] = (
+            endpoints
+            if endpoints is None or isinstance(endpoints, EndpointRouter)
+            else EndpointRouter(list(endpoints), self.retry_policy)
+        )
+        if self.router is not None:
+            if self.router.retry_policy is None:
+                self.router.retry_policy = self.retry_policy
+            for endpoint in self.router.endpoints:
+                self.init_endpoint(endpoint)
+        self.codec: JsonCodec = get_codec(codec)
+        self.metrics: Optional[MetricsRegistry] = (
+            MetricsRegistry() if metrics is True else metrics or None
+        )
+        if transport is None and http2:
+            transport = HTTP2Transport(pool_idle_timeout=pool_idle_timeout)
+        self.transport: BaseTransport = transport or HTTPTransport(
+            pool_connections=pool_connections or DEFAULT_POOL_CONNECTIONS,
+            pool_maxsize=pool_maxsize or DEFAULT_POOL_MAXSIZE,
+            pool_block=pool_block,
+            pool_idle_timeout=pool_idle_timeout,
+        )
 
     @staticmethod
     def get_api_key(api_key: str) -> str:
@@ -53,7 +185,15 @@ class AlchemyConfig:
             )
         return network
 
+    def init_endpoint(self, endpoint: Endpoint) -> None:
+        if endpoint.url:
+            return
+        endpoint.api_key = self.get_api_key(endpoint.api_key or self.api_key)
+        endpoint.network = self.get_alchemy_network(endpoint.network or self.network)
+
     def get_request_url(self, api_type: AlchemyApiType) -> str:
+        if self.router is not None:
+            return self.router.get_request_url(api_type)
         if self.url:
             return self.url
         elif api_type == AlchemyApiType.NFT:
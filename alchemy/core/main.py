@@ -1,12 +1,28 @@
 from __future__ import annotations
 
-from typing import Optional, Any, List, cast, NoReturn, overload, Literal, Union, Dict
+from typing import (
+    Optional,
+    Any,
+    List,
+    cast,
+    NoReturn,
+    overload,
+    Literal,
+    Union,
+    Dict,
+    Iterator,
+    Iterable,
+    Tuple,
+)
 
 from web3 import Web3
 from web3.eth import Eth
-from web3.types import ENS
+from web3.types import ENS, TxReceipt
 from eth_typing.encoding import HexStr
 
+from alchemy.batch import Batch
+from alchemy.concurrency import DEFAULT_MAX_WORKERS, map_ordered, map_unordered
+from alchemy.crawl import Checkpoint, CrawlRunner
 from alchemy.core.models import (
     TokenMetadata,
     TokenBalance,
@@ -20,12 +36,17 @@ from alchemy.core.responses import (
     AssetTransfersWithMetadataResponse,
     TxReceiptsResponse,
 )
+from alchemy.core.sharding import DEFAULT_SHARD_WORKERS, iter_sharded_transfers
 from alchemy.core.types import TokenBalanceType, AssetTransfersCategory
 from alchemy.exceptions import AlchemyError
+from alchemy.pagination import DEFAULT_PREFETCH, Page, iter_items
 from alchemy.provider import AlchemyProvider
 from alchemy.types import HexAddress, BlockIdentifier, SortingOrder
 from alchemy.utils import is_valid_address
 
+# contract addresses accepted by one alchemy_getTokenBalances call
+MAX_TOKEN_BALANCES_CONTRACTS = 1500
+
 
 class AlchemyCore(Eth):
     """
@@ -52,6 +73,22 @@ class AlchemyCore(Eth):
     def icapNamereg(self) -> NoReturn:
         raise NotImplementedError()
 
+    def batch(self, max_batch_size: Optional[int] = None) -> Batch:
+        """
+        Returns a context manager that collects core calls and sends them
+        as JSON-RPC batches when the context exits.
+
+            >>> with alchemy.core.batch() as b:
+            ...     metadata = b.get_token_metadata(contract_address)
+            ...     block = b.get_block('latest')
+            >>> metadata.result()
+
+        :param max_batch_size: The maximum number of calls per HTTP request.
+            Defaults to `config.max_batch_size`.
+        :return: Batch
+        """
+        return Batch(self, max_batch_size)
+
     @overload
     def get_token_balances(
         self, address: HexAddress | ENS
@@ -72,7 +109,9 @@ class AlchemyCore(Eth):
 
         :param address: The owner address to get the token balances for.
         :param data: A list of contract addresses to check. If omitted,
-            all ERC-20 tokens will be checked.
+            all ERC-20 tokens will be checked. Lists longer than 1500 contracts
+            are split into chunks fetched by concurrent calls, which are
+            only sent as one JSON-RPC batch when `batch_window` is set.
         """
         ...
 
@@ -116,14 +155,12 @@ class AlchemyCore(Eth):
             raise AlchemyError('Address or ENS is not valid')
 
         if isinstance(data, list):
-            if len(data) > 1500:
-                raise AlchemyError(
-                    'You cannot pass in more than 1500 contract addresses to get_token_balances()'
-                )
             if len(data) == 0:
                 raise AlchemyError(
                     'get_token_balances() requires at least one ContractAddress when using an array'
                 )
+            if len(data) > MAX_TOKEN_BALANCES_CONTRACTS:
+                return self._get_token_balances_chunked(address, data)
             response = self.provider.make_request(
                 method='alchemy_getTokenBalances',
                 params=[address, data],
@@ -166,6 +203,97 @@ class AlchemyCore(Eth):
             }
             return result
 
+    def get_token_balances_many(
+        self,
+        addresses: Iterable[HexAddress | ENS],
+        data: Optional[List[str] | TokenBalanceType] = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> Iterator[Tuple[HexAddress | ENS, TokenBalancesResponse | AlchemyError]]:
+        """
+        Returns the token balances of many owners, fetched concurrently on a
+        pool of `max_workers` threads. ERC-20 balances are paged to
+        completion for each owner.
+
+        Results are yielded as they complete, not in input order, and a
+        failed owner does not stop the others: its error is yielded in place
+        of its balances, as an AlchemyError whose `__cause__` is the original
+        error when it was of another type.
+
+            >>> for address, result in alchemy.core.get_token_balances_many(owners):
+            ...     if isinstance(result, AlchemyError):
+            ...         failed.append(address)
+            ...     else:
+            ...         save(address, result['token_balances'])
+
+        :param addresses: The owner addresses to get the token balances for,
+            consumed lazily.
+        :param data: A list of contract addresses or a token type, see
+            `get_token_balances`. Defaults to all ERC-20 tokens.
+        :param max_workers: The maximum number of requests sent at once.
+            Defaults to 8.
+        :return: iterator of (address, TokenBalancesResponse or AlchemyError)
+        """
+
+        def fetch(address: HexAddress | ENS) -> TokenBalancesResponse:
+            response = self.get_token_balances(address, data)
+            token_balances = list(response['token_balances'])
+            page_key = response.get('page_key')
+            while page_key and data in (None, TokenBalanceType.ERC20):
+                response = self.get_token_balances(
+                    address, TokenBalanceType.ERC20, page_key
+                )
+                token_balances += response['token_balances']
+                page_key = response.get('page_key')
+            result: TokenBalancesResponse = {
+                'address': response['address'],
+                'token_balances': token_balances,
+            }
+            return result
+
+        for address, future in map_unordered(
+            fetch, addresses, max_workers, thread_name_prefix='alchemy-balances'
+        ):
+            err = future.exception()
+            if err is None:
+                yield address, future.result()
+                continue
+            if not isinstance(err, Exception):
+                raise err
+            if not isinstance(err, AlchemyError):
+                # e.g. a malformed response, which must not end the others
+                wrapped = AlchemyError(f'{type(err).__name__}: {err}')
+                wrapped.__cause__ = err
+                err = wrapped
+            yield address, err
+
+    def _get_token_balances_chunked(
+        self, address: HexAddress | ENS, data: List[str]
+    ) -> TokenBalancesResponse:
+        """
+        Splits a contract list longer than the server accepts into chunks
+        fetched concurrently, and merges their balances in input order. Each
+        chunk is a call of its own, cached, recorded and measured like any
+        other, and sent in one batch with the others when `batch_window` is
+        set.
+        """
+        size = MAX_TOKEN_BALANCES_CONTRACTS
+        responses = list(
+            map_ordered(
+                lambda chunk: self.get_token_balances(address, chunk),
+                [data[start : start + size] for start in range(0, len(data), size)],
+                thread_name_prefix='alchemy-balances',
+            )
+        )
+        result: TokenBalancesResponse = {
+            'address': responses[0]['address'],
+            'token_balances': [
+                balance
+                for response in responses
+                for balance in response['token_balances']
+            ],
+        }
+        return result
+
     def get_token_metadata(self, contract_address: HexAddress) -> TokenMetadata:
         """
         Returns metadata for a given token contract address.
@@ -332,6 +460,234 @@ class AlchemyCore(Eth):
         result['page_key'] = response['result'].get('pageKey')
         return result
 
+    def iter_asset_transfers(
+        self,
+        category: List[AssetTransfersCategory],
+        with_metadata: bool = False,
+        from_block: BlockIdentifier = 0x0,
+        to_block: BlockIdentifier = 'latest',
+        from_address: Optional[HexAddress | ENS] = None,
+        to_address: Optional[HexAddress | ENS] = None,
+        contract_addresses: Optional[List[HexAddress]] = None,
+        order: SortingOrder = 'asc',
+        exclude_zero_value: bool = True,
+        max_count: int | HexStr = 1000,
+        page_key: Optional[str] = None,
+        limit: Optional[int] = None,
+        prefetch: int = DEFAULT_PREFETCH,
+    ) -> Iterator[AssetTransfers | AssetTransfersWithMetadata]:
+        """
+        Auto-paginating counterpart of `get_asset_transfers`: transfers of all
+        pages are yielded one at a time. The next page is fetched in the
+        background while the caller processes the current one.
+
+            >>> for transfer in alchemy.core.iter_asset_transfers(
+            ...     category=[AssetTransfersCategory.ERC20], from_address=address
+            ... ):
+            ...     print(transfer.hash)
+
+        :param category: REQUIRED field. An array of categories to get transfers for.
+        :param with_metadata: Whether to include additional metadata about each
+            transfer event. Defaults to `false` if omitted.
+        :param from_block: The starting block to check for transfers, see
+            `get_asset_transfers` for this and the other filters.
+        :param to_block: The ending block to check for transfers.
+        :param from_address: The from address to filter transfers by.
+        :param to_address: The to address to filter transfers by.
+        :param contract_addresses: List of contract addresses to filter for.
+        :param order: Whether to return results in ascending or descending order
+            by block number. Defaults to ascending if omitted.
+        :param exclude_zero_value: Whether to exclude transfers with zero value.
+        :param max_count: The maximum number of results per page.
+            Defaults to 1000 if omitted.
+        :param page_key: Optional page key to start from.
+        :param limit: Optional maximum number of transfers to yield overall.
+        :param prefetch: The maximum number of pages fetched ahead of the one
+            being processed, 0 to fetch pages only when they are needed.
+            Defaults to 1.
+        :return: iterator of AssetTransfers or AssetTransfersWithMetadata
+        """
+        if limit is not None and isinstance(max_count, int):
+            max_count = max(1, min(max_count, limit))
+
+        def fetch(key: Optional[str]) -> Page:
+            response = self.get_asset_transfers(
+                category=category,
+                with_metadata=with_metadata,
+                from_block=from_block,
+                to_block=to_block,
+                from_address=from_address,
+                to_address=to_address,
+                contract_addresses=contract_addresses,
+                order=order,
+                exclude_zero_value=exclude_zero_value,
+                max_count=max_count,
+                page_key=key,
+                src_method='iterAssetTransfers',
+            )
+            return response['transfers'], response['page_key']
+
+        yield from iter_items(fetch, page_key, prefetch, limit)
+
+    def iter_asset_transfers_sharded(
+        self,
+        category: List[AssetTransfersCategory],
+        with_metadata: bool = False,
+        from_block: BlockIdentifier = 0x0,
+        to_block: BlockIdentifier = 'latest',
+        from_address: Optional[HexAddress | ENS] = None,
+        to_address: Optional[HexAddress | ENS] = None,
+        contract_addresses: Optional[List[HexAddress]] = None,
+        order: SortingOrder = 'asc',
+        exclude_zero_value: bool = True,
+        max_count: int | HexStr = 1000,
+        max_workers: int = DEFAULT_SHARD_WORKERS,
+        shard_size: Optional[int] = None,
+    ) -> Iterator[AssetTransfers | AssetTransfersWithMetadata]:
+        """
+        Sharded counterpart of `iter_asset_transfers` for long histories: the
+        block range is split into sub-ranges paginated concurrently, so
+        throughput scales with `max_workers` instead of being bound to a
+        single chain of page keys. Transfers are yielded in global block
+        order, without duplicates.
+
+        The range starts as `max_workers` equal sub-ranges, and sub-ranges
+        turning out dense are split further while workers are idle. Pass
+        `shard_size` to use fixed-size sub-ranges instead.
+
+        :param category: REQUIRED field. An array of categories to get transfers for.
+        :param with_metadata: Whether to include additional metadata about each
+            transfer event. Defaults to `false` if omitted.
+        :param from_block: The starting block to check for transfers, see
+            `get_asset_transfers` for this and the other filters.
+        :param to_block: The ending block to check for transfers. Block tags
+            are resolved to a block number once, when iteration starts.
+        :param from_address: The from address to filter transfers by.
+        :param to_address: The to address to filter transfers by.
+        :param contract_addresses: List of contract addresses to filter for.
+        :param order: Whether to return results in ascending or descending order
+            by block number. Defaults to ascending if omitted.
+        :param exclude_zero_value: Whether to exclude transfers with zero value.
+        :param max_count: The maximum number of results per page.
+            Defaults to 1000 if omitted.
+        :param max_workers: The maximum number of pages fetched at once.
+            Defaults to 8.
+        :param shard_size: Optional number of blocks per sub-range.
+        :return: iterator of AssetTransfers or AssetTransfersWithMetadata
+        """
+
+        def fetch(start: int, end: int, key: Optional[str]) -> Page:
+            response = self.get_asset_transfers(
+                category=category,
+                with_metadata=with_metadata,
+                from_block=start,
+                to_block=end,
+                from_address=from_address,
+                to_address=to_address,
+                contract_addresses=contract_addresses,
+                order=order,
+                exclude_zero_value=exclude_zero_value,
+                max_count=max_count,
+                page_key=key,
+                src_method='iterAssetTransfersSharded',
+            )
+            return response['transfers'], response['page_key']
+
+        yield from iter_sharded_transfers(
+            fetch,
+            self._block_number(from_block),
+            self._block_number(to_block),
+            order=order,
+            max_workers=max_workers,
+            shard_size=shard_size,
+        )
+
+    def crawl_asset_transfers(
+        self,
+        checkpoint: str | Checkpoint,
+        category: List[AssetTransfersCategory],
+        with_metadata: bool = False,
+        from_block: BlockIdentifier = 0x0,
+        to_block: BlockIdentifier = 'latest',
+        from_address: Optional[HexAddress | ENS] = None,
+        to_address: Optional[HexAddress | ENS] = None,
+        contract_addresses: Optional[List[HexAddress]] = None,
+        exclude_zero_value: bool = True,
+        max_count: int | HexStr = 1000,
+        range_size: Optional[int] = None,
+    ) -> CrawlRunner[AssetTransfers | AssetTransfersWithMetadata]:
+        """
+        Returns a resumable crawl of the asset transfers of a block range,
+        in ascending order. The crawl position is saved to the `checkpoint`
+        file after each page, and iterating the crawl again, e.g. after a
+        crash, resumes from it. See CrawlRunner.
+
+        :param checkpoint: The path of the checkpoint file.
+        :param category: REQUIRED field. An array of categories to get transfers for.
+        :param with_metadata: Whether to include additional metadata about each
+            transfer event. Defaults to `false` if omitted.
+        :param from_block: The starting block to check for transfers, see
+            `get_asset_transfers` for this and the other filters.
+        :param to_block: The ending block to check for transfers, resolved
+            when the crawl starts.
+        :param from_address: The from address to filter transfers by.
+        :param to_address: The to address to filter transfers by.
+        :param contract_addresses: List of contract addresses to filter for.
+        :param exclude_zero_value: Whether to exclude transfers with zero value.
+        :param max_count: The maximum number of results per page.
+            Defaults to 1000 if omitted.
+        :param range_size: Optional number of blocks per sub-range.
+        :return: CrawlRunner
+        """
+        query = {
+            'method': 'getAssetTransfers',
+            'category': category,
+            'with_metadata': with_metadata,
+            'from_address': from_address,
+            'to_address': to_address,
+            'contract_addresses': contract_addresses,
+            'exclude_zero_value': exclude_zero_value,
+            'max_count': max_count,
+            'range_size': range_size,
+        }
+
+        def fetch(key: Optional[str], start: int, end: int) -> Page:
+            response = self.get_asset_transfers(
+                category=category,
+                with_metadata=with_metadata,
+                from_block=start,
+                to_block=end,
+                from_address=from_address,
+                to_address=to_address,
+                contract_addresses=contract_addresses,
+                exclude_zero_value=exclude_zero_value,
+                max_count=max_count,
+                page_key=key,
+                src_method='crawlAssetTransfers',
+            )
+            return response['transfers'], response['page_key']
+
+        return CrawlRunner(
+            fetch,
+            checkpoint,
+            query,
+            from_block=from_block,
+            to_block=to_block,
+            range_size=range_size,
+            resolve_block=self._block_number,
+        )
+
+    def _block_number(self, block: BlockIdentifier) -> int:
+        if isinstance(block, int):
+            return block
+        if block == 'earliest':
+            return 0
+        if block == 'latest':
+            return self.block_number
+        if isinstance(block, str) and block.startswith('0x'):
+            return int(block, 16)
+        return self.get_block(block)['number']
+
     def get_transaction_receipts(
         self,
         block_number: Optional[HexStr | int] = None,
@@ -362,6 +718,36 @@ class AlchemyCore(Eth):
         )
         return response['result'].get('receipts')
 
+    def stream_transaction_receipts(
+        self,
+        block_number: Optional[HexStr | int] = None,
+        block_hash: Optional[HexStr | str] = None,
+    ) -> Iterator[TxReceipt]:
+        """
+        Streaming counterpart of `get_transaction_receipts`: receipts are
+        decoded and yielded one at a time while the response is received, so
+        a full block does not have to be held in memory.
+
+        :param block_number: The block number you want to get transaction receipts for.
+        :param block_hash: The block hash you want to get transaction receipts for.
+        :return: iterator of TxReceipt
+        """
+        params = {}
+        if block_number:
+            params = {
+                'blockNumber': hex(block_number)
+                if isinstance(block_number, int)
+                else block_number
+            }
+        if block_hash:
+            params = {'blockHash': block_hash}
+        yield from self.provider.stream_request(
+            method='alchemy_getTransactionReceipts',
+            params=[params],
+            path=('result', 'receipts'),
+            method_name='streamTransactionReceipts',
+        )
+
     def send(
         self, method: str, params: List[Any], headers: Optional[dict] = None
     ) -> Any:
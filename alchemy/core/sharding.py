@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import contextvars
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Deque, FrozenSet, Iterator, List, Optional, Tuple
+
+from alchemy.core.models import AssetTransfers
+from alchemy.pagination import Page
+from alchemy.types import SortingOrder
+
+DEFAULT_SHARD_WORKERS = 8
+# ranges narrower than this are paginated rather than split further
+MIN_SHARD_BLOCKS = 16
+# pages buffered per worker, waiting for the shards before them to be consumed
+BUFFERED_PAGES_PER_WORKER = 4
+
+RangeFetcher = Callable[[int, int, Optional[str]], Page[AssetTransfers]]
+
+
+class _Shard:
+    """
+    An inclusive block sub-range paginated on its own.
+
+    :var start: The first block of the range.
+    :var end: The last block of the range.
+    :var page_key: The key of the next page, None before the first page.
+    :var skip: Unique ids of transfers already yielded by the shard the
+        range was split from.
+    :var pages: Fetched pages waiting to be yielded.
+    :var future: The fetch in progress, if any.
+    :var done: Whether the last page was fetched.
+    """
+
+    def __init__(
+        self, start: int, end: int, skip: FrozenSet[str] = frozenset()
+    ) -> None:
+        """Initializes class attributes"""
+        self.start = start
+        self.end = end
+        self.page_key: Optional[str] = None
+        self.skip = skip
+        self.pages: Deque[List[AssetTransfers]] = deque()
+        self.future: Optional[Future] = None
+        self.done = False
+
+
+def split_range(start: int, end: int, shards: int) -> List[Tuple[int, int]]:
+    """
+    Splits the inclusive block range `start..end` into at most `shards`
+    contiguous ranges of equal size.
+    """
+    size = max(1, -(-(end - start + 1) // max(1, shards)))
+    return [(lo, min(lo + size - 1, end)) for lo in range(start, end + 1, size)]
+
+
+def iter_sharded_transfers(
+    fetch: RangeFetcher,
+    from_block: int,
+    to_block: int,
+    order: SortingOrder = 'asc',
+    max_workers: int = DEFAULT_SHARD_WORKERS,
+    shard_size: Optional[int] = None,
+) -> Iterator[AssetTransfers]:
+    """
+    Paginates the sub-ranges of `from_block..to_block` concurrently and
+    yields their transfers in global block order.
+
+    Without `shard_size`, the range starts as `max_workers` equal shards and
+    is split by density: while fewer shards than workers remain, a shard
+    whose page did not reach the end of its range is split in two at the
+    middle of what remains, so dense ranges end up with more shards than
+    sparse ones. The first half restarts at the last block seen, since a
+    page key cannot be carried over to a narrower range, and the transfers
+    of that block already yielded are skipped by unique id.
+
+    :param fetch: Function fetching the page of an inclusive block range and
+        page key, returning its transfers and the next page key.
+    :param from_block: The first block of the range.
+    :param to_block: The last block of the range.
+    :param order: The order of the pages returned by `fetch`.
+    :param max_workers: The maximum number of pages fetched at once.
+    :param shard_size: Optional fixed number of blocks per shard, which
+        disables splitting by density.
+    :return: iterator of transfers
+    """
+    if from_block > to_block:
+        return
+    ranges = split_range(
+        from_block,
+        to_block,
+        -(-(to_block - from_block + 1) // shard_size) if shard_size else max_workers,
+    )
+    if order == 'desc':
+        ranges.reverse()
+    shards = [_Shard(start, end) for start, end in ranges]
+    max_buffered = BUFFERED_PAGES_PER_WORKER * max_workers
+    executor = ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix='alchemy-shard'
+    )
+
+    def schedule() -> None:
+        in_flight = sum(1 for shard in shards if shard.future is not None)
+        buffered = sum(len(shard.pages) for shard in shards)
+        for shard in shards:
+            if in_flight >= max_workers:
+                return
+            if shard is not shards[0] and buffered >= max_buffered:
+                return
+            if shard.future is None and not shard.done:
+                shard.future = executor.submit(
+                    contextvars.copy_context().run,
+                    fetch,
+                    shard.start,
+                    shard.end,
+                    shard.page_key,
+                )
+                in_flight += 1
+
+    def split(shard: _Shard, transfers: List[AssetTransfers]) -> bool:
+        # transfers of the page, including any already skipped
+        last = int(transfers[-1].block_num, 16)
+        if last == (shard.end if order == 'desc' else shard.start):
+            # restarting would fetch the same page again
+            return False
+        if order == 'desc':
+            if last - shard.start < 2 * MIN_SHARD_BLOCKS:
+                return False
+            middle = (shard.start + last + 1) // 2
+            rest = _Shard(shard.start, middle - 1)
+            shard.start, shard.end = middle, last
+        else:
+            if shard.end - last < 2 * MIN_SHARD_BLOCKS:
+                return False
+            middle = (last + shard.end) // 2
+            rest = _Shard(middle + 1, shard.end)
+            shard.start, shard.end = last, middle
+        shard.page_key = None
+        shard.skip = shard.skip | frozenset(
+            t.unique_id for t in transfers if int(t.block_num, 16) == last
+        )
+        shards.insert(shards.index(shard) + 1, rest)
+        return True
+
+    def collect(shard: _Shard) -> None:
+        future, shard.future = shard.future, None
+        transfers, page_key = future.result()
+        shard.pages.append([t for t in transfers if t.unique_id not in shard.skip])
+        if not page_key:
+            shard.done = True
+        elif (
+            shard_size
+            or not transfers
+            or sum(1 for s in shards if not s.done) >= max_workers
+            or not split(shard, transfers)
+        ):
+            shard.page_key = page_key
+
+    try:
+        while shards:
+            for shard in [s for s in shards if s.future and s.future.done()]:
+                collect(shard)
+            schedule()
+            head = shards[0]
+            if head.pages:
+                yield from head.pages.popleft()
+            elif head.done:
+                shards.pop(0)
+            else:
+                pending = [s.future for s in shards if s.future is not None]
+                wait(pending, return_when=FIRST_COMPLETED)
+    finally:
+        for shard in shards:
+            if shard.future is not None:
+                shard.future.cancel()
+        executor.shutdown(wait=False)
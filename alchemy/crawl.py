@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+from typing import Any, Callable, Dict, Generic, Iterator, Optional, TypeVar, Union
+
+from alchemy.exceptions import AlchemyError
+from alchemy.pagination import Page
+from alchemy.types import BlockIdentifier
+
+T = TypeVar('T')
+
+CHECKPOINT_VERSION = 1
+
+# fetches the page of a page key within an inclusive block range, which is
+# (None, None) for crawls without block ranges
+CrawlFetcher = Callable[[Optional[str], Optional[int], Optional[int]], Page[T]]
+
+
+def _block_number(block: BlockIdentifier) -> int:
+    if isinstance(block, int):
+        return block
+    if isinstance(block, str) and block.startswith('0x'):
+        return int(block, 16)
+    raise AlchemyError(f'Block {block} cannot be resolved without a client')
+
+
+class Checkpoint:
+    """
+    Crawl state persisted as a JSON file.
+
+    Writes are atomic: the state is written and synced to a temporary file in
+    the same directory, which then replaces the checkpoint, so a crash never
+    leaves a partially written checkpoint behind.
+
+    :var path: The path of the checkpoint file.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Initializes class attributes"""
+        self.path = os.path.expanduser(path)
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """
+        Returns the saved state, or None if there is no checkpoint.
+        """
+        try:
+            with open(self.path, encoding='utf-8') as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return None
+        except ValueError as err:
+            raise AlchemyError(f'Invalid checkpoint {self.path}: {err}') from err
+
+    def save(self, state: Dict[str, Any]) -> None:
+        directory, name = os.path.split(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(prefix=f'.{name}.', dir=directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as file:
+                json.dump(state, file)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def clear(self) -> None:
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class CrawlRunner(Generic[T]):
+    """
+    Resumable crawl of a paginated endpoint, persisting its cursor to a
+    checkpoint so that a crawl interrupted after hours resumes where it
+    stopped instead of starting over.
+
+    The cursor holds the page key of the current page, the block sub-range
+    it belongs to, the number of its items already yielded, and the number
+    of pages and items crawled so far. It is saved after each page, and
+    when the crawl stops early: the iterator is closed, or an exception
+    (including KeyboardInterrupt) ends the loop consuming it. Items yielded
+    before the stop are skipped on resume, so none is yielded twice. A
+    process killed outright resumes from the start of its last page.
+
+    Block ranges are crawled in ascending order, in sub-ranges of
+    `range_size` blocks when given, so that the cursor does not depend on a
+    single page key chain over the whole range. The end of the range is
+    resolved once, when the crawl starts, and kept in the checkpoint.
+
+        >>> crawl = alchemy.core.crawl_asset_transfers(
+        ...     'transfers.checkpoint', category=[AssetTransfersCategory.ERC20]
+        ... )
+        >>> for transfer in crawl:
+        ...     save(transfer)
+
+    :var fetch: Function fetching the page of a page key and block range.
+    :var checkpoint: The checkpoint the cursor is saved to.
+    :var query: The parameters of the crawl. A checkpoint saved for other
+        parameters is not resumed.
+    :var cursor: The current position of the crawl.
+    """
+
+    def __init__(
+        self,
+        fetch: CrawlFetcher,
+        checkpoint: Union[str, Checkpoint],
+        query: Dict[str, Any],
+        from_block: Optional[BlockIdentifier] = None,
+        to_block: Optional[BlockIdentifier] = None,
+        range_size: Optional[int] = None,
+        resolve_block: Optional[Callable[[BlockIdentifier], int]] = None,
+    ) -> None:
+        """Initializes class attributes"""
+        self.fetch = fetch
+        self.checkpoint = (
+            checkpoint if isinstance(checkpoint, Checkpoint) else Checkpoint(checkpoint)
+        )
+        self.query = json.loads(
+            json.dumps(
+                {**query, 'from_block': from_block, 'to_block': to_block}, default=str
+            )
+        )
+        self._from_block = from_block
+        self._to_block = to_block
+        self._range_size = range_size
+        self._resolve_block = resolve_block or _block_number
+        self.cursor: Optional[Dict[str, Any]] = None
+
+    def __iter__(self) -> Iterator[T]:
+        cursor = self.cursor = self._load_cursor()
+        while not cursor['done']:
+            items, page_key = self.fetch(
+                cursor['page_key'], cursor['from_block'], cursor['to_block']
+            )
+            try:
+                for item in items[cursor['offset'] :]:
+                    # counted before it is yielded, the consumer has it
+                    cursor['offset'] += 1
+                    cursor['items'] += 1
+                    yield item
+            except BaseException:
+                self.checkpoint.save(self._state())
+                raise
+            self._advance(page_key)
+            self.checkpoint.save(self._state())
+
+    def reset(self) -> None:
+        """
+        Deletes the checkpoint, so the next iteration starts over.
+        """
+        self.checkpoint.clear()
+        self.cursor = None
+
+    def _load_cursor(self) -> Dict[str, Any]:
+        state = self.checkpoint.load()
+        if state is not None:
+            if state.get('version') != CHECKPOINT_VERSION:
+                raise AlchemyError(
+                    f'Unsupported checkpoint version: {state.get("version")}'
+                )
+            if state['query'] != self.query:
+                raise AlchemyError(
+                    f'Checkpoint {self.checkpoint.path} was saved by another crawl'
+                )
+            return state['cursor']
+
+        cursor: Dict[str, Any] = {
+            'page_key': None,
+            'from_block': None,
+            'to_block': None,
+            'end_block': None,
+            'offset': 0,
+            'pages': 0,
+            'items': 0,
+            'done': False,
+        }
+        if self._from_block is not None or self._to_block is not None:
+            start = self._resolve_block(self._from_block or 0)
+            end = self._resolve_block(self._to_block or 'latest')
+            cursor['from_block'] = start
+            cursor['end_block'] = end
+            cursor['to_block'] = (
+                min(start + self._range_size - 1, end) if self._range_size else end
+            )
+            cursor['done'] = start > end
+        return cursor
+
+    def _advance(self, page_key: Optional[str]) -> None:
+        cursor = self.cursor
+        cursor['offset'] = 0
+        cursor['pages'] += 1
+        cursor['page_key'] = page_key
+        if page_key:
+            return
+        if cursor['to_block'] is not None and cursor['to_block'] < cursor['end_block']:
+            cursor['from_block'] = cursor['to_block'] + 1
+            cursor['to_block'] = min(
+                cursor['from_block'] + self._range_size - 1, cursor['end_block']
+            )
+        else:
+            cursor['done'] = True
+
+    def _state(self) -> Dict[str, Any]:
+        return {
+            'version': CHECKPOINT_VERSION,
+            'query': self.query,
+            'cursor': self.cursor,
+        }
@@ -1,22 +1,49 @@
 import random
-from typing import Any, Optional
+from typing import Any, Dict, Optional, Tuple
 
-import backoff as backoff
-import requests
-from requests import HTTPError
+from requests import HTTPError, RequestException, Response
 
 from alchemy.__version__ import __version__
 from alchemy.config import AlchemyConfig
 from alchemy.exceptions import AlchemyError
+from alchemy.hedging import NON_IDEMPOTENT_METHODS
+from alchemy.metrics import Measurement, track
+from alchemy.ratelimit import ComputeUnitLimiter
+from alchemy.recorder import current_recorder, api_method, api_request_key
+from alchemy.retry import DEFAULT_BACKOFF_MULTIPLIER, DEFAULT_MAX_DELAY, RetryPolicy
+from alchemy.streaming import JsonArrayStream
+from alchemy.transport import BaseTransport, HTTPTransport
 
-DEFAULT_BACKOFF_MULTIPLIER = 1.5
-DEFAULT_BACKOFF_MAX_DELAY_MS = 30 * 1000
+# deprecated, like DEFAULT_BACKOFF_MULTIPLIER, the backoff is configured by
+# RetryPolicy
+DEFAULT_BACKOFF_MAX_DELAY_MS = int(DEFAULT_MAX_DELAY * 1000)
+
+# used by post_request calls without a transport of their own
+DEFAULT_TRANSPORT = HTTPTransport()
+
+# per-call backoff options replaced by RetryPolicy
+BACKOFF_OPTIONS = ('wait_gen', 'jitter', 'backoff_multiplier')
 
 
 def jitter(value: float) -> float:
+    """
+    Deprecated, the backoff is configured by RetryPolicy.
+    """
     return min(value + (random.random() - 0.5) * value, DEFAULT_BACKOFF_MAX_DELAY_MS)
 
 
+def check_options(options: Dict[str, Any]) -> None:
+    """
+    Rejects the per-call backoff options, which RetryPolicy replaced.
+    """
+    for option in BACKOFF_OPTIONS:
+        if option in options:
+            raise AlchemyError(
+                f'The {option} option is no longer supported, '
+                'pass a RetryPolicy as retry_policy to the client instead'
+            )
+
+
 def parse_params(params):
     if not params:
         return None
@@ -30,49 +57,190 @@ def parse_params(params):
 def api_request(
     url: str, method_name: str, config: AlchemyConfig, **options: Any
 ) -> Any:
+    check_options(options)
+    # use_cache=False sends the call even if a cached response exists
+    cache = config.cache if options.get('use_cache', True) else None
+    if cache is not None:
+        cached = cache.get_api(url, options)
+        if cached is not None:
+            return config.codec.loads(cached)
+
+    recorder = current_recorder()
+    # recorded calls are measured by the provider sending them
+    metrics = config.metrics if recorder is None else None
+    with track(metrics, method_name) as measurement:
+        if recorder is not None:
+            response = recorder.replay_api(url, method_name, config, options)
+            if cache is not None:
+                cache.put_api(url, options, config.codec.dumps(response))
+            return response
+
+        def do_request():
+            return send_api_request(
+                url, method_name, config, options, measurement=measurement
+            ).content
+
+        try:
+            # calls with side effects or custom headers are never shared
+            if (
+                config.single_flight is not None
+                and api_method(url) not in NON_IDEMPOTENT_METHODS
+                and not options.get('headers')
+            ):
+                content = config.single_flight.do(
+                    api_request_key(url, options), do_request
+                )
+            else:
+                content = do_request()
+        except HTTPError as err:
+            raise AlchemyError(f'Response: {err.response.content}') from err
+        except RequestException as err:
+            raise AlchemyError(str(err)) from err
+        response = config.codec.loads(content)
+    if cache is not None:
+        cache.put_api(url, options, content)
+    return response
+
+
+def stream_api_request(
+    url: str,
+    method_name: str,
+    config: AlchemyConfig,
+    path: Tuple[str, ...],
+    **options: Any,
+) -> JsonArrayStream:
+    """
+    Sends a REST request and decodes the array at `path` of the response
+    while it is being received. The response is neither cached nor shared
+    with identical requests. Its metrics cover the request up to the
+    response headers, the size of the streamed body is not known.
+
+    :param url: The url to send the request to.
+    :param method_name: value of the `Alchemy-Python-Sdk-Method` header.
+    :param config: The config of the client.
+    :param path: The keys leading to the array in the response.
+    :return: JsonArrayStream
+    """
+    check_options(options)
+    with track(config.metrics, method_name) as measurement:
+        try:
+            response = send_api_request(
+                url, method_name, config, options, stream=True, measurement=measurement
+            )
+        except HTTPError as err:
+            raise AlchemyError(f'Response: {err.response.content}') from err
+        except RequestException as err:
+            raise AlchemyError(str(err)) from err
+    return JsonArrayStream(response, path, loads=config.codec.loads)
+
+
+def send_api_request(
+    url: str,
+    method_name: str,
+    config: AlchemyConfig,
+    options: Dict[str, Any],
+    stream: bool = False,
+    measurement: Optional[Measurement] = None,
+) -> Response:
     headers = {
         **options.get('headers', {}),
         'Alchemy-Python-Sdk-Method': method_name,
         'Alchemy-Python-Sdk-Version': __version__,
     }
+    # parse_params modifies its argument, which also keys cache and single-flight
+    params = parse_params(dict(options.get('params') or {}))
 
-    @backoff.on_exception(
-        wait_gen=options.get('wait_gen', backoff.expo),
-        exception=HTTPError,
-        jitter=options.get('jitter', jitter),
-        max_tries=config.max_retries,
-        factor=options.get('backoff_multiplier', DEFAULT_BACKOFF_MULTIPLIER),
-    )
-    def do_request(rest_method):
-        response = requests.request(
-            method=rest_method,
+    def send(url):
+        if config.rate_limiter is not None:
+            config.rate_limiter.acquire(api_method(url))
+        response = config.transport.request(
+            method=options.get('rest_method', 'GET'),
             url=url,
-            params=parse_params(options.get('params')),
+            params=params,
             json=options.get('data'),
             headers=headers,
             timeout=config.request_timeout,
+            stream=stream,
         )
-        response.raise_for_status()
-        return response.json()
-
-    try:
-        result = do_request(options.get('rest_method', 'GET'))
-    except HTTPError as err:
-        raise AlchemyError(f'Response: {err.response.content}') from err
-    return result
-
-
-def post_request(url: str, request_data: bytes, headers: dict, **options: Any) -> bytes:
-    @backoff.on_exception(
-        wait_gen=options.get('wait_gen', backoff.expo),
-        exception=HTTPError,
-        jitter=options.get('jitter', jitter),
-        max_tries=options.get('max_retries'),
-        factor=options.get('backoff_multiplier', DEFAULT_BACKOFF_MULTIPLIER),
-    )
-    def do_request():
-        response = requests.post(url, request_data, headers=headers)
-        response.raise_for_status()
-        return response.content
+        if measurement is not None:
+            request = response.request
+            measurement.transferred(
+                len(request.body or b'') if request is not None else 0,
+                None if stream else len(response.content),
+            )
+        return response
+
+    def send_with_retries(url):
+        endpoint = url.rsplit('/', 1)[0]
+        return config.retry_policy.call(
+            endpoint,
+            lambda: send(url),
+            on_retry=measurement.retried if measurement is not None else None,
+        )
+
+    def hedged(url):
+        # a streamed body is read after returning, too late to hedge it
+        if config.hedger is None or stream:
+            return send_with_retries(url)
+        return config.hedger.call(api_method(url), lambda: send_with_retries(url))
+
+    if config.router is None:
+        return hedged(url)
+    return config.router.call(url, hedged)
 
-    return do_request()
+
+def post_request(
+    url: str,
+    request_data: bytes,
+    headers: dict,
+    transport: Optional[BaseTransport] = None,
+    rate_limiter: Optional[ComputeUnitLimiter] = None,
+    methods: Tuple[str, ...] = (),
+    retry_policy: Optional[RetryPolicy] = None,
+    measurement: Optional[Measurement] = None,
+    **options: Any,
+) -> bytes:
+    return send_post_request(
+        url,
+        request_data,
+        headers,
+        transport=transport,
+        rate_limiter=rate_limiter,
+        methods=methods,
+        retry_policy=retry_policy,
+        measurement=measurement,
+        **options,
+    ).content
+
+
+def send_post_request(
+    url: str,
+    request_data: bytes,
+    headers: dict,
+    transport: Optional[BaseTransport] = None,
+    rate_limiter: Optional[ComputeUnitLimiter] = None,
+    methods: Tuple[str, ...] = (),
+    retry_policy: Optional[RetryPolicy] = None,
+    stream: bool = False,
+    measurement: Optional[Measurement] = None,
+    **options: Any,
+) -> Response:
+    check_options(options)
+    if transport is None:
+        transport = DEFAULT_TRANSPORT
+    if retry_policy is None:
+        retry_policy = RetryPolicy(max_attempts=options.get('max_retries') or 1)
+
+    def send():
+        if rate_limiter is not None:
+            rate_limiter.acquire(*methods)
+        response = transport.post(url, request_data, headers=headers, stream=stream)
+        if measurement is not None:
+            measurement.transferred(
+                len(request_data), None if stream else len(response.content)
+            )
+        return response
+
+    return retry_policy.call(
+        url, send, on_retry=measurement.retried if measurement is not None else None
+    )
@@ -2,3 +2,9 @@ class AlchemyError(Exception):
     """
     An error raised by the Alchemy.
     """
+
+
+class CircuitOpenError(AlchemyError):
+    """
+    Raised without sending the request while an endpoint is unhealthy.
+    """
@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+DEFAULT_HEDGE_PERCENTILE = 0.95
+DEFAULT_HEDGE_MIN_SAMPLES = 20
+DEFAULT_HEDGE_WINDOW = 200
+DEFAULT_HEDGE_MIN_DELAY = 0.01
+DEFAULT_HEDGE_MAX_WORKERS = 32
+
+# methods with side effects or server-side state, never sent twice
+NON_IDEMPOTENT_METHODS = frozenset(
+    {
+        'eth_sendRawTransaction',
+        'eth_sendTransaction',
+        'eth_sendPrivateTransaction',
+        'eth_cancelPrivateTransaction',
+        'eth_newFilter',
+        'eth_newBlockFilter',
+        'eth_newPendingTransactionFilter',
+        'eth_getFilterChanges',
+        'eth_getFilterLogs',
+        'eth_uninstallFilter',
+        'eth_subscribe',
+        'eth_unsubscribe',
+        'reingestContract',
+    }
+)
+
+
+class RequestHedger:
+    """
+    Cuts tail latency of idempotent read calls: when a call has not
+    completed after the observed `percentile` latency of its method, the
+    same request is sent a second time and whichever response arrives first
+    is used. The other one is cancelled if it has not started yet and
+    discarded otherwise.
+
+    Latencies are tracked per method over the last `window` calls; methods
+    with fewer than `min_samples` observations are not hedged.
+
+    Calls are run on a pool of `max_workers` threads. When the pool is busy,
+    calls run on the caller thread without hedging, so hedging never queues
+    requests behind each other.
+
+    :var percentile: The latency percentile after which a hedge is sent.
+    :var min_samples: The number of observations needed before hedging.
+    :var window: The number of recent latencies kept per method.
+    :var min_delay: The minimum number of seconds before a hedge is sent.
+    :var hedges: The number of hedge requests sent.
+    :var wins: The number of hedge requests answering first.
+    """
+
+    def __init__(
+        self,
+        percentile: float = DEFAULT_HEDGE_PERCENTILE,
+        min_samples: int = DEFAULT_HEDGE_MIN_SAMPLES,
+        window: int = DEFAULT_HEDGE_WINDOW,
+        min_delay: float = DEFAULT_HEDGE_MIN_DELAY,
+        max_workers: int = DEFAULT_HEDGE_MAX_WORKERS,
+    ) -> None:
+        """Initializes class attributes"""
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.window = window
+        self.min_delay = min_delay
+        self.hedges = 0
+        self.wins = 0
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='alchemy-hedge'
+        )
+
+    @staticmethod
+    def is_hedgeable(method: str) -> bool:
+        return method not in NON_IDEMPOTENT_METHODS
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns hedge counters and the current hedge delay of each method.
+        """
+        with self._lock:
+            methods = list(self._latencies)
+            stats: Dict[str, Any] = {'hedges': self.hedges, 'wins': self.wins}
+        stats['delays'] = {method: self.delay(method) for method in methods}
+        return stats
+
+    def observe(self, method: str, seconds: float) -> None:
+        with self._lock:
+            latencies = self._latencies.get(method)
+            if latencies is None:
+                latencies = self._latencies[method] = deque(maxlen=self.window)
+            latencies.append(seconds)
+
+    def delay(self, method: str) -> Optional[float]:
+        """
+        Returns the number of seconds after which a call of `method` is
+        hedged, or None if it is not hedged.
+        """
+        with self._lock:
+            latencies = sorted(self._latencies.get(method, ()))
+        if len(latencies) < self.min_samples:
+            return None
+        index = min(len(latencies) - 1, int(len(latencies) * self.percentile))
+        return max(latencies[index], self.min_delay)
+
+    def call(self, method: str, func: Callable[[], Any]) -> Any:
+        """
+        Calls `func`, hedging it with a second call if it is slow.
+
+        :param method: JSON-RPC or REST method name the latency is tracked for.
+        :param func: function sending the request and returning its response.
+        :return: the value of the first successful call
+        """
+        delay = self.delay(method) if self.is_hedgeable(method) else None
+        if delay is None or not self._slots.acquire(blocking=False):
+            return self._timed(method, func)
+
+        primary = self._submit(method, func)
+        done, _ = wait([primary], timeout=delay)
+        if done or not self._slots.acquire(blocking=False):
+            return primary.result()
+
+        with self._lock:
+            self.hedges += 1
+        hedge = self._submit(method, func)
+        pending = {primary, hedge}
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    self._settle(future is hedge, pending)
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    async def call_async(self, method: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Awaitable counterpart of `call`; the losing request is cancelled.
+        """
+        delay = self.delay(method) if self.is_hedgeable(method) else None
+        if delay is None:
+            return await self._timed_async(method, func)
+
+        primary = asyncio.ensure_future(self._timed_async(method, func))
+        pending = {primary}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if done:
+                return primary.result()
+            with self._lock:
+                self.hedges += 1
+            hedge = asyncio.ensure_future(self._timed_async(method, func))
+            pending.add(hedge)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        self._settle(task is hedge, pending)
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _settle(self, hedge_won: bool, pending: set) -> None:
+        if hedge_won:
+            with self._lock:
+                self.wins += 1
+        for other in pending:
+            other.cancel()
+
+    def _submit(self, method: str, func: Callable[[], Any]) -> Future:
+        # the slot is released once the call is done or cancelled
+        future = self._executor.submit(
+            contextvars.copy_context().run, self._timed, method, func
+        )
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def _timed(self, method: str, func: Callable[[], Any]) -> Any:
+        start = time.monotonic()
+        value = func()
+        self.observe(method, time.monotonic() - start)
+        return value
+
+    async def _timed_async(
+        self, method: str, func: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        start = time.monotonic()
+        value = await func()
+        self.observe(method, time.monotonic() - start)
+        return value
@@ -0,0 +1,300 @@
+from __future__ import annotations
+
+import bisect
+import contextlib
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from alchemy.exceptions import AlchemyError
+
+logger = logging.getLogger(__name__)
+
+# seconds
+DEFAULT_LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+# bytes
+DEFAULT_SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+Exporter = Callable[['Measurement'], None]
+
+
+class Histogram:
+    """
+    Distribution of observed values over fixed buckets.
+
+    :var buckets: The upper bounds of the buckets, in increasing order.
+    :var counts: The number of values per bucket, the last one being for
+        values above all bounds.
+    :var count: The number of observed values.
+    :var sum: The sum of observed values.
+    :var max: The largest observed value.
+    """
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        """Initializes class attributes"""
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Returns an upper bound of the `q` quantile, i.e. the bound of the
+        bucket holding it, or the largest value for the last bucket.
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def snapshot(self) -> Dict[str, Any]:
+        cumulative: Dict[str, int] = {}
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            cumulative[repr(bound)] = seen
+        cumulative['+Inf'] = self.count
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'max': self.max,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+            'buckets': cumulative,
+        }
+
+
+class MethodMetrics:
+    """
+    Metrics of the requests of one SDK method.
+
+    :var requests: The number of completed requests.
+    :var in_flight: The number of requests in progress.
+    :var retries: The number of retried attempts.
+    :var errors: The number of failed requests per error class.
+    :var latency: Histogram of request latencies in seconds.
+    :var request_bytes: Histogram of request body sizes, per attempt.
+    :var response_bytes: Histogram of response body sizes, per attempt.
+    """
+
+    def __init__(
+        self, latency_buckets: Sequence[float], size_buckets: Sequence[float]
+    ) -> None:
+        """Initializes class attributes"""
+        self.requests = 0
+        self.in_flight = 0
+        self.retries = 0
+        self.errors: Dict[str, int] = {}
+        self.latency = Histogram(latency_buckets)
+        self.request_bytes = Histogram(size_buckets)
+        self.response_bytes = Histogram(size_buckets)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'requests': self.requests,
+            'in_flight': self.in_flight,
+            'retries': self.retries,
+            'errors': dict(self.errors),
+            'latency': self.latency.snapshot(),
+            'request_bytes': self.request_bytes.snapshot(),
+            'response_bytes': self.response_bytes.snapshot(),
+        }
+
+
+class Measurement:
+    """
+    Observations made while serving one request, passed to exporters once
+    the request is complete.
+
+    :var name: The SDK method name, i.e. `Alchemy-Python-Sdk-Method` header
+        value, or the JSON-RPC method name when there is none.
+    :var latency: The number of seconds the request took.
+    :var retries: The number of retried attempts.
+    :var request_bytes: The sizes of the request bodies sent.
+    :var response_bytes: The sizes of the response bodies received.
+    :var error: The class of the error the request failed with, see
+        `classify_error`, or None on success.
+    """
+
+    def __init__(self, name: str) -> None:
+        """Initializes class attributes"""
+        self.name = name
+        self.latency = 0.0
+        self.retries = 0
+        self.request_bytes: List[int] = []
+        self.response_bytes: List[int] = []
+        self.error: Optional[str] = None
+
+    def retried(self) -> None:
+        self.retries += 1
+
+    def transferred(
+        self, request_bytes: int, response_bytes: Optional[int] = None
+    ) -> None:
+        """
+        Records the payload sizes of one attempt.
+
+        :param request_bytes: The size of the request body.
+        :param response_bytes: The size of the response body, None if it is
+            streamed to the caller.
+        """
+        self.request_bytes.append(request_bytes)
+        if response_bytes is not None:
+            self.response_bytes.append(response_bytes)
+
+
+class MetricsRegistry:
+    """
+    Per-method request metrics: latency histograms, in-flight gauges, retry
+    and error counters and payload sizes, keyed by SDK method name.
+
+    Metrics are pulled with `snapshot`, or pushed to exporters: callbacks
+    receiving the Measurement of each completed request, e.g. to feed
+    Prometheus or StatsD clients. Exporters are called on the thread that
+    made the request and their errors are logged, not raised.
+
+    :var latency_buckets: Upper bounds of the latency buckets in seconds.
+    :var size_buckets: Upper bounds of the payload size buckets in bytes.
+    :var exporters: The callbacks receiving each Measurement.
+    """
+
+    def __init__(
+        self,
+        latency_buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+        size_buckets: Sequence[float] = DEFAULT_SIZE_BUCKETS,
+        exporters: Optional[List[Exporter]] = None,
+    ) -> None:
+        """Initializes class attributes"""
+        self.latency_buckets = tuple(latency_buckets)
+        self.size_buckets = tuple(size_buckets)
+        self.exporters: List[Exporter] = list(exporters or [])
+        self._methods: Dict[str, MethodMetrics] = {}
+        self._lock = threading.Lock()
+
+    def add_exporter(self, exporter: Exporter) -> None:
+        self.exporters.append(exporter)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns the current metrics of each method.
+        """
+        with self._lock:
+            return {name: m.snapshot() for name, m in self._methods.items()}
+
+    def reset(self) -> None:
+        """
+        Clears all metrics, except the gauges of requests still in flight.
+        """
+        with self._lock:
+            in_flight = {n: m.in_flight for n, m in self._methods.items()}
+            self._methods.clear()
+            for name, count in in_flight.items():
+                if count:
+                    self._method(name).in_flight = count
+
+    @contextlib.contextmanager
+    def track(self, name: str) -> Iterator[Measurement]:
+        """
+        Measures the request made inside the `with` block.
+
+        :param name: The SDK method name the request is recorded under.
+        """
+        measurement = Measurement(name)
+        with self._lock:
+            self._method(name).in_flight += 1
+        start = time.monotonic()
+        try:
+            yield measurement
+        except BaseException as err:
+            measurement.error = classify_error(err)
+            raise
+        finally:
+            measurement.latency = time.monotonic() - start
+            self._finish(measurement)
+
+    def _finish(self, measurement: Measurement) -> None:
+        with self._lock:
+            metrics = self._method(measurement.name)
+            metrics.in_flight -= 1
+            metrics.requests += 1
+            metrics.retries += measurement.retries
+            if measurement.error is not None:
+                metrics.errors[measurement.error] = (
+                    metrics.errors.get(measurement.error, 0) + 1
+                )
+            metrics.latency.observe(measurement.latency)
+            for size in measurement.request_bytes:
+                metrics.request_bytes.observe(size)
+            for size in measurement.response_bytes:
+                metrics.response_bytes.observe(size)
+        for exporter in self.exporters:
+            try:
+                exporter(measurement)
+            except Exception:
+                logger.exception('Metrics exporter %r failed', exporter)
+
+    def _method(self, name: str) -> MethodMetrics:
+        metrics = self._methods.get(name)
+        if metrics is None:
+            metrics = self._methods[name] = MethodMetrics(
+                self.latency_buckets, self.size_buckets
+            )
+        return metrics
+
+
+@contextlib.contextmanager
+def track(registry: Optional[MetricsRegistry], name: str) -> Iterator[Measurement]:
+    """
+    Measures the request made inside the `with` block with `registry`, if
+    metrics are enabled.
+    """
+    if registry is None:
+        yield Measurement(name)
+        return
+    with registry.track(name) as measurement:
+        yield measurement
+
+
+def classify_error(err: BaseException) -> str:
+    """
+    Returns the class an error is counted under: `http_<status>` for HTTP
+    errors, `rpc_<code>` for JSON-RPC errors, the exception class otherwise.
+    The cause of an AlchemyError wrapping another error is classified.
+    """
+    cause = err.__cause__ if isinstance(err, AlchemyError) and err.__cause__ else err
+    status = getattr(cause, 'status', None)
+    response = getattr(cause, 'response', None)
+    if status is None and response is not None:
+        status = getattr(response, 'status_code', None)
+    if isinstance(status, int):
+        return f'http_{status}'
+    detail = cause.args[0] if cause.args else None
+    if isinstance(detail, dict) and 'code' in detail:
+        return f'rpc_{detail["code"]}'
+    return type(cause).__name__
@@ -1,7 +1,18 @@
 from __future__ import annotations
 
+from collections import OrderedDict
 from operator import itemgetter
-from typing import Optional, List, overload, Literal, Any, cast, Dict
+from typing import (
+    Optional,
+    List,
+    overload,
+    Literal,
+    Any,
+    cast,
+    Dict,
+    Iterator,
+    Tuple,
+)
 
 from web3 import Web3
 from web3.types import ENS
@@ -10,7 +21,9 @@ from alchemy.core import AlchemyCore
 from alchemy.core.models import AssetTransfers
 from alchemy.core.responses import AssetTransfersResponse
 from alchemy.core.types import AssetTransfersCategory
-from alchemy.dispatch import api_request
+from alchemy.concurrency import map_ordered
+from alchemy.crawl import Checkpoint, CrawlRunner
+from alchemy.dispatch import api_request, stream_api_request
 from alchemy.exceptions import AlchemyError
 from alchemy.nft.models import (
     Nft,
@@ -70,6 +83,7 @@ from alchemy.nft.types import (
     NftSaleTakerType,
     TransfersForOwnerTransferType,
 )
+from alchemy.pagination import DEFAULT_PREFETCH, Page, iter_items, iter_pages
 from alchemy.provider import AlchemyProvider
 from alchemy.types import (
     HexAddress,
@@ -85,6 +99,19 @@ from alchemy.utils import (
     get_checksum_address,
 )
 
+# the largest page size accepted by the NFT endpoints
+MAX_PAGE_SIZE = 100
+# the most tokens accepted by one getNFTMetadataBatch request
+MAX_METADATA_BATCH_SIZE = 100
+DEFAULT_METADATA_BATCH_WORKERS = 4
+# NFT metadata reused across pages of transfers
+TRANSFER_METADATA_CACHE_SIZE = 10000
+
+
+def _page_size(page_size: Optional[int], limit: Optional[int]) -> int:
+    size = min(page_size or MAX_PAGE_SIZE, MAX_PAGE_SIZE)
+    return max(1, min(size, limit)) if limit else size
+
 
 class AlchemyNFT:
     """
@@ -144,6 +171,7 @@ class AlchemyNFT:
         tokens: List[NftMetadataBatchToken],
         token_uri_timeout: Optional[int] = None,
         refresh_cache: bool = False,
+        max_workers: int = DEFAULT_METADATA_BATCH_WORKERS,
     ) -> NftMetadataBatchResponse:
         """
         Gets the NFT metadata for multiple NFT tokens.
@@ -155,9 +183,14 @@ class AlchemyNFT:
             live fetch any metadata for cache misses then set this value to 0.
         :param refresh_cache: Whether to refresh the metadata for the given NFT token before returning
             the response. Defaults to false for faster response times.
+        :param max_workers: Lists of more than 100 tokens are split into
+            requests of 100 tokens, sent at most `max_workers` at a time.
+            Defaults to 4.
         :return: NftMetadataBatchResponse
         """
-        return self._get_nft_metadata_batch(tokens, token_uri_timeout, refresh_cache)
+        return self._get_nft_metadata_batch(
+            tokens, token_uri_timeout, refresh_cache, max_workers=max_workers
+        )
 
     @overload
     def get_nfts_for_owner(
@@ -437,6 +470,97 @@ class AlchemyNFT:
             pageKey=page_key,
         )
 
+    def stream_nfts_for_contract(
+        self,
+        contract_address: HexAddress,
+        omit_metadata: bool = False,
+        page_key: Optional[str] = None,
+        page_size: Optional[int] = None,
+        token_uri_timeout: Optional[int] = None,
+    ) -> Iterator[Nft | BaseNft]:
+        """
+        Streaming counterpart of `get_nfts_for_contract`: NFTs are decoded and
+        yielded one at a time while each page is received, and following pages
+        are fetched until the last one, so large collections are iterated in
+        constant memory.
+
+        :param contract_address: The contract address of the NFT contract.
+        :param omit_metadata: Optional boolean flag to omit NFT metadata, in
+            which case BaseNft are yielded. Defaults to `False`.
+        :param page_key: Optional page key to start from.
+        :param page_size: Sets the number of NFTs per page.
+            Defaults to 100. Maximum page size is 100.
+        :param token_uri_timeout: The timeout (in milliseconds) for the website
+            hosting the metadata to respond, see `get_nfts_for_contract`.
+        :return: iterator of Nft or BaseNft
+        """
+        params = {
+            'contractAddress': contract_address,
+            'withMetadata': not omit_metadata,
+            'limit': page_size,
+        }
+        if token_uri_timeout:
+            params['tokenUriTimeoutInMs'] = token_uri_timeout
+        while True:
+            if page_key:
+                params['startToken'] = page_key
+            stream = stream_api_request(
+                url=f'{self.url}/getNFTsForContract',
+                method_name='streamNftsForContract',
+                path=('nfts',),
+                params=params,
+                config=self.provider.config,
+            )
+            for raw in stream:
+                if omit_metadata:
+                    yield BaseNft.from_dict(raw, contract_address)
+                else:
+                    yield Nft.from_dict(raw)
+            page_key = stream.document.get('pageKey')
+            if not page_key:
+                return
+
+    def stream_owners_for_contract(
+        self,
+        contract_address: HexAddress,
+        with_token_balances: bool = False,
+        block: Optional[str] = None,
+        page_key: Optional[str] = None,
+    ) -> Iterator[str | NftContractOwner]:
+        """
+        Streaming counterpart of `get_owners_for_contract`: owners are decoded
+        and yielded one at a time while each page is received, and following
+        pages are fetched until the last one.
+
+        :param contract_address: The NFT contract to get the owners for.
+        :param with_token_balances: Whether to yield NftContractOwner with the
+            token balances of each owner instead of addresses.
+        :param block: The block number to fetch owners for.
+        :param page_key: Optional page key to start from.
+        :return: iterator of owner addresses or NftContractOwner
+        """
+        while True:
+            stream = stream_api_request(
+                url=f'{self.url}/getOwnersForContract',
+                method_name='streamOwnersForContract',
+                path=('owners',),
+                params={
+                    'contractAddress': contract_address,
+                    'withTokenBalances': with_token_balances,
+                    'block': block,
+                    'pageKey': page_key,
+                },
+                config=self.provider.config,
+            )
+            for owner in stream:
+                if with_token_balances:
+                    yield NftContractOwner.from_dict(owner)
+                else:
+                    yield owner
+            page_key = stream.document.get('pageKey')
+            if not page_key:
+                return
+
     def get_contracts_for_owner(
         self,
         owner: HexAddress | ENS,
@@ -492,6 +616,182 @@ class AlchemyNFT:
         }
         return result
 
+    def iter_nfts_for_owner(
+        self,
+        owner: HexAddress | ENS,
+        omit_metadata: bool = False,
+        contract_addresses: Optional[List[HexAddress]] = None,
+        exclude_filters: Optional[List[NftFilters]] = None,
+        include_filters: Optional[List[NftFilters]] = None,
+        page_key: Optional[str] = None,
+        page_size: Optional[int] = None,
+        token_uri_timeout: Optional[int] = None,
+        order_by: Optional[NftOrdering] = None,
+        limit: Optional[int] = None,
+        prefetch: int = DEFAULT_PREFETCH,
+    ) -> Iterator[OwnedNft | OwnedBaseNft]:
+        """
+        Auto-paginating counterpart of `get_nfts_for_owner`: the NFTs of all
+        pages are yielded one at a time, and the next page is fetched in the
+        background while the caller processes the current one.
+
+        :param owner: The address of the owner.
+        :param omit_metadata: Optional boolean flag to omit NFT metadata, in
+            which case OwnedBaseNft are yielded. Defaults to `False`.
+        :param contract_addresses: Optional list of contract addresses to filter the results by.
+            Limit is 20.
+        :param exclude_filters: Optional list of filters applied to the query.
+        :param include_filters: Optional list of filters applied to the query.
+        :param page_key: Optional page key to start from.
+        :param page_size: Sets the number of NFTs per page.
+            Defaults to 100. Maximum page size is 100.
+        :param token_uri_timeout: The timeout (in milliseconds) for the website
+            hosting the metadata to respond, see `get_nfts_for_owner`.
+        :param order_by: Order in which to return results.
+        :param limit: Optional maximum number of NFTs to yield.
+        :param prefetch: The maximum number of pages fetched ahead of the one
+            being processed, 0 to fetch pages only when they are needed.
+        :return: iterator of OwnedNft or OwnedBaseNft
+        """
+
+        def fetch(key: Optional[str]) -> Page:
+            response = self._get_nfts_for_owner(
+                owner,
+                src_method='iterNftsForOwner',
+                omitMetadata=omit_metadata,
+                contractAddresses=contract_addresses,
+                excludeFilters=exclude_filters,
+                includeFilters=include_filters,
+                pageKey=key,
+                pageSize=_page_size(page_size, limit),
+                tokenUriTimeoutInMs=token_uri_timeout,
+                orderBy=order_by,
+            )
+            return response['owned_nfts'], response['page_key']
+
+        yield from iter_items(fetch, page_key, prefetch, limit)
+
+    def iter_nfts_for_contract(
+        self,
+        contract_address: HexAddress,
+        omit_metadata: bool = False,
+        page_key: Optional[str] = None,
+        page_size: Optional[int] = None,
+        token_uri_timeout: Optional[int] = None,
+        limit: Optional[int] = None,
+        prefetch: int = DEFAULT_PREFETCH,
+    ) -> Iterator[Nft | BaseNft]:
+        """
+        Auto-paginating counterpart of `get_nfts_for_contract`: the NFTs of
+        all pages are yielded one at a time, and the next page is fetched in
+        the background while the caller processes the current one.
+
+        :param contract_address: The contract address of the NFT contract.
+        :param omit_metadata: Optional boolean flag to omit NFT metadata, in
+            which case BaseNft are yielded. Defaults to `False`.
+        :param page_key: Optional page key to start from.
+        :param page_size: Sets the number of NFTs per page.
+            Defaults to 100. Maximum page size is 100.
+        :param token_uri_timeout: The timeout (in milliseconds) for the website
+            hosting the metadata to respond, see `get_nfts_for_contract`.
+        :param limit: Optional maximum number of NFTs to yield.
+        :param prefetch: The maximum number of pages fetched ahead of the one
+            being processed, 0 to fetch pages only when they are needed.
+        :return: iterator of Nft or BaseNft
+        """
+
+        def fetch(key: Optional[str]) -> Page:
+            response = self._get_nfts_for_contract(
+                contract_address,
+                src_method='iterNftsForContract',
+                omitMetadata=omit_metadata,
+                pageKey=key,
+                pageSize=_page_size(page_size, limit),
+                tokenUriTimeoutInMs=token_uri_timeout,
+            )
+            return response['nfts'], response['page_key']
+
+        yield from iter_items(fetch, page_key, prefetch, limit)
+
+    def iter_contracts_for_owner(
+        self,
+        owner: HexAddress | ENS,
+        exclude_filters: Optional[List[NftFilters]] = None,
+        include_filters: Optional[List[NftFilters]] = None,
+        page_key: Optional[str] = None,
+        page_size: Optional[int] = None,
+        order_by: Optional[NftOrdering] = None,
+        limit: Optional[int] = None,
+        prefetch: int = DEFAULT_PREFETCH,
+    ) -> Iterator[NftContractForOwner]:
+        """
+        Auto-paginating counterpart of `get_contracts_for_owner`: the
+        contracts of all pages are yielded one at a time, and the next page is
+        fetched in the background while the caller processes the current one.
+
+        :param owner:  Address for NFT owner (can be in ENS format!).
+        :param exclude_filters: Optional list of filters applied to the query.
+        :param include_filters: Optional list of filters applied to the query.
+        :param page_key: Optional page key to start from.
+        :param page_size: Sets the number of contracts per page.
+            Defaults to 100. Maximum page size is 100.
+        :param order_by: Order in which to return results.
+        :param limit: Optional maximum number of contracts to yield.
+        :param prefetch: The maximum number of pages fetched ahead of the one
+            being processed, 0 to fetch pages only when they are needed.
+        :return: iterator of NftContractForOwner
+        """
+
+        def fetch(key: Optional[str]) -> Page:
+            response = self.get_contracts_for_owner(
+                owner,
+                exclude_filters=exclude_filters,
+                include_filters=include_filters,
+                page_key=key,
+                page_size=_page_size(page_size, limit),
+                order_by=order_by,
+            )
+            return response['contracts'], response['page_key']
+
+        yield from iter_items(fetch, page_key, prefetch, limit)
+
+    def iter_owners_for_contract(
+        self,
+        contract_address: HexAddress,
+        with_token_balances: bool = False,
+        block: Optional[str] = None,
+        page_key: Optional[str] = None,
+        limit: Optional[int] = None,
+        prefetch: int = DEFAULT_PREFETCH,
+    ) -> Iterator[str | NftContractOwner]:
+        """
+        Auto-paginating counterpart of `get_owners_for_contract`: the owners
+        of all pages are yielded one at a time, and the next page is fetched
+        in the background while the caller processes the current one.
+
+        :param contract_address: The NFT contract to get the owners for.
+        :param with_token_balances: Whether to yield NftContractOwner with the
+            token balances of each owner instead of addresses.
+        :param block: The block number to fetch owners for.
+        :param page_key: Optional page key to start from.
+        :param limit: Optional maximum number of owners to yield.
+        :param prefetch: The maximum number of pages fetched ahead of the one
+            being processed, 0 to fetch pages only when they are needed.
+        :return: iterator of owner addresses or NftContractOwner
+        """
+
+        def fetch(key: Optional[str]) -> Page:
+            response = self._get_owners_for_contract(
+                contract_address,
+                src_method='iterOwnersForContract',
+                withTokenBalances=with_token_balances,
+                block=block,
+                pageKey=key,
+            )
+            return response['owners'], response['page_key']
+
+        yield from iter_items(fetch, page_key, prefetch, limit)
+
     def get_transfers_for_owner(
         self,
         owner: HexAddress | ENS,
@@ -514,20 +814,13 @@ class AlchemyNFT:
         :param page_key: Optional page key to use for pagination.
         :return: TransfersNftResponse
         """
-
-        params = {
-            'contract_addresses': contract_addresses,
-            'category': self._nft_token_type_to_category(token_type),
-            'max_count': 100,
-            'page_key': page_key,
-            'src_method': 'getTransfersForOwner',
-        }
-        if transfer_type == TransfersForOwnerTransferType.TO:
-            params['to_address'] = self.ens.address(owner) or owner
-        else:
-            params['from_address'] = self.ens.address(owner) or owner
-
-        response = self.core.get_asset_transfers(**params)
+        response = self.core.get_asset_transfers(
+            **self._transfers_for_owner_query(
+                owner, transfer_type, contract_addresses, token_type
+            ),
+            page_key=page_key,
+            src_method='getTransfersForOwner',
+        )
         return self._get_nfts_for_transfers(response)
 
     def get_transfers_for_contract(
@@ -553,12 +846,7 @@ class AlchemyNFT:
         :return: TransfersNftResponse
         """
         response = self.core.get_asset_transfers(
-            from_block=from_block,
-            to_block=to_block,
-            category=self._nft_token_type_to_category(),
-            contract_addresses=[contract],
-            order=order,
-            max_count=100,
+            **self._transfers_for_contract_query(contract, from_block, to_block, order),
             page_key=page_key,
             src_method='getTransfersForContract',
         )
@@ -585,16 +873,188 @@ class AlchemyNFT:
         :return: dict (list of TransferredNft, page_key)
         """
         response = self.core.get_asset_transfers(
-            from_address=ETH_NULL_ADDRESS,
-            to_address=self.ens.address(owner) or owner,
-            contract_addresses=contract_addresses,
-            category=self._nft_token_type_to_category(token_type),
-            max_count=100,
+            **self._minted_nfts_query(owner, contract_addresses, token_type),
             page_key=page_key,
             src_method='getMintedNfts',
         )
         return self._get_nfts_for_transfers(response)
 
+    def iter_transfers_for_owner(
+        self,
+        owner: HexAddress | ENS,
+        transfer_type: TransfersForOwnerTransferType,
+        contract_addresses: Optional[List[HexAddress]] = None,
+        token_type: Optional[
+            Literal[NftTokenType.ERC1155] | Literal[NftTokenType.ERC721]
+        ] = None,
+        page_key: Optional[str] = None,
+        prefetch: int = DEFAULT_PREFETCH,
+    ) -> Iterator[TransferredNft]:
+        """
+        Streaming counterpart of `get_transfers_for_owner`, see
+        `iter_transfers_for_contract`.
+
+        :param owner: The owner to get transfers for.
+        :param transfer_type: Whether to get transfers to or from the owner address.
+        :param contract_addresses: List of NFT contract addresses to filter transfers by.
+        :param token_type: Filter transfers by ERC721 vs ERC1155 contracts.
+        :param page_key: Optional page key to start from.
+        :param prefetch: The maximum number of transfer pages fetched ahead.
+        :return: iterator of TransferredNft
+        """
+        query = self._transfers_for_owner_query(
+            owner, transfer_type, contract_addresses, token_type
+        )
+        yield from self._iter_nfts_for_transfers(
+            query, 'iterTransfersForOwner', page_key, prefetch
+        )
+
+    def iter_transfers_for_contract(
+        self,
+        contract: HexAddress,
+        from_block: BlockIdentifier = 0x0,
+        to_block: BlockIdentifier = 'latest',
+        order: SortingOrder = 'asc',
+        page_key: Optional[str] = None,
+        prefetch: int = DEFAULT_PREFETCH,
+    ) -> Iterator[TransferredNft]:
+        """
+        Streaming counterpart of `get_transfers_for_contract`: the transfers of
+        all pages are yielded one at a time with their NFT metadata.
+
+        The two stages are pipelined: the next page of transfers is fetched in
+        the background while the metadata of the current page is loading.
+        Metadata is fetched once per token and reused when the same token is
+        transferred again on later pages.
+
+        :param contract: The NFT contract to get transfers for.
+        :param from_block: Starting block (inclusive) to get transfers from.
+        :param to_block: Ending block (inclusive) to get transfers from.
+        :param order: Whether to return results in ascending or descending order
+            by block number. Defaults to ascending if omitted.
+        :param page_key: Optional page key to start from.
+        :param prefetch: The maximum number of transfer pages fetched ahead.
+        :return: iterator of TransferredNft
+        """
+        query = self._transfers_for_contract_query(
+            contract, from_block, to_block, order
+        )
+        yield from self._iter_nfts_for_transfers(
+            query, 'iterTransfersForContract', page_key, prefetch
+        )
+
+    def iter_minted_nfts(
+        self,
+        owner: HexAddress | ENS,
+        contract_addresses: Optional[List[HexAddress]] = None,
+        token_type: Optional[
+            Literal[NftTokenType.ERC1155] | Literal[NftTokenType.ERC721]
+        ] = None,
+        page_key: Optional[str] = None,
+        prefetch: int = DEFAULT_PREFETCH,
+    ) -> Iterator[TransferredNft]:
+        """
+        Streaming counterpart of `get_minted_nfts`, see
+        `iter_transfers_for_contract`.
+
+        :param owner: Address for the NFT owner (can be in ENS format).
+        :param contract_addresses: List of NFT contract addresses to filter mints by.
+        :param token_type: Filter mints by ERC721 vs ERC1155 contracts.
+        :param page_key: Optional page key to start from.
+        :param prefetch: The maximum number of transfer pages fetched ahead.
+        :return: iterator of TransferredNft
+        """
+        query = self._minted_nfts_query(owner, contract_addresses, token_type)
+        yield from self._iter_nfts_for_transfers(
+            query, 'iterMintedNfts', page_key, prefetch
+        )
+
+    def crawl_transfers_for_contract(
+        self,
+        checkpoint: str | Checkpoint,
+        contract: HexAddress,
+        from_block: BlockIdentifier = 0x0,
+        to_block: BlockIdentifier = 'latest',
+        range_size: Optional[int] = None,
+    ) -> CrawlRunner[TransferredNft]:
+        """
+        Returns a resumable crawl of the NFT transfers of a contract, in
+        ascending block order. The crawl position is saved to the
+        `checkpoint` file after each page, and iterating the crawl again,
+        e.g. after a crash, resumes from it. See CrawlRunner.
+
+        :param checkpoint: The path of the checkpoint file.
+        :param contract: The NFT contract to get transfers for.
+        :param from_block: Starting block (inclusive) to get transfers from.
+        :param to_block: Ending block (inclusive) to get transfers from,
+            resolved when the crawl starts.
+        :param range_size: Optional number of blocks per sub-range.
+        :return: CrawlRunner
+        """
+        query = {
+            'method': 'getTransfersForContract',
+            'contract': contract,
+            'range_size': range_size,
+        }
+
+        def fetch(key: Optional[str], start: int, end: int) -> Page:
+            response = self.core.get_asset_transfers(
+                **self._transfers_for_contract_query(contract, start, end, 'asc'),
+                page_key=key,
+                src_method='crawlTransfersForContract',
+            )
+            nfts = self._get_nfts_for_transfers(response)
+            return nfts['nfts'], nfts['page_key']
+
+        return CrawlRunner(
+            fetch,
+            checkpoint,
+            query,
+            from_block=from_block,
+            to_block=to_block,
+            range_size=range_size,
+            resolve_block=self.core._block_number,
+        )
+
+    def crawl_owners_for_contract(
+        self,
+        checkpoint: str | Checkpoint,
+        contract_address: HexAddress,
+        with_token_balances: bool = False,
+        block: Optional[str] = None,
+    ) -> CrawlRunner[str | NftContractOwner]:
+        """
+        Returns a resumable crawl of the owners of an NFT contract. The crawl
+        position is saved to the `checkpoint` file after each page, and
+        iterating the crawl again, e.g. after a crash, resumes from it. See
+        CrawlRunner.
+
+        :param checkpoint: The path of the checkpoint file.
+        :param contract_address: The NFT contract to get the owners for.
+        :param with_token_balances: Whether to yield NftContractOwner with the
+            token balances of each owner instead of addresses.
+        :param block: The block number to fetch owners for.
+        :return: CrawlRunner
+        """
+        query = {
+            'method': 'getOwnersForContract',
+            'contract_address': contract_address,
+            'with_token_balances': with_token_balances,
+            'block': block,
+        }
+
+        def fetch(key: Optional[str], start: Optional[int], end: Optional[int]) -> Page:
+            response = self._get_owners_for_contract(
+                contract_address,
+                src_method='crawlOwnersForContract',
+                withTokenBalances=with_token_balances,
+                block=block,
+                pageKey=key,
+            )
+            return response['owners'], response['page_key']
+
+        return CrawlRunner(fetch, checkpoint, query)
+
     def get_nft_sales(
         self,
         contract_address: Optional[HexAddress] = None,
@@ -752,6 +1212,7 @@ class AlchemyNFT:
         :param token_id: The token id of the NFT.
         :return: bool
         """
+        # a cached response could predate an earlier refresh
         first = self._get_nft_metadata(
             contract_address=contract_address,
             token_id=token_id,
@@ -759,6 +1220,7 @@ class AlchemyNFT:
             refresh_cache=False,
             token_type=None,
             token_uri_timeout=None,
+            use_cache=False,
         )
         second = self._get_nft_metadata(
             contract_address=contract_address,
@@ -826,9 +1288,89 @@ class AlchemyNFT:
                 result[nft.contract_address] = True
         return result
 
+    def _transfers_for_owner_query(
+        self,
+        owner: HexAddress | ENS,
+        transfer_type: TransfersForOwnerTransferType,
+        contract_addresses: Optional[List[HexAddress]],
+        token_type: Optional[NftTokenType],
+    ) -> Dict[str, Any]:
+        query = {
+            'contract_addresses': contract_addresses,
+            'category': self._nft_token_type_to_category(token_type),
+            'max_count': 100,
+        }
+        if transfer_type == TransfersForOwnerTransferType.TO:
+            query['to_address'] = self.ens.address(owner) or owner
+        else:
+            query['from_address'] = self.ens.address(owner) or owner
+        return query
+
+    def _transfers_for_contract_query(
+        self,
+        contract: HexAddress,
+        from_block: BlockIdentifier,
+        to_block: BlockIdentifier,
+        order: SortingOrder,
+    ) -> Dict[str, Any]:
+        return {
+            'from_block': from_block,
+            'to_block': to_block,
+            'category': self._nft_token_type_to_category(),
+            'contract_addresses': [contract],
+            'order': order,
+            'max_count': 100,
+        }
+
+    def _minted_nfts_query(
+        self,
+        owner: HexAddress | ENS,
+        contract_addresses: Optional[List[HexAddress]],
+        token_type: Optional[NftTokenType],
+    ) -> Dict[str, Any]:
+        return {
+            'from_address': ETH_NULL_ADDRESS,
+            'to_address': self.ens.address(owner) or owner,
+            'contract_addresses': contract_addresses,
+            'category': self._nft_token_type_to_category(token_type),
+            'max_count': 100,
+        }
+
+    def _iter_nfts_for_transfers(
+        self,
+        query: Dict[str, Any],
+        src_method: str,
+        page_key: Optional[str],
+        prefetch: int,
+    ) -> Iterator[TransferredNft]:
+        def fetch(key: Optional[str]) -> Page:
+            response = self.core.get_asset_transfers(
+                **query, page_key=key, src_method=src_method
+            )
+            return response['transfers'], response['page_key']
+
+        # (contract address, token id) -> Nft, least recently used first
+        metadata: OrderedDict[Tuple[str, str], Nft] = OrderedDict()
+        pages = iter_pages(fetch, page_key, prefetch)
+        try:
+            for transfers, next_key in pages:
+                response = self._get_nfts_for_transfers(
+                    {'transfers': transfers, 'page_key': next_key}, metadata
+                )
+                yield from response['nfts']
+        finally:
+            pages.close()
+
     def _get_nfts_for_transfers(
-        self, response: AssetTransfersResponse
+        self,
+        response: AssetTransfersResponse,
+        metadata: Optional[OrderedDict[Tuple[str, str], Nft]] = None,
     ) -> TransfersNftResponse:
+        """
+        Fetches the metadata of the NFTs of a page of transfers. When a
+        `metadata` cache is given, only tokens missing from it are fetched.
+        """
+
         def parse_transfers(transfers: List[AssetTransfers]):
             for transfer in transfers:
                 if not transfer.raw_contract.address:
@@ -865,14 +1407,41 @@ class AlchemyNFT:
             return {'nfts': [], 'page_key': response['page_key']}
 
         tokens = list(map(itemgetter('token'), metadata_transfers))
-        nfts: NftMetadataBatchResponse = self._get_nft_metadata_batch(tokens)
+        if metadata is None:
+            nfts = self._get_nft_metadata_batch(tokens)['nfts']
+        else:
+            nfts = self._get_cached_nft_metadata(tokens, metadata)
         transferred_nfts = []
-        for nft, transfer in zip(nfts['nfts'], metadata_transfers):
+        for nft, transfer in zip(nfts, metadata_transfers):
             transferred_nfts.append(
                 TransferredNft.from_dict({**nft.to_dict(), **transfer['metadata']})
             )
         return {'nfts': transferred_nfts, 'page_key': response['page_key']}
 
+    def _get_cached_nft_metadata(
+        self,
+        tokens: List[Dict[str, Any]],
+        metadata: OrderedDict[Tuple[str, str], Nft],
+    ) -> List[Nft]:
+        keys = [
+            (token['contractAddress'].lower(), str(token['tokenId']))
+            for token in tokens
+        ]
+        missing: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for key, token in zip(keys, tokens):
+            if key not in metadata:
+                missing.setdefault(key, token)
+        if missing:
+            response = self._get_nft_metadata_batch(list(missing.values()))
+            metadata.update(zip(missing, response['nfts']))
+        nfts = []
+        for key in keys:
+            metadata.move_to_end(key)
+            nfts.append(metadata[key])
+        while len(metadata) > TRANSFER_METADATA_CACHE_SIZE:
+            metadata.popitem(last=False)
+        return nfts
+
     @staticmethod
     def _nft_token_type_to_category(
         token_type: Optional[NftTokenType] = None,
@@ -896,6 +1465,7 @@ class AlchemyNFT:
         token_uri_timeout: Optional[int],
         refresh_cache: bool,
         src_method: str = 'getNftMetadata',
+        use_cache: bool = True,
     ) -> Nft:
         params = {
             'contractAddress': contract_address,
@@ -913,6 +1483,7 @@ class AlchemyNFT:
             method_name=src_method,
             params=params,
             config=self.provider.config,
+            use_cache=use_cache,
         )
         return Nft.from_dict(response)
 
@@ -922,22 +1493,37 @@ class AlchemyNFT:
         token_uri_timeout: Optional[int] = None,
         refresh_cache: bool = False,
         src_method: str = 'getNftMetadataBatch',
+        max_workers: int = DEFAULT_METADATA_BATCH_WORKERS,
     ) -> NftMetadataBatchResponse:
         tokens_new = []
         for token in tokens:
             tokens_new.append(dict_keys_to_camel(token))
-        data = {'tokens': tokens_new, 'refreshCache': refresh_cache}
-        if token_uri_timeout:
-            data['tokenUriTimeoutInMs'] = token_uri_timeout
 
-        response: RawNftMetadataBatchResponse = api_request(
-            url=f'{self.url}/getNFTMetadataBatch',
-            method_name=src_method,
-            config=self.provider.config,
-            data=data,
-            rest_method='POST',
-        )
-        return {'nfts': [Nft.from_dict(raw_nft) for raw_nft in response['nfts']]}
+        def fetch(chunk: List[Dict[str, Any]]) -> List[Nft]:
+            data = {'tokens': chunk, 'refreshCache': refresh_cache}
+            if token_uri_timeout:
+                data['tokenUriTimeoutInMs'] = token_uri_timeout
+            response: RawNftMetadataBatchResponse = api_request(
+                url=f'{self.url}/getNFTMetadataBatch',
+                method_name=src_method,
+                config=self.provider.config,
+                data=data,
+                rest_method='POST',
+            )
+            return [Nft.from_dict(raw_nft) for raw_nft in response['nfts']]
+
+        chunks = [
+            tokens_new[start : start + MAX_METADATA_BATCH_SIZE]
+            for start in range(0, len(tokens_new), MAX_METADATA_BATCH_SIZE)
+        ]
+        if len(chunks) <= 1:
+            return {'nfts': fetch(tokens_new)}
+        nfts = []
+        for chunk_nfts in map_ordered(
+            fetch, chunks, max_workers, thread_name_prefix='alchemy-metadata'
+        ):
+            nfts += chunk_nfts
+        return {'nfts': nfts}
 
     def _get_nfts_for_owner(
         self,
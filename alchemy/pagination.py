@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import contextvars
+import threading
+from collections import deque
+from typing import Callable, Deque, Iterator, List, Optional, Tuple, TypeVar
+
+T = TypeVar('T')
+
+# one page of results and the key of the next page, None on the last page
+Page = Tuple[List[T], Optional[str]]
+PageFetcher = Callable[[Optional[str]], Page[T]]
+
+DEFAULT_PREFETCH = 1
+
+
+class _Prefetcher:
+    """
+    Fetches pages on a background thread, at most `depth` pages ahead of
+    the consumer. Pages, and the error that stopped the fetching if any, are
+    handed over in order.
+    """
+
+    def __init__(
+        self,
+        fetch: PageFetcher,
+        page_key: Optional[str],
+        depth: int,
+        limit: Optional[int],
+    ) -> None:
+        """Initializes class attributes"""
+        self.fetch = fetch
+        self.depth = depth
+        self.limit = limit
+        self._pages: Deque[Tuple[Optional[Page], Optional[BaseException]]] = deque()
+        self._condition = threading.Condition()
+        self._closed = False
+        # fetches see the context variables set when the first page is
+        # requested
+        threading.Thread(
+            target=contextvars.copy_context().run,
+            args=(self._run, page_key),
+            name='alchemy-prefetch',
+            daemon=True,
+        ).start()
+
+    def get(self) -> Page:
+        with self._condition:
+            while not self._pages:
+                self._condition.wait()
+            page, err = self._pages.popleft()
+            self._condition.notify_all()
+        if err is not None:
+            raise err
+        return page
+
+    def close(self) -> None:
+        """
+        Stops fetching; a fetch in progress completes and is discarded.
+        """
+        with self._condition:
+            self._closed = True
+            self._pages.clear()
+            self._condition.notify_all()
+
+    def _run(self, page_key: Optional[str]) -> None:
+        fetched = 0
+        while True:
+            with self._condition:
+                while len(self._pages) >= self.depth and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+            try:
+                items, page_key = self.fetch(page_key)
+            except BaseException as err:
+                self._put(None, err)
+                return
+            fetched += len(items)
+            if self.limit is not None and fetched >= self.limit:
+                page_key = None
+            self._put((items, page_key), None)
+            if not page_key:
+                return
+
+    def _put(self, page: Optional[Page], err: Optional[BaseException]) -> None:
+        with self._condition:
+            if not self._closed:
+                self._pages.append((page, err))
+                self._condition.notify_all()
+
+
+def iter_pages(
+    fetch: PageFetcher,
+    page_key: Optional[str] = None,
+    prefetch: int = DEFAULT_PREFETCH,
+    limit: Optional[int] = None,
+) -> Iterator[Page[T]]:
+    """
+    Follows page keys from `page_key` to the last page, yielding each page
+    with the key of the page after it.
+
+    Following pages are fetched on a background thread while the caller
+    processes the current one, so iterating does not wait a full round trip
+    between pages. Fetching stops when the generator is closed, e.g. when
+    the caller breaks out of its loop.
+
+    :param fetch: Function fetching the page of a page key, None for the
+        first page, and returning its items and the next page key.
+    :param page_key: Optional page key to start from.
+    :param prefetch: The maximum number of pages fetched ahead of the one
+        being processed. 0 fetches each page when it is needed.
+    :param limit: Optional number of items after which no more pages are
+        fetched; the last page yielded then has no next page key.
+    :return: iterator of (items, next page key)
+    """
+    if prefetch <= 0:
+        fetched = 0
+        while True:
+            items, page_key = fetch(page_key)
+            fetched += len(items)
+            if limit is not None and fetched >= limit:
+                page_key = None
+            yield items, page_key
+            if not page_key:
+                return
+
+    prefetcher = _Prefetcher(fetch, page_key, prefetch, limit)
+    try:
+        while True:
+            items, page_key = prefetcher.get()
+            yield items, page_key
+            if not page_key:
+                return
+    finally:
+        prefetcher.close()
+
+
+def iter_items(
+    fetch: PageFetcher,
+    page_key: Optional[str] = None,
+    prefetch: int = DEFAULT_PREFETCH,
+    limit: Optional[int] = None,
+) -> Iterator[T]:
+    """
+    Yields the items of all pages, see `iter_pages`.
+
+    :param limit: Optional maximum number of items yielded.
+    :return: iterator of items
+    """
+    if limit is not None and limit <= 0:
+        return
+    count = 0
+    pages = iter_pages(fetch, page_key, prefetch, limit)
+    try:
+        for items, _ in pages:
+            for item in items:
+                yield item
+                count += 1
+                if limit is not None and count >= limit:
+                    return
+    finally:
+        pages.close()
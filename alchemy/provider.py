@@ -6,20 +6,28 @@ import json
 import logging
 import threading
 import uuid
-from typing import Any, Union, Optional, Callable, List
+from typing import Any, Union, Optional, Callable, List, Tuple, TypeVar
 
 import backoff
 import websockets
-from requests import HTTPError
+from requests import RequestException
 from web3.providers import JSONBaseProvider
 from web3.types import RPCEndpoint, RPCResponse
 
 from alchemy.__version__ import __version__
+from alchemy.batch import BatchDispatcher
+from alchemy.codec import get_codec
 from alchemy.config import AlchemyConfig
-from alchemy.dispatch import post_request
+from alchemy.dispatch import post_request, send_post_request
 from alchemy.exceptions import AlchemyError
+from alchemy.hedging import NON_IDEMPOTENT_METHODS
+from alchemy.metrics import Measurement, track
+from alchemy.recorder import current_recorder, request_key
+from alchemy.streaming import JsonArrayStream
 from alchemy.types import AlchemyApiType
 
+T = TypeVar('T')
+
 
 class AlchemyProvider(JSONBaseProvider):
     """
@@ -27,14 +35,35 @@ class AlchemyProvider(JSONBaseProvider):
 
     :var config: current config of Alchemy object
     :var url: base connection url
+    :var dispatcher: batch dispatcher combining calls from concurrent threads,
+        enabled by setting `batch_window` on the config
     """
 
     def __init__(self, config: AlchemyConfig) -> None:
         """Initializes class attributes"""
         self.config = config
         self.url = config.get_request_url(AlchemyApiType.BASE)
+        self.dispatcher: Optional[BatchDispatcher] = None
+        if config.batch_window is not None:
+            self.dispatcher = BatchDispatcher(
+                self,
+                window=config.batch_window,
+                max_size=config.batch_window_size or config.max_batch_size,
+            )
+        if config.cache is not None and config.cache.resolve_head is None:
+            config.cache.resolve_head = lambda: self.make_request(
+                'eth_blockNumber', []
+            )['result']
         super().__init__()
 
+    def close(self) -> None:
+        """
+        Stops the batch dispatcher. The transport is left open, since it may
+        be shared with other clients.
+        """
+        if self.dispatcher is not None:
+            self.dispatcher.close()
+
     def make_request(
         self,
         method: Union[RPCEndpoint, str],
@@ -43,9 +72,48 @@ class AlchemyProvider(JSONBaseProvider):
         headers: Optional[dict] = None,
         **options: Any,
     ) -> RPCResponse:
+        cache = self.config.cache
+        if cache is not None:
+            cached = cache.get_rpc(self.url, method, params)
+            if cached is not None:
+                return self.decode_rpc_response(cached)
+
+        raw_response = None
+        recorder = current_recorder()
+        # recorded calls are measured by the provider sending them
+        metrics = self.config.metrics if recorder is None else None
+        with track(metrics, method_name or method) as measurement:
+            if recorder is not None:
+                response = recorder.replay(method, params, method_name, headers)
+            elif self.dispatcher is not None and not headers:
+                response = self.dispatcher.submit(method, params)
+            else:
+                raw_response = self._send(
+                    method, params, method_name, headers, measurement, **options
+                )
+                response = self.decode_rpc_response(raw_response)
+
+            if response.get('error'):
+                raise AlchemyError(response.get('error', 'Unknown error'))
+        if cache is not None:
+            if raw_response is None:
+                raw_response = self.config.codec.dumps(response)
+            cache.put_rpc(self.url, method, params, response, raw_response)
+        return response
+
+    def _send(
+        self,
+        method: Union[RPCEndpoint, str],
+        params: List[Any],
+        method_name: Optional[str],
+        headers: Optional[dict],
+        measurement: Optional[Measurement] = None,
+        **options: Any,
+    ) -> bytes:
+        # calls with side effects or custom headers are never shared
+        shareable = method not in NON_IDEMPOTENT_METHODS and not headers
         if headers is None:
             headers = {}
-        options['max_retries'] = self.config.max_retries
 
         request_data = self.encode_rpc_request(method, params)  # type: ignore
         headers = {
@@ -53,15 +121,183 @@ class AlchemyProvider(JSONBaseProvider):
             'Alchemy-Python-Sdk-Method': method_name,
             'Alchemy-Python-Sdk-Version': __version__,
         }
+
+        def send(url: str) -> bytes:
+            return post_request(
+                url,
+                request_data,
+                headers,
+                transport=self.config.transport,
+                rate_limiter=self.config.rate_limiter,
+                retry_policy=self.config.retry_policy,
+                methods=(method,),
+                measurement=measurement,
+                **options,
+            )
+
+        def hedged(url: str) -> bytes:
+            if self.config.hedger is None:
+                return send(url)
+            return self.config.hedger.call(method, lambda: send(url))
+
+        def request() -> bytes:
+            return self._route(hedged)
+
         try:
-            raw_response = post_request(self.url, request_data, headers, **options)
-            response = self.decode_rpc_response(raw_response)
-        except HTTPError as err:
+            if self.config.single_flight is not None and shareable:
+                return self.config.single_flight.do(
+                    (self.url, *request_key(method, params)), request
+                )
+            return request()
+        except RequestException as err:
             raise AlchemyError(str(err)) from err
 
-        if response.get('error'):
-            raise AlchemyError(response.get('error', 'Unknown error'))
-        return response
+    def stream_request(
+        self,
+        method: Union[RPCEndpoint, str],
+        params: List[Any],
+        path: Tuple[str, ...],
+        method_name: Optional[str] = None,
+        headers: Optional[dict] = None,
+    ) -> JsonArrayStream:
+        """
+        Sends a JSON-RPC call and decodes the array at `path` of its response
+        while it is being received, e.g. `('result', 'receipts')`. The
+        response is neither cached, batched nor shared with identical calls.
+        Its metrics cover the call up to the response headers, the size of
+        the streamed body is not known.
+
+        :param method: JSON-RPC method name.
+        :param params: JSON-RPC params.
+        :param path: The keys leading to the array in the response.
+        :param method_name: value of the `Alchemy-Python-Sdk-Method` header.
+        :param headers: The optional headers to pass.
+        :return: JsonArrayStream
+        """
+        request_data = self.encode_rpc_request(method, params)  # type: ignore
+        headers = {
+            **(headers or {}),
+            'Alchemy-Python-Sdk-Method': method_name,
+            'Alchemy-Python-Sdk-Version': __version__,
+        }
+        with track(self.config.metrics, method_name or method) as measurement:
+            try:
+                response = self._route(
+                    lambda url: send_post_request(
+                        url,
+                        request_data,
+                        headers,
+                        transport=self.config.transport,
+                        rate_limiter=self.config.rate_limiter,
+                        retry_policy=self.config.retry_policy,
+                        methods=(method,),
+                        stream=True,
+                        measurement=measurement,
+                    )
+                )
+            except RequestException as err:
+                raise AlchemyError(str(err)) from err
+        return JsonArrayStream(response, path, loads=self.config.codec.loads)
+
+    def make_batch_request(
+        self,
+        requests: List[Tuple[Union[RPCEndpoint, str], List[Any]]],
+        method_name: Optional[str] = 'batch',
+        headers: Optional[dict] = None,
+        max_batch_size: Optional[int] = None,
+        **options: Any,
+    ) -> List[RPCResponse]:
+        """
+        Sends several JSON-RPC calls as batches and returns their responses in
+        the order of `requests`. Batches larger than `max_batch_size` (defaults
+        to `config.max_batch_size`) are split into several HTTP requests.
+
+        Unlike `make_request`, errors of individual calls are not raised; each
+        response carries either a `result` or an `error`.
+
+        :param requests: list of (method, params) pairs.
+        :param method_name: value of the `Alchemy-Python-Sdk-Method` header.
+        :param headers: The optional headers to pass.
+        :param max_batch_size: The maximum number of calls per HTTP request.
+        :return: list of RPCResponse
+        """
+        if headers is None:
+            headers = {}
+        max_batch_size = max_batch_size or self.config.max_batch_size
+        headers = {
+            **headers,
+            'Alchemy-Python-Sdk-Method': method_name,
+            'Alchemy-Python-Sdk-Version': __version__,
+        }
+
+        responses: List[RPCResponse] = []
+        for start in range(0, len(requests), max_batch_size):
+            chunk = requests[start : start + max_batch_size]
+            ids = [next(self.request_counter) for _ in chunk]
+            request_data = self.encode_batch_rpc_request(chunk, ids)
+            with track(self.config.metrics, method_name or 'batch') as measurement:
+                try:
+                    raw_response = self._route(
+                        lambda url: post_request(
+                            url,
+                            request_data,
+                            headers,
+                            transport=self.config.transport,
+                            rate_limiter=self.config.rate_limiter,
+                            retry_policy=self.config.retry_policy,
+                            methods=tuple(method for method, _ in chunk),
+                            measurement=measurement,
+                            **options,
+                        )
+                    )
+                    decoded = self.decode_rpc_response(raw_response)
+                except RequestException as err:
+                    raise AlchemyError(str(err)) from err
+
+            if not isinstance(decoded, list):
+                raise AlchemyError(decoded.get('error', 'Unknown error'))
+            by_id = {item.get('id'): item for item in decoded}
+            for request_id in ids:
+                responses.append(
+                    by_id.get(
+                        request_id,
+                        {
+                            'jsonrpc': '2.0',
+                            'id': request_id,
+                            'error': 'Missing response in batch',
+                        },
+                    )
+                )
+        return responses
+
+    def encode_rpc_request(self, method: Union[RPCEndpoint, str], params: Any) -> bytes:
+        return self.config.codec.dumps(
+            {
+                'jsonrpc': '2.0',
+                'method': method,
+                'params': params or [],
+                'id': next(self.request_counter),
+            }
+        )
+
+    def decode_rpc_response(self, raw_response: bytes) -> RPCResponse:
+        return self.config.codec.loads(raw_response)
+
+    def _route(self, send: Callable[[str], T]) -> T:
+        if self.config.router is None:
+            return send(self.url)
+        return self.config.router.call(self.url, send)
+
+    def encode_batch_rpc_request(
+        self,
+        requests: List[Tuple[Union[RPCEndpoint, str], List[Any]]],
+        ids: List[int],
+    ) -> bytes:
+        batch = [
+            {'jsonrpc': '2.0', 'method': method, 'params': params or [], 'id': rid}
+            for (method, params), rid in zip(requests, ids)
+        ]
+        return self.config.codec.dumps(batch)
 
 
 class AlchemyWebsocketProvider:
@@ -76,26 +312,32 @@ class AlchemyWebsocketProvider:
         heartbeat_timeout: Optional[int] = 10,
     ):
         self.uri = config.get_request_url(AlchemyApiType.WSS)
+        self.codec = get_codec(getattr(config, 'codec', None))
         self.request_counter = itertools.count()
         self.connection = None
         self.subscriptions: List[Subscription] = []
-        self.loop = asyncio.new_event_loop()
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
         self.heartbeat_interval = heartbeat_interval
         self.heartbeat_timeout = heartbeat_timeout
+        self._connect_lock = threading.Lock()
 
         log_format = "%(asctime)s - %(levelname)s - %(message)s"
         logging.basicConfig(level=logging.INFO, format=log_format)
         self.logger = logging.getLogger(__name__)
 
-        self.connect()
-
     def connect(self):
         """
         Connects to the Alchemy WebSocket server if not already connected.
+
+        The connection is not opened when the provider is created. It is
+        opened by the first subscription, or by calling this method explicitly.
         """
-        if not self.connection:
-            self.loop.run_until_complete(self._establish_connection())
-            threading.Thread(target=self._run_event_loop, daemon=True).start()
+        with self._connect_lock:
+            if not self.connection:
+                if self.loop is None:
+                    self.loop = asyncio.new_event_loop()
+                self.loop.run_until_complete(self._establish_connection())
+                threading.Thread(target=self._run_event_loop, daemon=True).start()
 
     def _run_event_loop(self):
         asyncio.set_event_loop(self.loop)
@@ -110,7 +352,7 @@ class AlchemyWebsocketProvider:
             try:
                 message = await self.connection.recv()
                 try:
-                    data = json.loads(message)
+                    data = self.codec.loads(message)
                 except json.JSONDecodeError as e:
                     self.logger.error(f'Error decoding JSON: {e}')
                     continue
@@ -186,7 +428,8 @@ class AlchemyWebsocketProvider:
         for subscription in self.subscriptions:
             subscription.unsubscribe()
 
-        self.loop.call_soon_threadsafe(self.loop.stop)
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.loop.stop)
 
     def subscribe(self, event_type, handler, **params) -> "Subscription":
         """
@@ -197,6 +440,7 @@ class AlchemyWebsocketProvider:
         :param params: Additional parameters for the event subscription.
         :return: A Subscription instance.
         """
+        self.connect()
         virtual_id = str(uuid.uuid4())
         subscription = Subscription(
             self,
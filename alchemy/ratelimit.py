@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+DEFAULT_COMPUTE_UNITS = 26
+
+# compute units charged by Alchemy per JSON-RPC or REST method
+COMPUTE_UNITS: Dict[str, int] = {
+    'eth_chainId': 0,
+    'net_version': 0,
+    'eth_blockNumber': 10,
+    'eth_feeHistory': 10,
+    'eth_maxPriorityFeePerGas': 10,
+    'eth_getTransactionReceipt': 15,
+    'eth_getBlockByNumber': 16,
+    'eth_getStorageAt': 17,
+    'eth_getTransactionByHash': 17,
+    'eth_gasPrice': 19,
+    'eth_getBalance': 19,
+    'eth_getCode': 19,
+    'eth_getBlockByHash': 21,
+    'eth_call': 26,
+    'eth_getTransactionCount': 26,
+    'eth_getLogs': 75,
+    'eth_estimateGas': 87,
+    'eth_sendRawTransaction': 250,
+    'alchemy_getTokenMetadata': 10,
+    'alchemy_getTokenBalances': 19,
+    'alchemy_getAssetTransfers': 150,
+    'alchemy_getTransactionReceipts': 250,
+    'getNFTMetadata': 80,
+    'getNFTMetadataBatch': 80,
+    'getContractMetadata': 80,
+    'getContractMetadataBatch': 80,
+    'getOwnersForNFT': 80,
+    'getFloorPrice': 100,
+    'getNFTSales': 100,
+    'getSpamContracts': 100,
+    'isSpamContract': 100,
+    'computeRarity': 100,
+    'summarizeNFTAttributes': 100,
+    'searchContractMetadata': 100,
+    'reingestContract': 100,
+    'getNFTsForOwner': 480,
+    'getNFTsForContract': 480,
+    'getOwnersForContract': 480,
+    'getContractsForOwner': 480,
+}
+
+
+class ComputeUnitLimiter:
+    """
+    Token bucket limiting the compute units spent per second, so that calls
+    are delayed on the client instead of being rejected with 429 by the
+    server.
+
+    Each request reserves the compute units of its method; when the bucket
+    is empty, the caller sleeps until the units are refilled. Reservations
+    are served in order, so callers are queued rather than starved. A single
+    limiter can be shared by several clients to enforce one budget.
+
+    :var compute_units_per_second: The rate at which the bucket refills.
+    :var burst: The capacity of the bucket. Defaults to one second of units.
+    :var costs: Compute units by JSON-RPC or REST method name.
+    :var default_cost: Compute units of methods missing from `costs`.
+    :var delayed: The number of requests that had to wait.
+    :var wait_time: The total number of seconds requests waited.
+    """
+
+    def __init__(
+        self,
+        compute_units_per_second: float,
+        burst: Optional[float] = None,
+        costs: Optional[Dict[str, int]] = None,
+        default_cost: int = DEFAULT_COMPUTE_UNITS,
+    ) -> None:
+        """Initializes class attributes"""
+        self.compute_units_per_second = compute_units_per_second
+        self.burst = burst if burst is not None else compute_units_per_second
+        self.costs: Dict[str, int] = {**COMPUTE_UNITS, **(costs or {})}
+        self.default_cost = default_cost
+        self.delayed = 0
+        self.wait_time = 0.0
+        self._tokens = self.burst
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def cost(self, methods: Iterable[str]) -> int:
+        """
+        Returns the compute units of one request made of the given calls.
+
+        :param methods: JSON-RPC or REST method names, several for a batch.
+        """
+        return sum(self.costs.get(method, self.default_cost) for method in methods)
+
+    def reserve(self, compute_units: float) -> float:
+        """
+        Takes `compute_units` from the bucket and returns the number of
+        seconds the caller has to wait before sending its request.
+        """
+        if compute_units <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst,
+                self._tokens + (now - self._updated_at) * self.compute_units_per_second,
+            )
+            self._updated_at = now
+            self._tokens -= compute_units
+            if self._tokens >= 0:
+                return 0.0
+            delay = -self._tokens / self.compute_units_per_second
+            self.delayed += 1
+            self.wait_time += delay
+            return delay
+
+    def acquire(self, *methods: str) -> None:
+        """
+        Blocks until the compute units of the given calls are available.
+        """
+        delay = self.reserve(self.cost(methods))
+        if delay:
+            time.sleep(delay)
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import json
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from web3.types import RPCResponse
+
+_recorder: ContextVar[Optional[RequestRecorder]] = ContextVar(
+    'alchemy_request_recorder', default=None
+)
+
+
+def request_key(method: str, params: Any) -> Tuple[str, str]:
+    """
+    Returns a hashable key identifying a JSON-RPC call by method and params.
+    """
+    return method, json.dumps(
+        params, sort_keys=True, separators=(',', ':'), default=str
+    )
+
+
+def api_request_key(url: str, options: Dict[str, Any]) -> Tuple[str, str]:
+    """
+    Returns a hashable key identifying a REST call by url, HTTP method,
+    query params and body.
+    """
+    return url, json.dumps(
+        [options.get('rest_method', 'GET'), options.get('params'), options.get('data')],
+        sort_keys=True,
+        separators=(',', ':'),
+        default=str,
+    )
+
+
+def api_method(url: str) -> str:
+    """
+    Returns the REST method name of an NFT API url, e.g. `getNFTsForOwner`.
+    """
+    return urlsplit(url).path.rsplit('/', 1)[-1]
+
+
+class PendingRequest(BaseException):
+    """
+    Raised from inside the provider while a call is being recorded and its
+    response is not known yet.
+
+    Derives from BaseException so that it is not swallowed by generic
+    `except Exception` handlers between the namespace method and the provider.
+
+    :var key: key under which the response is recorded
+    :var method_name: value of the `Alchemy-Python-Sdk-Method` header
+    """
+
+    def __init__(self, key: Tuple[str, str], method_name: Optional[str]) -> None:
+        super().__init__(key[0])
+        self.key = key
+        self.method_name = method_name
+
+
+class PendingRpcRequest(PendingRequest):
+    """
+    A JSON-RPC call waiting for its response.
+    """
+
+    def __init__(
+        self,
+        method: str,
+        params: Any,
+        method_name: Optional[str] = None,
+        headers: Optional[dict] = None,
+    ) -> None:
+        super().__init__(request_key(method, params), method_name)
+        self.method = method
+        self.params = params
+        self.headers = headers
+
+
+class PendingApiRequest(PendingRequest):
+    """
+    A REST call of the NFT API waiting for its response.
+    """
+
+    def __init__(
+        self, url: str, method_name: str, config: Any, options: Dict[str, Any]
+    ) -> None:
+        super().__init__(api_request_key(url, options), method_name)
+        self.url = url
+        self.config = config
+        self.options = options
+
+
+class RequestRecorder:
+    """
+    Answers provider calls from already fetched responses and raises
+    PendingRequest for the first call whose response is still unknown.
+    """
+
+    def __init__(self) -> None:
+        self.responses: Dict[Tuple[str, str], Any] = {}
+
+    def replay(
+        self,
+        method: str,
+        params: Any,
+        method_name: Optional[str] = None,
+        headers: Optional[dict] = None,
+    ) -> RPCResponse:
+        try:
+            return self.responses[request_key(method, params)]
+        except KeyError:
+            raise PendingRpcRequest(method, params, method_name, headers) from None
+
+    def replay_api(
+        self, url: str, method_name: str, config: Any, options: Dict[str, Any]
+    ) -> Any:
+        try:
+            return self.responses[api_request_key(url, options)]
+        except KeyError:
+            raise PendingApiRequest(url, method_name, config, options) from None
+
+    def record(self, request: PendingRequest, response: Any) -> None:
+        self.responses[request.key] = response
+
+
+def recording(recorder: RequestRecorder, func: Callable[[], Any]) -> Any:
+    """
+    Calls `func` with provider requests answered by `recorder`.
+
+    :raises PendingRequest: for the first request not answered yet.
+    """
+    token = _recorder.set(recorder)
+    try:
+        return func()
+    finally:
+        _recorder.reset(token)
+
+
+def current_recorder() -> Optional[RequestRecorder]:
+    return _recorder.get()
@@ -0,0 +1,324 @@
+from __future__ import annotations
+
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Iterator, Optional
+
+import requests
+
+from alchemy.exceptions import CircuitOpenError
+
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_BACKOFF_MULTIPLIER = 1.5
+DEFAULT_MAX_DELAY = 30.0
+DEFAULT_RETRY_BUDGET = 60.0
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RESET_TIMEOUT = 30.0
+
+# statuses worth retrying, any other error status is fatal
+RETRYABLE_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+RETRYABLE_EXCEPTIONS = (
+    requests.ConnectionError,
+    requests.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+)
+
+_fail_fast: ContextVar[bool] = ContextVar('alchemy_retry_fail_fast', default=False)
+
+
+def jitter(value: float) -> float:
+    return value + (random.random() - 0.5) * value
+
+
+@contextmanager
+def fail_fast() -> Iterator[None]:
+    """
+    Gives up failed calls started within the block after their first
+    attempt, e.g. while the caller can fail over to another endpoint
+    instead of retrying this one.
+    """
+    token = _fail_fast.set(True)
+    try:
+        yield
+    finally:
+        _fail_fast.reset(token)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parses a `Retry-After` header given in seconds or as an HTTP date.
+
+    :return: the number of seconds to wait, or None if missing or invalid
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    """
+    Fails calls fast while an endpoint is unhealthy.
+
+    After `failure_threshold` consecutive failures the circuit opens and
+    calls raise CircuitOpenError without being sent. Once `reset_timeout`
+    seconds have passed, a single probe call is let through: its success
+    closes the circuit, its failure opens it again.
+
+    :var failure_threshold: The number of consecutive failures opening it.
+    :var reset_timeout: The number of seconds before a probe call is sent.
+    :var failures: The current number of consecutive failures.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        reset_timeout: float = DEFAULT_RESET_TIMEOUT,
+    ) -> None:
+        """Initializes class attributes"""
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None
+
+    def before_call(self, endpoint: str) -> None:
+        """
+        :raises CircuitOpenError: if the call must not be sent.
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return
+            waited = time.monotonic() - self._opened_at
+            if self._probing or waited < self.reset_timeout:
+                raise CircuitOpenError(
+                    f'Circuit open for {endpoint} after {self.failures} failures'
+                )
+            self._probing = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self._probing or self.failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+    def record_abort(self) -> None:
+        # a call ended without an outcome, e.g. cancelled, lets another probe
+        # through
+        with self._lock:
+            self._probing = False
+
+
+class RetryState:
+    """
+    Retry bookkeeping of a single call, see `RetryPolicy.start`.
+
+    :var attempt: The number of attempts started so far.
+    :var waited: The number of seconds spent waiting between attempts.
+    :var fail_fast: Whether the call was started within `fail_fast`.
+    """
+
+    def __init__(self, policy: RetryPolicy, endpoint: str) -> None:
+        """Initializes class attributes"""
+        self.policy = policy
+        self.endpoint = endpoint
+        self.breaker = policy.breaker(endpoint)
+        self.attempt = 0
+        self.waited = 0.0
+        self.fail_fast = _fail_fast.get()
+
+    def begin(self) -> None:
+        """
+        Starts an attempt.
+
+        :raises CircuitOpenError: if the endpoint's circuit is open.
+        """
+        self.breaker.before_call(self.endpoint)
+        self.attempt += 1
+
+    def succeeded(self) -> None:
+        self.breaker.record_success()
+
+    def aborted(self, err: BaseException) -> None:
+        """
+        Records an attempt that raised an error which is not retried, so that
+        a probe call never stays in flight. Errors count as failures, while
+        cancellations and interrupts only end the probe.
+        """
+        if isinstance(err, Exception):
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_abort()
+
+    def failed(
+        self, status: Optional[int] = None, retry_after: Optional[str] = None
+    ) -> Optional[float]:
+        """
+        Records a failed attempt and decides whether to retry it.
+
+        :param status: HTTP status of the response, None for connection
+            errors and timeouts.
+        :param retry_after: `Retry-After` header of the response.
+        :return: seconds to wait before the next attempt, or None to give up
+        """
+        policy = self.policy
+        # throttling and client errors still prove the endpoint is up
+        if status is None or status >= 500:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        if status is not None and status not in policy.retryable_statuses:
+            return None
+        if self.fail_fast or self.attempt >= policy.max_attempts:
+            return None
+        delay = parse_retry_after(retry_after)
+        if delay is None:
+            delay = policy.backoff(self.attempt)
+        if self.waited + delay > policy.retry_budget:
+            return None
+        self.waited += delay
+        return delay
+
+
+class RetryPolicy:
+    """
+    Decides which failed requests are retried and when.
+
+    - connection errors, timeouts and the statuses in `retryable_statuses`
+      are retried, any other error is raised at once,
+    - the wait between attempts follows the `Retry-After` header if present,
+      an exponential backoff with jitter otherwise,
+    - a call gives up after `max_attempts` attempts or once the waits would
+      exceed `retry_budget` seconds,
+    - each endpoint has a CircuitBreaker failing calls fast while it keeps
+      answering with server errors or not answering at all.
+
+    A policy is stateless apart from its circuit breakers, so one instance
+    can be shared by all namespaces of a client, or by several clients.
+
+    :var max_attempts: The maximum number of attempts per call.
+    :var backoff_multiplier: The first backoff wait in seconds, doubled on
+        each subsequent attempt.
+    :var max_delay: The maximum backoff wait in seconds.
+    :var retry_budget: The maximum number of seconds a call waits in total.
+    :var retryable_statuses: HTTP statuses that are retried.
+    :var failure_threshold: Consecutive failures opening an endpoint's circuit.
+    :var reset_timeout: Seconds before an open circuit lets a probe through.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        backoff_multiplier: float = DEFAULT_BACKOFF_MULTIPLIER,
+        max_delay: float = DEFAULT_MAX_DELAY,
+        retry_budget: float = DEFAULT_RETRY_BUDGET,
+        retryable_statuses: frozenset = RETRYABLE_STATUSES,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        reset_timeout: float = DEFAULT_RESET_TIMEOUT,
+    ) -> None:
+        """Initializes class attributes"""
+        self.max_attempts = max_attempts
+        self.backoff_multiplier = backoff_multiplier
+        self.max_delay = max_delay
+        self.retry_budget = retry_budget
+        self.retryable_statuses = retryable_statuses
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def breaker(self, endpoint: str) -> CircuitBreaker:
+        """
+        Returns the circuit breaker of an endpoint.
+        """
+        with self._lock:
+            breaker = self._breakers.get(endpoint)
+            if breaker is None:
+                breaker = self._breakers[endpoint] = CircuitBreaker(
+                    self.failure_threshold, self.reset_timeout
+                )
+            return breaker
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Returns the wait after the given failed attempt, without Retry-After.
+        """
+        delay = self.backoff_multiplier * 2 ** (attempt - 1)
+        return min(jitter(delay), self.max_delay)
+
+    def start(self, endpoint: str) -> RetryState:
+        """
+        Starts retry bookkeeping for a call to `endpoint`.
+        """
+        return RetryState(self, endpoint)
+
+    def call(
+        self,
+        endpoint: str,
+        send: Callable[[], requests.Response],
+        on_retry: Optional[Callable[[], None]] = None,
+    ) -> requests.Response:
+        """
+        Calls `send` until it returns a successful response or the policy
+        gives up.
+
+        :param endpoint: The endpoint whose circuit breaker is used.
+        :param send: function sending one attempt of the request.
+        :param on_retry: function called before each retried attempt.
+        :return: the successful response
+        :raises requests.HTTPError: for the last failed response.
+        :raises requests.RequestException: for the last connection error.
+        :raises CircuitOpenError: if the endpoint's circuit is open.
+        """
+        state = self.start(endpoint)
+        while True:
+            state.begin()
+            try:
+                response = send()
+            except RETRYABLE_EXCEPTIONS:
+                delay = state.failed()
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                if on_retry is not None:
+                    on_retry()
+                continue
+            except BaseException as err:
+                state.aborted(err)
+                raise
+            if response.status_code < 400:
+                state.succeeded()
+                return response
+            delay = state.failed(
+                response.status_code, response.headers.get('Retry-After')
+            )
+            if delay is None:
+                response.raise_for_status()
+            # releases the connection of a streamed response
+            response.close()
+            time.sleep(delay)
+            if on_retry is not None:
+                on_retry()
@@ -0,0 +1,327 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+import time
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+import requests
+
+from alchemy.exceptions import AlchemyError, CircuitOpenError
+from alchemy.retry import fail_fast
+from alchemy.types import AlchemyApiType, Network
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    aiohttp = None
+
+T = TypeVar('T')
+
+DEFAULT_DRAIN_THRESHOLD = 0.5
+DEFAULT_DRAIN_TIMEOUT = 30.0
+# smoothing factor of the latency and error rate moving averages
+EWMA_ALPHA = 0.2
+# latency assumed for endpoints that have not answered yet
+MIN_LATENCY = 0.01
+
+# statuses that another endpoint may not return, e.g. a revoked api key
+FAILOVER_STATUSES = frozenset({401, 403, 408, 425, 429})
+
+CONNECTION_ERRORS: Tuple[type, ...] = (
+    requests.RequestException,
+    OSError,
+    asyncio.TimeoutError,
+)
+if aiohttp is not None:
+    CONNECTION_ERRORS += (aiohttp.ClientError,)
+
+
+class Endpoint:
+    """
+    One upstream a client can send requests to: an Alchemy app given by its
+    api key and network, or a hardcoded url such as a self-hosted node.
+
+    :var api_key: The API key of the Alchemy app.
+    :var network: The network of the Alchemy app.
+    :var url: The optional hardcoded URL used instead of api_key and network.
+    :var weight: The relative share of requests sent to this endpoint.
+    :var apis: The API types served by the endpoint, all by default. A
+        self-hosted node typically only serves `AlchemyApiType.BASE`.
+    :var latency: Moving average of successful request latencies in seconds.
+    :var error_rate: Moving average of the share of failed requests.
+    :var requests: The number of requests sent to the endpoint.
+    :var failures: The number of requests that failed.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        network: Optional[Network] = None,
+        url: Optional[str] = None,
+        weight: float = 1.0,
+        apis: Optional[Iterable[AlchemyApiType]] = None,
+    ) -> None:
+        """Initializes class attributes"""
+        self.api_key = api_key
+        self.network = network
+        self.url = url
+        self.weight = weight
+        self.apis = frozenset(apis) if apis is not None else None
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.requests = 0
+        self.failures = 0
+        self.drained_until = 0.0
+
+    def __repr__(self) -> str:
+        return f'Endpoint({self.url or self.network!s}, weight={self.weight})'
+
+    def serves(self, api_type: AlchemyApiType) -> bool:
+        return self.apis is None or api_type in self.apis
+
+    def get_request_url(self, api_type: AlchemyApiType) -> str:
+        if self.url:
+            return self.url
+        elif api_type == AlchemyApiType.NFT:
+            return f'https://{self.network}.g.alchemy.com/nft/v3/{self.api_key}'
+        elif api_type == AlchemyApiType.BASE:
+            return f'https://{self.network}.g.alchemy.com/v2/{self.api_key}'
+        elif api_type == AlchemyApiType.WSS:
+            return f'wss://{self.network}.g.alchemy.com/v2/{self.api_key}'
+        else:
+            raise AlchemyError(f'Wrong api_type: {api_type}')
+
+
+class EndpointRouter:
+    """
+    Spreads requests over several endpoints and fails over between them.
+
+    Each request goes to an endpoint picked at random, with a probability
+    proportional to its weight, divided by its observed latency and
+    scaled down by its error rate. When the request fails with a
+    connection error, a server error, throttling or an authorization
+    error, it is sent to the next best endpoint. Other client errors are
+    raised, since every endpoint would answer them the same way.
+
+    An endpoint is drained, i.e. only used once all others failed, while
+    its circuit breaker is open or for `drain_timeout` seconds after its
+    error rate exceeded `drain_threshold`.
+
+    The retry policy only retries a request on the last endpoint; on the
+    others a failed attempt fails over to the next endpoint at once.
+
+    :var endpoints: The endpoints to route to.
+    :var retry_policy: The RetryPolicy whose circuit breakers are consulted.
+    :var drain_threshold: The error rate above which an endpoint is drained.
+    :var drain_timeout: The number of seconds an endpoint stays drained.
+    :var failovers: The number of requests sent to a fallback endpoint.
+    """
+
+    def __init__(
+        self,
+        endpoints: List[Endpoint],
+        retry_policy: Any = None,
+        drain_threshold: float = DEFAULT_DRAIN_THRESHOLD,
+        drain_timeout: float = DEFAULT_DRAIN_TIMEOUT,
+    ) -> None:
+        """Initializes class attributes"""
+        if not endpoints:
+            raise AlchemyError('At least one endpoint is required')
+        self.endpoints = endpoints
+        self.retry_policy = retry_policy
+        self.drain_threshold = drain_threshold
+        self.drain_timeout = drain_timeout
+        self.failovers = 0
+        self._lock = threading.Lock()
+
+    def get_request_url(self, api_type: AlchemyApiType) -> str:
+        """
+        Returns the url of the first endpoint serving `api_type`. Requests
+        built on it are rerouted to other endpoints by `call`.
+        """
+        for endpoint in self.endpoints:
+            if endpoint.serves(api_type):
+                return endpoint.get_request_url(api_type)
+        raise AlchemyError(f'No endpoint serves api_type: {api_type}')
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """
+        Returns the observed health of each endpoint.
+        """
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    'endpoint': repr(endpoint),
+                    'requests': endpoint.requests,
+                    'failures': endpoint.failures,
+                    'latency': endpoint.latency,
+                    'error_rate': endpoint.error_rate,
+                    'drained': endpoint.drained_until > now,
+                }
+                for endpoint in self.endpoints
+            ]
+
+    def route(self, url: str) -> List[Tuple[Optional[Endpoint], str]]:
+        """
+        Returns the endpoints to try for a request to `url`, in order, with
+        the url rewritten for each of them.
+
+        :param url: url built on the first endpoint, see `get_request_url`.
+        """
+        api_type, suffix = self._parse(url)
+        if api_type is None:
+            return [(None, url)]
+        endpoints = [e for e in self.endpoints if e.serves(api_type)]
+        now = time.monotonic()
+        healthy, drained = [], []
+        for endpoint in endpoints:
+            base_url = endpoint.get_request_url(api_type)
+            if self._is_drained(endpoint, base_url, now):
+                drained.append(endpoint)
+            else:
+                healthy.append(endpoint)
+
+        ordered = sorted(healthy, key=self._score, reverse=True)
+        if len(ordered) > 1:
+            first = random.choices(ordered, [self._score(e) for e in ordered])[0]
+            ordered.remove(first)
+            ordered.insert(0, first)
+        ordered += sorted(drained, key=self._score, reverse=True)
+        return [(e, e.get_request_url(api_type) + suffix) for e in ordered]
+
+    def call(self, url: str, func: Callable[[str], T]) -> T:
+        """
+        Calls `func` with the url of each routed endpoint until it succeeds.
+
+        :param url: url built on the first endpoint.
+        :param func: function sending the request to the given url.
+        :return: the value of the first successful call
+        """
+        error: Optional[BaseException] = None
+        routes = self.route(url)
+        for attempt, (endpoint, endpoint_url) in enumerate(routes):
+            self._count_failover(attempt)
+            start = time.monotonic()
+            try:
+                if attempt < len(routes) - 1:
+                    with fail_fast():
+                        value = func(endpoint_url)
+                else:
+                    value = func(endpoint_url)
+            except Exception as err:
+                if endpoint is None or not is_failover_error(err):
+                    raise
+                self.record(endpoint, None)
+                error = err
+                continue
+            if endpoint is not None:
+                self.record(endpoint, time.monotonic() - start)
+            return value
+        raise error
+
+    async def call_async(self, url: str, func: Callable[[str], Awaitable[T]]) -> T:
+        """
+        Awaitable counterpart of `call`.
+        """
+        error: Optional[BaseException] = None
+        routes = self.route(url)
+        for attempt, (endpoint, endpoint_url) in enumerate(routes):
+            self._count_failover(attempt)
+            start = time.monotonic()
+            try:
+                if attempt < len(routes) - 1:
+                    with fail_fast():
+                        value = await func(endpoint_url)
+                else:
+                    value = await func(endpoint_url)
+            except Exception as err:
+                if endpoint is None or not is_failover_error(err):
+                    raise
+                self.record(endpoint, None)
+                error = err
+                continue
+            if endpoint is not None:
+                self.record(endpoint, time.monotonic() - start)
+            return value
+        raise error
+
+    def record(self, endpoint: Endpoint, latency: Optional[float]) -> None:
+        """
+        Records the outcome of a request.
+
+        :param endpoint: The endpoint the request was sent to.
+        :param latency: The latency of a successful request, None on failure.
+        """
+        failed = latency is None
+        with self._lock:
+            endpoint.requests += 1
+            endpoint.failures += failed
+            endpoint.error_rate += EWMA_ALPHA * (failed - endpoint.error_rate)
+            if not failed:
+                endpoint.latency = (
+                    latency
+                    if endpoint.latency is None
+                    else endpoint.latency + EWMA_ALPHA * (latency - endpoint.latency)
+                )
+            if endpoint.error_rate > self.drain_threshold:
+                endpoint.drained_until = time.monotonic() + self.drain_timeout
+                # give the endpoint a fresh start once the drain is over
+                endpoint.error_rate = 0.0
+
+    def _count_failover(self, attempt: int) -> None:
+        if attempt:
+            with self._lock:
+                self.failovers += 1
+
+    def _parse(self, url: str) -> Tuple[Optional[AlchemyApiType], str]:
+        for api_type in (AlchemyApiType.BASE, AlchemyApiType.NFT):
+            try:
+                base_url = self.get_request_url(api_type)
+            except AlchemyError:
+                continue
+            if url == base_url:
+                return api_type, ''
+            if api_type == AlchemyApiType.NFT and url.startswith(base_url + '/'):
+                return api_type, url[len(base_url) :]
+        return None, url
+
+    def _is_drained(self, endpoint: Endpoint, base_url: str, now: float) -> bool:
+        if endpoint.drained_until > now:
+            return True
+        return (
+            self.retry_policy is not None
+            and self.retry_policy.breaker(base_url).is_open
+        )
+
+    @staticmethod
+    def _score(endpoint: Endpoint) -> float:
+        latency = max(endpoint.latency or MIN_LATENCY, MIN_LATENCY)
+        return endpoint.weight / latency * (1.0 - endpoint.error_rate) + 1e-9
+
+
+def is_failover_error(err: BaseException) -> bool:
+    """
+    Whether a request failing with `err` may succeed on another endpoint.
+    """
+    if isinstance(err, CircuitOpenError):
+        return True
+    status = getattr(err, 'status', None)
+    response = getattr(err, 'response', None)
+    if status is None and response is not None:
+        status = response.status_code
+    if status is None:
+        return isinstance(err, CONNECTION_ERRORS)
+    return status in FAILOVER_STATUSES or status >= 500
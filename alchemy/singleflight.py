@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class _Call:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+        self.shared = 0
+
+
+class SingleFlight:
+    """
+    Deduplicates identical concurrent calls: while a call for a key is in
+    flight, other callers with the same key wait for it and receive its value
+    (or its error) instead of starting their own call.
+
+    Callers receive the same value object, so it should be immutable, e.g.
+    the raw response body, and decoded separately by each caller.
+
+    :var shared: The number of calls answered by another caller's request.
+    """
+
+    def __init__(self) -> None:
+        """Initializes class attributes"""
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.shared = 0
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        """
+        Calls `func`, unless a call with the same key is already in flight,
+        in which case its result is returned once available.
+
+        :param key: key identifying identical calls.
+        :param func: function doing the actual call.
+        :return: the value returned by `func`
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = func()
+        except BaseException as err:
+            call.error = err
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.value
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, Callable, Iterator, List, Optional, Sequence, Tuple
+
+import requests
+
+from alchemy.exceptions import AlchemyError
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# strings, a lone quote opening a string cut by the end of the buffer, and
+# structural characters; numbers and literals are skipped over
+_TOKEN = re.compile(rb'"(?:[^"\\]|\\.)*"|"|[{}\[\],:]', re.S)
+
+
+class _Frame:
+    __slots__ = ('is_object', 'path', 'key', 'expect_key')
+
+    def __init__(self, is_object: bool, path: Tuple[Any, ...]) -> None:
+        self.is_object = is_object
+        self.path = path
+        self.key: Optional[str] = None
+        self.expect_key = is_object
+
+
+class JsonArrayDecoder:
+    """
+    Incremental decoder yielding the items of one array of a JSON document
+    as soon as they are complete, without holding the whole document.
+
+    The array is given by the keys leading to it, e.g. `('nfts',)` for
+    `{"nfts": [...], "pageKey": "..."}`. The rest of the document, with the
+    array emptied, is returned by `close`.
+
+        >>> decoder = JsonArrayDecoder(('nfts',))
+        >>> decoder.feed(b'{"nfts": [{"id": 1}, {"i')
+        [{'id': 1}]
+        >>> decoder.feed(b'd": 2}], "pageKey": "a"}')
+        [{'id': 2}]
+        >>> decoder.close()
+        {'nfts': [], 'pageKey': 'a'}
+
+    :var path: The keys leading to the array.
+    :var loads: The function decoding the JSON of each item.
+    """
+
+    def __init__(
+        self, path: Sequence[str], loads: Callable[[bytes], Any] = json.loads
+    ) -> None:
+        """Initializes class attributes"""
+        self.path = tuple(path)
+        self.loads = loads
+        self._buffer = bytearray()
+        self._pos = 0
+        self._stack: List[_Frame] = []
+        self._skeleton = bytearray()
+        self._skeleton_from = 0
+        self._item_start: Optional[int] = None
+        self._target_depth = 0
+
+    def feed(self, data: bytes) -> List[Any]:
+        """
+        Adds the next bytes of the document.
+
+        :return: the items of the array completed by these bytes
+        """
+        self._buffer += data
+        items: List[Any] = []
+        buffer = self._buffer
+        pos = self._pos
+        for match in _TOKEN.finditer(buffer, pos):
+            token = match.group()
+            start = match.start()
+            if token == b'"':
+                break
+            pos = match.end()
+            if token[0] == 0x22:  # a string
+                frame = self._stack[-1] if self._stack else None
+                if frame is not None and frame.expect_key:
+                    frame.key = self.loads(token)
+                    frame.expect_key = False
+            elif token in b'{[':
+                self._push(token == b'{', pos)
+            elif token == b',':
+                frame = self._stack[-1]
+                frame.expect_key = frame.is_object
+                if self._in_target():
+                    items.append(self.loads(buffer[self._item_start : start]))
+                    self._item_start = pos
+            elif token in b'}]':
+                if self._in_target():
+                    item = buffer[self._item_start : start]
+                    if item.strip():
+                        items.append(self.loads(item))
+                    self._item_start = None
+                    self._skeleton_from = start
+                self._stack.pop()
+        self._pos = pos
+        self._compact()
+        return items
+
+    def close(self) -> Any:
+        """
+        Ends the document.
+
+        :return: the document without the items of the array
+        :raises AlchemyError: if the document is incomplete.
+        """
+        if self._stack or self._item_start is not None:
+            raise AlchemyError('Incomplete JSON response')
+        self._skeleton += self._buffer[self._skeleton_from :]
+        self._buffer.clear()
+        if not self._skeleton.strip():
+            raise AlchemyError('Empty JSON response')
+        return self.loads(self._skeleton)
+
+    def _in_target(self) -> bool:
+        return self._item_start is not None and len(self._stack) == self._target_depth
+
+    def _push(self, is_object: bool, end: int) -> None:
+        parent = self._stack[-1] if self._stack else None
+        if parent is None:
+            path: Tuple[Any, ...] = ()
+        else:
+            path = parent.path + ((parent.key if parent.is_object else None),)
+        self._stack.append(_Frame(is_object, path))
+        if not is_object and path == self.path and self._item_start is None:
+            # entering the array: keep its brackets in the skeleton only
+            self._skeleton += self._buffer[self._skeleton_from : end]
+            self._item_start = end
+            self._target_depth = len(self._stack)
+
+    def _compact(self) -> None:
+        keep_from = self._pos
+        if self._item_start is not None:
+            keep_from = min(keep_from, self._item_start)
+        else:
+            self._skeleton += self._buffer[self._skeleton_from : keep_from]
+            self._skeleton_from = keep_from
+        if not keep_from:
+            return
+        del self._buffer[:keep_from]
+        self._pos -= keep_from
+        self._skeleton_from = max(self._skeleton_from - keep_from, 0)
+        if self._item_start is not None:
+            self._item_start -= keep_from
+
+
+class JsonArrayStream:
+    """
+    Items of one array of a streamed HTTP response, decoded while the body
+    is being received. Iterating the stream consumes the response; once
+    exhausted, the rest of the document is available as `document`, and a
+    JSON-RPC error in it is raised as AlchemyError.
+
+    :var response: The streamed HTTP response.
+    :var path: The keys leading to the array in the document.
+    :var document: The document without the array items, set once the
+        stream has been fully iterated.
+    :var loads: The function decoding the JSON of each item.
+    """
+
+    def __init__(
+        self,
+        response: requests.Response,
+        path: Sequence[str],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        loads: Callable[[bytes], Any] = json.loads,
+    ) -> None:
+        """Initializes class attributes"""
+        self.response = response
+        self.path = tuple(path)
+        self.chunk_size = chunk_size
+        self.loads = loads
+        self.document: Any = None
+
+    def __iter__(self) -> Iterator[Any]:
+        decoder = JsonArrayDecoder(self.path, self.loads)
+        try:
+            for chunk in self.response.iter_content(self.chunk_size):
+                yield from decoder.feed(chunk)
+        except requests.RequestException as err:
+            raise AlchemyError(str(err)) from err
+        finally:
+            self.response.close()
+        self.document = decoder.close()
+        if isinstance(self.document, dict) and self.document.get('error'):
+            raise AlchemyError(self.document['error'])
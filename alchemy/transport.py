@@ -0,0 +1,428 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import threading
+import time
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from alchemy.exceptions import AlchemyError
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+T = TypeVar('T')
+
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 10
+DEFAULT_POOL_IDLE_TIMEOUT = 60.0
+# encodings decoded by both urllib3 and httpx: gzip and deflate, plus br when
+# brotli is installed with the `brotli` extra
+DEFAULT_ACCEPT_ENCODING = 'gzip,deflate,br' if brotli is not None else 'gzip,deflate'
+METHOD_HEADER = 'Alchemy-Python-Sdk-Method'
+DEFAULT_HTTP2_CONNECTIONS = 2
+DEFAULT_MAX_CONCURRENT_STREAMS = 100
+
+
+class BaseTransport:
+    """
+    Base of the HTTP transports, keeping count of the bandwidth used.
+    """
+
+    def __init__(self) -> None:
+        """Initializes class attributes"""
+        # requests, bytes received and bytes decoded per SDK method
+        self._bandwidth: Dict[str, List[int]] = {}
+        self._lock = threading.Lock()
+
+    def request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        raise NotImplementedError
+
+    def post(self, url: str, data: Any = None, **kwargs: Any) -> requests.Response:
+        return self.request('POST', url, data=data, **kwargs)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns the bandwidth used per SDK method, i.e. per value of the
+        `Alchemy-Python-Sdk-Method` header: the number of responses, the bytes
+        received over the network and the bytes after decompression.
+        """
+        with self._lock:
+            bandwidth = {
+                name: list(counters) for name, counters in self._bandwidth.items()
+            }
+        return {
+            method_name: {
+                'responses': responses,
+                'compressed_bytes': compressed,
+                'uncompressed_bytes': uncompressed,
+                'compression_ratio': uncompressed / compressed if compressed else None,
+            }
+            for method_name, (responses, compressed, uncompressed) in bandwidth.items()
+        }
+
+    def close(self) -> None:
+        raise NotImplementedError
+
+    def _account(self, response: requests.Response, kwargs: Dict[str, Any]) -> None:
+        method_name = str((kwargs.get('headers') or {}).get(METHOD_HEADER))
+        if kwargs.get('stream'):
+            self._count_streamed(method_name, response)
+        else:
+            self._count(method_name, response, len(response.content))
+
+    def _count(
+        self, method_name: str, response: requests.Response, uncompressed: int
+    ) -> None:
+        # bytes read off the connection, before content decoding
+        compressed = response.raw.tell() if response.raw is not None else 0
+        with self._lock:
+            counters = self._bandwidth.setdefault(method_name, [0, 0, 0])
+            counters[0] += 1
+            counters[1] += compressed
+            counters[2] += uncompressed
+
+    def _count_streamed(self, method_name: str, response: requests.Response) -> None:
+        iter_content = response.iter_content
+
+        def counted(*args: Any, **kwargs: Any) -> Iterator[bytes]:
+            uncompressed = 0
+            for chunk in iter_content(*args, **kwargs):
+                uncompressed += len(chunk)
+                yield chunk
+            self._count(method_name, response, uncompressed)
+
+        response.iter_content = counted  # type: ignore
+
+
+class HTTPTransport(BaseTransport):
+    """
+    Shared HTTP transport that keeps pooled keep-alive connections per host.
+
+    A single transport is owned by the `AlchemyConfig` and used by both the
+    JSON-RPC and the NFT REST code paths, so consecutive calls reuse already
+    established TCP+TLS connections instead of opening a new one per request.
+
+    :var session: underlying requests session holding the connection pools
+    :var pool_connections: The number of per-host connection pools to keep.
+    :var pool_maxsize: The maximum number of connections kept in each pool.
+    :var pool_block: Whether to block when a pool has no free connection
+        instead of opening an extra, non-pooled one. Set to `True` to cap the
+        number of concurrent connections per host at `pool_maxsize`.
+    :var pool_idle_timeout: Number of seconds after which the pool of a host
+        that received no requests is closed. `None` disables idle eviction.
+    :var accept_encoding: The `Accept-Encoding` header sent with each request.
+        Responses are decompressed by urllib3 as they are read. Defaults to
+        gzip and deflate, plus Brotli (`br`), which compresses JSON better,
+        when brotli is installed with the `brotli` extra.
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        pool_block: bool = False,
+        pool_idle_timeout: Optional[float] = DEFAULT_POOL_IDLE_TIMEOUT,
+        accept_encoding: str = DEFAULT_ACCEPT_ENCODING,
+    ) -> None:
+        """Initializes class attributes"""
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.pool_idle_timeout = pool_idle_timeout
+        self.accept_encoding = accept_encoding
+
+        self.adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+        )
+        self.session = requests.Session()
+        self.session.mount('https://', self.adapter)
+        self.session.mount('http://', self.adapter)
+        self.session.headers['Accept-Encoding'] = accept_encoding
+
+        self._last_used: Dict[Tuple[str, str, int], float] = {}
+        super().__init__()
+
+    def request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """
+        Sends a request over a pooled connection.
+
+        :param method: HTTP method, e.g. `GET` or `POST`.
+        :param url: The url to send the request to.
+        :param kwargs: Any other argument accepted by `requests.Session.request`.
+        :return: requests.Response
+        """
+        self._touch(url)
+        response = self.session.request(method, url, **kwargs)
+        self._account(response, kwargs)
+        return response
+
+    def close(self) -> None:
+        """
+        Closes all pooled connections.
+        """
+        with self._lock:
+            self._last_used.clear()
+        self.session.close()
+
+    def _touch(self, url: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if self.pool_idle_timeout is not None:
+                self._evict_idle_pools(now)
+            self._last_used[self._host_key(url)] = now
+
+    def _evict_idle_pools(self, now: float) -> None:
+        idle = {
+            host
+            for host, last_used in self._last_used.items()
+            if now - last_used > self.pool_idle_timeout
+        }
+        if not idle:
+            return
+        pools = self.adapter.poolmanager.pools
+        for pool_key in list(pools.keys()):
+            pool_host = (
+                pool_key.key_scheme,
+                pool_key.key_host,
+                pool_key.key_port or _default_port(pool_key.key_scheme),
+            )
+            if pool_host in idle:
+                # dropping the pool from the manager closes its connections
+                pools.pop(pool_key, None)
+        for host in idle:
+            del self._last_used[host]
+
+    @staticmethod
+    def _host_key(url: str) -> Tuple[str, str, int]:
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        return (
+            scheme,
+            (parts.hostname or '').lower(),
+            parts.port or _default_port(scheme),
+        )
+
+
+class HTTP2Transport(BaseTransport):
+    """
+    HTTP transport multiplexing concurrent requests as HTTP/2 streams over a
+    few connections, instead of one HTTP/1.1 connection per in-flight
+    request. Requires httpx with HTTP/2 support, installed with
+    the `http2` extra.
+
+    The connections are driven by an event loop on a background thread,
+    which keeps the HTTP/2 state of each connection on a single thread;
+    callers block until their response arrives. Responses are returned as
+    `requests.Response`, so the transport can be used wherever HTTPTransport
+    is, e.g. passed as `transport` to a config.
+
+    :var client: underlying httpx client holding the connections
+    :var max_connections: The maximum number of connections, shared by all
+        hosts the transport sends requests to.
+    :var max_concurrent_streams: The maximum number of requests in flight;
+        further requests wait for one to complete.
+    :var pool_idle_timeout: Number of seconds after which idle connections
+        are closed. `None` keeps them open until the transport is closed.
+    :var prior_knowledge: Whether to speak HTTP/2 without negotiating it,
+        which is required for plain `http://` servers. Over TLS, HTTP/2 is
+        negotiated and servers without it are served over HTTP/1.1.
+    :var accept_encoding: The `Accept-Encoding` header sent with each request,
+        by default the same as HTTPTransport's.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = DEFAULT_HTTP2_CONNECTIONS,
+        max_concurrent_streams: int = DEFAULT_MAX_CONCURRENT_STREAMS,
+        pool_idle_timeout: Optional[float] = DEFAULT_POOL_IDLE_TIMEOUT,
+        prior_knowledge: bool = False,
+        accept_encoding: str = DEFAULT_ACCEPT_ENCODING,
+    ) -> None:
+        """Initializes class attributes"""
+        if httpx is None:
+            raise AlchemyError('HTTP/2 requires httpx, install alchemy-sdk[http2]')
+        super().__init__()
+        self.max_connections = max_connections
+        self.max_concurrent_streams = max_concurrent_streams
+        self.pool_idle_timeout = pool_idle_timeout
+        self.prior_knowledge = prior_knowledge
+        self.accept_encoding = accept_encoding
+        self.client = httpx.AsyncClient(
+            http1=not prior_knowledge,
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                keepalive_expiry=pool_idle_timeout,
+            ),
+            headers={'Accept-Encoding': accept_encoding},
+        )
+        self._streams = threading.BoundedSemaphore(max_concurrent_streams)
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(
+            target=self._loop.run_forever, name='alchemy-http2', daemon=True
+        ).start()
+
+    def request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """
+        Sends a request as a stream of a shared connection.
+
+        :param method: HTTP method, e.g. `GET` or `POST`.
+        :param url: The url to send the request to.
+        :param kwargs: `params`, `data`, `json`, `headers`, `timeout` and
+            `stream`, as accepted by `requests.Session.request`.
+        :return: requests.Response
+        """
+        stream = kwargs.get('stream', False)
+        request = self.client.build_request(
+            method,
+            url,
+            params=_without_none(kwargs.get('params')),
+            content=kwargs.get('data'),
+            json=kwargs.get('json'),
+            headers=_without_none(kwargs.get('headers')),
+            timeout=kwargs.get('timeout'),
+        )
+        self._streams.acquire()
+        try:
+            with _translate_errors():
+                response = self.run(self.client.send(request, stream=True))
+        except BaseException:
+            self._streams.release()
+            raise
+        raw = _RawResponse(response, self.run, self._streams.release)
+        if not stream:
+            with _translate_errors():
+                raw.read()
+        result = _to_requests_response(response, raw, stream)
+        self._account(result, kwargs)
+        return result
+
+    def run(self, coroutine: Awaitable[T]) -> T:
+        """
+        Runs a coroutine on the event loop of the transport and waits for it.
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def close(self) -> None:
+        """
+        Closes all connections and stops the event loop.
+        """
+        if self._loop.is_running():
+            self.run(self.client.aclose())
+            self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+class _RawResponse:
+    """
+    Body of an httpx response, read the way requests reads urllib3 ones.
+    """
+
+    def __init__(
+        self,
+        response: Any,
+        run: Callable[[Awaitable[Any]], Any],
+        release: Callable[[], None],
+    ) -> None:
+        self.response = response
+        self._run = run
+        self._release: Optional[Callable[[], None]] = release
+
+    def read(self) -> bytes:
+        try:
+            return self._run(self.response.aread())
+        finally:
+            self.release_conn()
+
+    def stream(self, chunk_size: int, decode_content: bool = True) -> Iterator[bytes]:
+        chunks = self.response.aiter_bytes(chunk_size)
+        try:
+            with _translate_errors():
+                while True:
+                    try:
+                        yield self._run(chunks.__anext__())
+                    except StopAsyncIteration:
+                        return
+        finally:
+            self.release_conn()
+
+    def tell(self) -> int:
+        return self.response.num_bytes_downloaded
+
+    def close(self) -> None:
+        self.release_conn()
+
+    def release_conn(self) -> None:
+        # ends the stream and frees its slot, once
+        release, self._release = self._release, None
+        if release is not None:
+            self._run(self.response.aclose())
+            release()
+
+
+def _to_requests_response(
+    response: Any, raw: _RawResponse, stream: bool
+) -> requests.Response:
+    result = requests.Response()
+    result.status_code = response.status_code
+    result.reason = response.reason_phrase
+    result.headers = CaseInsensitiveDict(response.headers.multi_items())
+    result.url = str(response.url)
+    result.request = requests.PreparedRequest()
+    result.request.method = response.request.method
+    result.request.url = str(response.request.url)
+    result.request.headers = CaseInsensitiveDict(response.request.headers.multi_items())
+    result.request.body = response.request.content
+    result.encoding = requests.utils.get_encoding_from_headers(result.headers)
+    result.raw = raw
+    if not stream:
+        result._content = response.content
+        result._content_consumed = True
+    return result
+
+
+@contextlib.contextmanager
+def _translate_errors() -> Iterator[None]:
+    # the retry policy and router expect the errors of requests
+    try:
+        yield
+    except httpx.TimeoutException as err:
+        raise requests.Timeout(str(err)) from err
+    except httpx.DecodingError as err:
+        raise requests.exceptions.ContentDecodingError(str(err)) from err
+    except httpx.TransportError as err:
+        raise requests.ConnectionError(str(err)) from err
+
+
+def _without_none(values: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    if values is None:
+        return None
+    return {key: value for key, value in values.items() if value is not None}
+
+
+def _default_port(scheme: str) -> int:
+    return 443 if scheme == 'https' else 80
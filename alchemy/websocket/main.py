@@ -19,6 +19,13 @@ class AlchemyWebSocket:
     def __init__(self, provider: AlchemyWebsocketProvider):
         self.provider = provider
 
+    def connect(self) -> None:
+        """
+        Opens the WebSocket connection. Calling it is optional: the connection
+        is opened by the first subscription otherwise.
+        """
+        self.provider.connect()
+
     def on(self, event: EventType, listener: Callable) -> Subscription:
         """
         Adds a listener to be triggered for each event.
@@ -0,0 +1,106 @@
+"""
+Compares the JSON codecs on a block of transaction receipts and a page of
+asset transfers, the responses dominating receipt- and transfer-heavy jobs.
+
+    python -m benchmarks.codec [--repeat 20]
+"""
+
+import argparse
+import timeit
+
+from alchemy.codec import CODECS, orjson
+
+
+def receipt(index: int) -> dict:
+    return {
+        'blockHash': '0x' + 'ab' * 32,
+        'blockNumber': '0x10d4f',
+        'contractAddress': None,
+        'cumulativeGasUsed': hex(21000 * index),
+        'effectiveGasPrice': '0x4a817c800',
+        'from': '0x' + '12' * 20,
+        'gasUsed': '0x5208',
+        'logs': [
+            {
+                'address': '0x' + '34' * 20,
+                'topics': ['0x' + f'{topic:064x}' for topic in range(3)],
+                'data': '0x' + '00' * 64,
+                'logIndex': hex(log),
+                'removed': False,
+            }
+            for log in range(4)
+        ],
+        'logsBloom': '0x' + '00' * 256,
+        'status': '0x1',
+        'to': '0x' + '56' * 20,
+        'transactionHash': '0x' + f'{index:064x}',
+        'transactionIndex': hex(index),
+        'type': '0x2',
+    }
+
+
+def transfer(index: int) -> dict:
+    return {
+        'blockNum': hex(15000000 + index),
+        'uniqueId': f'0x{index:064x}:log:{index % 7}',
+        'hash': '0x' + f'{index:064x}',
+        'from': '0x' + '12' * 20,
+        'to': '0x' + '34' * 20,
+        'value': index / 7,
+        'erc721TokenId': None,
+        'erc1155Metadata': None,
+        'tokenId': None,
+        'asset': 'USDC',
+        'category': 'erc20',
+        'rawContract': {
+            'value': hex(index * 10**6),
+            'address': '0x' + '56' * 20,
+            'decimal': '0x6',
+        },
+    }
+
+
+DOCUMENTS = {
+    'receipts (500)': {
+        'jsonrpc': '2.0',
+        'id': 1,
+        'result': {'receipts': [receipt(i) for i in range(500)]},
+    },
+    'transfers (1000)': {
+        'jsonrpc': '2.0',
+        'id': 1,
+        'result': {'transfers': [transfer(i) for i in range(1000)], 'pageKey': 'a'},
+    },
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    if orjson is None:
+        print('orjson is not installed, only the standard library is measured')
+
+    codecs = [codec() for name, codec in CODECS.items() if orjson or name == 'json']
+    for label, document in DOCUMENTS.items():
+        raw = CODECS['json']().dumps(document)
+        print(f'{label}, {len(raw) / 1e6:.2f} MB')
+        baseline = None
+        for codec in codecs:
+            for operation, run in (
+                ('decode', lambda: codec.loads(raw)),
+                ('encode', lambda: codec.dumps(document)),
+            ):
+                seconds = min(timeit.repeat(run, number=1, repeat=args.repeat))
+                if codec.name == 'json' and operation == 'decode':
+                    baseline = seconds
+                speedup = (
+                    f'  x{baseline / seconds:.1f}' if operation == 'decode' else ''
+                )
+                print(
+                    f'  {codec.name:>7} {operation}: {seconds * 1e3:8.2f} ms{speedup}'
+                )
+
+
+if __name__ == '__main__':
+    main()
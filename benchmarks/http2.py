@@ -0,0 +1,75 @@
+"""
+Compares the HTTP/1.1 and HTTP/2 transports under high fan-out against
+local stand-in servers adding a fixed latency to each response: number of
+connections opened, wall time and per-request latency.
+
+The stand-in servers are the mock servers of the test suite, so run it as a
+module from the repository root, with httpx and h2 installed:
+
+    python -m benchmarks.http2 [--requests 2000] [--threads 128] [--delay 0.02]
+"""
+
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from alchemy.config import AlchemyConfig
+from alchemy.provider import AlchemyProvider
+from alchemy.transport import HTTPTransport, HTTP2Transport
+from tests.mock_server import MockAlchemyServer, MockHTTP2Server
+
+
+def run(server, transport, requests: int, threads: int) -> None:
+    server.rpc('eth_getBalance', lambda address, block: '0x0')
+    server.start()
+    config = AlchemyConfig(
+        'demo', None, url=server.url, transport=transport, single_flight=False
+    )
+    provider = AlchemyProvider(config)
+
+    def call(index: int) -> float:
+        start = time.monotonic()
+        provider.make_request('eth_getBalance', [hex(index), 'latest'])
+        return time.monotonic() - start
+
+    try:
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            latencies = sorted(executor.map(call, range(requests)))
+        elapsed = time.monotonic() - start
+    finally:
+        transport.close()
+        server.stop()
+
+    p99 = latencies[int(len(latencies) * 0.99)]
+    print(
+        f'  connections: {len(server.client_ports):4d}  wall: {elapsed:6.2f} s  '
+        f'p50: {statistics.median(latencies) * 1e3:6.1f} ms  p99: {p99 * 1e3:6.1f} ms'
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=128)
+    parser.add_argument('--delay', type=float, default=0.02)
+    args = parser.parse_args()
+
+    print('HTTP/1.1')
+    server = MockAlchemyServer()
+    server.delay = args.delay
+    transport = HTTPTransport(pool_maxsize=args.threads)
+    run(server, transport, args.requests, args.threads)
+
+    print('HTTP/2')
+    server = MockHTTP2Server()
+    server.delay = args.delay
+    transport = HTTP2Transport(
+        max_concurrent_streams=args.threads, prior_knowledge=True
+    )
+    run(server, transport, args.requests, args.threads)
+
+
+if __name__ == '__main__':
+    main()
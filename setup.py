@@ -22,6 +22,12 @@ setup(
         'typing-extensions',
         'dataclass-wizard',
     ],
+    extras_require={
+        'async': ['aiohttp'],
+        'brotli': ['brotli'],
+        'http2': ['httpx[http2]'],
+        'orjson': ['orjson'],
+    },
     python_requires='>=3.7',
     url='https://github.com/alchemyplatform/alchemy-sdk-py',
     long_description=readme,
@@ -0,0 +1,259 @@
+import asyncio
+import gzip
+import json
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+try:
+    import h2.config
+    import h2.connection
+    import h2.events
+except ImportError:
+    h2 = None
+
+
+class MockAlchemyServer:
+    """
+    Local HTTP server answering JSON-RPC requests on `/` and NFT REST requests
+    on `/<methodName>`. Handlers are plain callables registered per method.
+    Responses are gzipped for clients accepting it when `compress` is set,
+    and delayed by `delay` seconds to stand in for network latency.
+    """
+
+    def __init__(self):
+        self.rpc_handlers = {}
+        self.rest_handlers = {}
+        self.requests = []
+        self.http_requests = 0
+        self.client_ports = set()
+        self.compress = False
+        self.delay = 0
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self._make_handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def rpc(self, method, handler):
+        self.rpc_handlers[method] = handler
+
+    def rest(self, method, handler):
+        self.rest_handlers[method] = handler
+
+    def count(self, method):
+        with self.lock:
+            return sum(1 for request in self.requests if request['method'] == method)
+
+    def _record(self, handler, method, body):
+        with self.lock:
+            self.client_ports.add(handler.client_address[1])
+            self.requests.append(
+                {'method': method, 'headers': dict(handler.headers), 'body': body}
+            )
+
+    def _answer_rpc(self, payload):
+        handler = self.rpc_handlers.get(payload['method'])
+        response = {'jsonrpc': '2.0', 'id': payload['id']}
+        if handler is None:
+            response['error'] = {'code': -32601, 'message': 'Method not found'}
+            return response
+        try:
+            response['result'] = handler(*payload['params'])
+        except Exception as err:
+            response['error'] = {'code': -32000, 'message': str(err)}
+        return response
+
+    def _make_handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, body, headers=None):
+                encoded = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                if mock.compress and 'gzip' in self.headers.get('Accept-Encoding', ''):
+                    encoded = gzip.compress(encoded)
+                    self.send_header('Content-Encoding', 'gzip')
+                self.send_header('Content-Length', str(len(encoded)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(encoded)
+
+            def _rest(self, body):
+                parts = urlsplit(self.path)
+                method = parts.path.rsplit('/', 1)[-1]
+                query = {
+                    key: values if key.endswith('[]') else values[0]
+                    for key, values in parse_qs(parts.query).items()
+                }
+                mock._record(self, method, body or query)
+                handler = mock.rest_handlers.get(method)
+                if handler is None:
+                    return self._send(404, {'error': 'Not found'})
+                result = handler(body if body is not None else query)
+                if isinstance(result, tuple):
+                    return self._send(*result)
+                self._send(200, result)
+
+            def do_GET(self):
+                with mock.lock:
+                    mock.http_requests += 1
+                self._rest(None)
+
+            def do_POST(self):
+                with mock.lock:
+                    mock.http_requests += 1
+                time.sleep(mock.delay)
+                length = int(self.headers.get('Content-Length', 0))
+                body = json.loads(self.rfile.read(length) or b'null')
+                if urlsplit(self.path).path not in ('', '/'):
+                    return self._rest(body)
+                if isinstance(body, list):
+                    for payload in body:
+                        mock._record(self, payload['method'], payload)
+                    return self._send(200, [mock._answer_rpc(p) for p in body])
+                mock._record(self, body['method'], body)
+                self._send(200, mock._answer_rpc(body))
+
+        return Handler
+
+
+class MockHTTP2Server(MockAlchemyServer):
+    """
+    Cleartext HTTP/2 counterpart of MockAlchemyServer answering JSON-RPC
+    requests, for clients speaking HTTP/2 with prior knowledge. Every
+    connection is recorded in `client_ports`.
+    """
+
+    def __init__(self):
+        self.rpc_handlers = {}
+        self.rest_handlers = {}
+        self.requests = []
+        self.http_requests = 0
+        self.client_ports = set()
+        self.delay = 0
+        self.lock = threading.Lock()
+        self.loop = asyncio.new_event_loop()
+        self.server = self.loop.run_until_complete(
+            asyncio.start_server(self._serve, '127.0.0.1', 0)
+        )
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server.sockets[0].getsockname()
+        return f'http://{host}:{port}'
+
+    def stop(self):
+        async def close():
+            self.server.close()
+            current = asyncio.current_task()
+            tasks = [task for task in asyncio.all_tasks() if task is not current]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        asyncio.run_coroutine_threadsafe(close(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+    async def _serve(self, reader, writer):
+        connection = h2.connection.H2Connection(
+            h2.config.H2Configuration(client_side=False)
+        )
+        connection.initiate_connection()
+        writer.write(connection.data_to_send())
+        with self.lock:
+            self.client_ports.add(writer.get_extra_info('peername')[1])
+        bodies = {}
+        while True:
+            data = await reader.read(65535)
+            if not data:
+                break
+            for event in connection.receive_data(data):
+                if isinstance(event, h2.events.RequestReceived):
+                    bodies[event.stream_id] = bytearray()
+                elif isinstance(event, h2.events.DataReceived):
+                    bodies[event.stream_id] += event.data
+                    connection.acknowledge_received_data(
+                        event.flow_controlled_length, event.stream_id
+                    )
+                elif isinstance(event, h2.events.StreamEnded):
+                    body = bodies.pop(event.stream_id)
+                    asyncio.ensure_future(
+                        self._respond(connection, writer, event.stream_id, body)
+                    )
+            writer.write(connection.data_to_send())
+        writer.close()
+
+    async def _respond(self, connection, writer, stream_id, body):
+        with self.lock:
+            self.http_requests += 1
+        await asyncio.sleep(self.delay)
+        payload = json.loads(body)
+        self._record_payload(payload['method'], payload)
+        encoded = json.dumps(self._answer_rpc(payload)).encode()
+        connection.send_headers(
+            stream_id,
+            [
+                (':status', '200'),
+                ('content-type', 'application/json'),
+                ('content-length', str(len(encoded))),
+            ],
+        )
+        # bodies of a few frames fit the default flow control window
+        size = connection.max_outbound_frame_size
+        for start in range(0, len(encoded), size):
+            connection.send_data(
+                stream_id,
+                encoded[start : start + size],
+                end_stream=start + size >= len(encoded),
+            )
+        writer.write(connection.data_to_send())
+
+    def _record_payload(self, method, body):
+        with self.lock:
+            self.requests.append({'method': method, 'headers': {}, 'body': body})
+
+
+def raw_nft(contract_address, token_id, token_type='ERC721'):
+    return {
+        'contract': {'address': contract_address, 'tokenType': token_type},
+        'tokenId': str(token_id),
+        'tokenType': token_type,
+        'image': {},
+        'raw': {'metadata': {}},
+        'timeLastUpdated': '2023-01-01T00:00:00Z',
+    }
+
+
+def raw_transfer(block_number, log_index, contract_address, token_id, to_address):
+    return {
+        'uniqueId': f'{hex(block_number)}:log:{log_index}',
+        'category': 'erc721',
+        'blockNum': hex(block_number),
+        'hash': hex(block_number),
+        'from': '0x0000000000000000000000000000000000000000',
+        'to': to_address,
+        'rawContract': {'address': contract_address},
+        'tokenId': hex(token_id),
+    }
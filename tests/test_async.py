@@ -0,0 +1,156 @@
+import asyncio
+import time
+import unittest
+
+from alchemy.exceptions import AlchemyError
+from alchemy.hedging import RequestHedger
+from tests.mock_server import MockAlchemyServer, raw_nft, raw_transfer
+
+try:
+    import aiohttp
+    from alchemy.aio import AsyncAlchemy, gather
+except ImportError:
+    aiohttp = None
+
+
+@unittest.skipIf(aiohttp is None, 'aiohttp is not installed')
+class TestAsyncAlchemy(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.server = MockAlchemyServer().start()
+        self.server.rpc(
+            'alchemy_getTokenMetadata',
+            lambda address: {'name': address, 'symbol': 'TKN', 'decimals': 6},
+        )
+        self.server.rpc('eth_blockNumber', lambda: '0x10')
+        self.server.rpc('eth_chainId', lambda: '0x1')
+        # ENS lookups of plain addresses resolve to the zero address
+        self.server.rpc('eth_call', lambda tx, block: '0x' + '00' * 32)
+        self.server.rpc(
+            'eth_getBlockByNumber',
+            lambda number, full: {'number': '0x10', 'timestamp': hex(int(time.time()))},
+        )
+        self.server.rpc(
+            'alchemy_getAssetTransfers',
+            lambda params: {
+                'transfers': [
+                    raw_transfer(1, 0, '0x' + 'ab' * 20, 1, params['toAddress'])
+                ]
+            },
+        )
+        self.server.rest(
+            'getNFTMetadataBatch',
+            lambda body: {
+                'nfts': [
+                    raw_nft(token['contractAddress'], int(token['tokenId'], 16))
+                    for token in body['tokens']
+                ]
+            },
+        )
+        self.server.rest('isSpamContract', lambda query: {'isSpamContract': True})
+        self.alchemy = AsyncAlchemy(url=self.server.url, max_retries=1)
+
+    async def asyncTearDown(self):
+        await self.alchemy.close()
+        self.server.stop()
+
+    async def test_core_methods_are_awaitable(self):
+        addresses = [f'0x{i:040x}' for i in range(10)]
+        results = await gather(
+            *(self.alchemy.core.get_token_metadata(a) for a in addresses), limit=3
+        )
+        self.assertEqual([r.name for r in results], addresses)
+        self.assertEqual(await self.alchemy.core.block_number, 16)
+
+    async def test_nft_methods_are_awaitable(self):
+        owner = '0x' + 'cd' * 20
+        response = await self.alchemy.nft.get_minted_nfts(owner)
+        self.assertEqual(response['nfts'][0].token_id, '1')
+        self.assertEqual(response['nfts'][0].to, owner)
+        spam = await self.alchemy.nft.is_spam_contract('0x' + 'ab' * 20)
+        self.assertTrue(spam['is_spam_contract'])
+
+    async def test_errors_are_raised(self):
+        with self.assertRaises(AlchemyError):
+            await self.alchemy.core.send('eth_unknownMethod', [])
+        with self.assertRaises(AlchemyError):
+            await self.alchemy.nft.get_floor_price('0x' + 'ab' * 20)
+
+    async def test_gather_limits_concurrency(self):
+        running = 0
+        peak = 0
+
+        async def task():
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+        await gather(*(task() for _ in range(10)), limit=4)
+        self.assertEqual(peak, 4)
+
+    async def test_slow_calls_are_hedged(self):
+        slow = []
+
+        def chain_id():
+            if slow and slow.pop():
+                time.sleep(1)
+            return '0x1'
+
+        self.server.rpc('eth_chainId', chain_id)
+        hedger = RequestHedger(min_samples=1)
+        alchemy = AsyncAlchemy(url=self.server.url, hedging=hedger)
+        try:
+            await alchemy.core.send('eth_chainId', [])
+            slow[:] = [False, True]
+            start = time.monotonic()
+            self.assertEqual(await alchemy.core.send('eth_chainId', []), '0x1')
+            self.assertLess(time.monotonic() - start, 0.5)
+        finally:
+            await alchemy.close()
+        self.assertEqual((hedger.hedges, hedger.wins), (1, 1))
+
+    async def test_http2_transport(self):
+        alchemy = AsyncAlchemy(url=self.server.url, http2=True)
+        try:
+            self.assertEqual(await alchemy.core.send('eth_chainId', []), '0x1')
+        finally:
+            await alchemy.close()
+            alchemy.config.transport.close()
+
+    async def test_chunked_metadata_batches_are_sent_asynchronously(self):
+        tokens = [
+            {'contract_address': '0x' + 'ab' * 20, 'token_id': hex(index)}
+            for index in range(250)
+        ]
+        response = await self.alchemy.nft.get_nft_metadata_batch(tokens)
+        self.assertEqual(
+            [nft.token_id for nft in response['nfts']], [str(i) for i in range(250)]
+        )
+        batches = [
+            r for r in self.server.requests if r['method'] == 'getNFTMetadataBatch'
+        ]
+        self.assertEqual(len(batches), 3)
+        # sent by the non-blocking provider, not the synchronous one
+        for batch in batches:
+            self.assertIn('aiohttp', batch['headers']['User-Agent'])
+
+    async def test_iterator_methods_are_not_available(self):
+        for name in ('iter_owners_for_contract', 'stream_owners_for_contract'):
+            with self.assertRaises(AttributeError):
+                getattr(self.alchemy.nft, name)
+        with self.assertRaises(AttributeError):
+            self.alchemy.core.crawl_asset_transfers
+        self.assertFalse(hasattr(self.alchemy.core, 'iter_asset_transfers'))
+        self.assertEqual(self.server.http_requests, 0)
+
+    async def test_metrics_are_recorded(self):
+        alchemy = AsyncAlchemy(url=self.server.url, metrics=True)
+        try:
+            await alchemy.core.send('eth_chainId', [])
+            await alchemy.nft.is_spam_contract('0x' + 'ab' * 20)
+        finally:
+            await alchemy.close()
+        snapshot = alchemy.config.metrics.snapshot()
+        self.assertEqual(snapshot['send']['requests'], 1)
+        self.assertEqual(snapshot['isSpamContract']['response_bytes']['count'], 1)
@@ -1,8 +1,22 @@
+import json
 import os
+import tempfile
+import threading
+import time
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from web3 import Web3
 
 from alchemy import Alchemy
+from alchemy.config import AlchemyConfig
+from alchemy.core import AlchemyCore
 from alchemy.core.types import TokenBalanceType, AssetTransfersCategory
+from alchemy.exceptions import AlchemyError
+from alchemy.pagination import iter_items, iter_pages
+from alchemy.provider import AlchemyProvider
+from alchemy.recorder import RequestRecorder, current_recorder, recording
+from tests.mock_server import MockAlchemyServer
 
 
 class TestAlchemyCore(unittest.TestCase):
@@ -68,3 +82,392 @@ class TestAlchemyCore(unittest.TestCase):
         receipts = self.alchemy.core.get_transaction_receipts(block_hash=block_hash)
         self.assertTrue(receipts)
         self.assertEqual(receipts[0]['blockHash'], block_hash)
+
+
+class TestAlchemyCoreBatch(unittest.TestCase):
+    def setUp(self):
+        self.server = MockAlchemyServer().start()
+        self.server.rpc(
+            'alchemy_getTokenMetadata',
+            lambda address: {'name': address, 'symbol': 'TKN', 'decimals': 6},
+        )
+        self.server.rpc(
+            'eth_getBlockByNumber',
+            lambda number, full: {'number': '0x10', 'hash': '0x' + '11' * 32},
+        )
+        self.server.rpc('eth_chainId', lambda: '0x1')
+        config = AlchemyConfig('demo', None, url=self.server.url, max_batch_size=3)
+        self.core = AlchemyCore(Web3(provider=AlchemyProvider(config)))
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_batch_resolves_results(self):
+        with self.core.batch() as b:
+            metadata = [b.get_token_metadata(f'0x{i:040x}') for i in range(5)]
+            block = b.get_block('latest')
+            chain_id = b.send('eth_chainId', [])
+            missing = b.send('eth_unknownMethod', [])
+
+        self.assertEqual(metadata[4].result().name, f'0x{4:040x}')
+        self.assertEqual(block.result()['number'], 16)
+        self.assertEqual(chain_id.result(), '0x1')
+        with self.assertRaises(AlchemyError):
+            missing.result()
+        # 8 calls in batches of at most 3 calls
+        self.assertEqual(len(self.server.requests), 8)
+        self.assertEqual(self.server.http_requests, 3)
+        self.assertTrue(
+            all(
+                r['headers']['Alchemy-Python-Sdk-Method'] == 'batch'
+                for r in self.server.requests
+            )
+        )
+
+    def test_batch_result_before_execute(self):
+        batch = self.core.batch()
+        metadata = batch.get_token_metadata(self.core.provider.url)
+        with self.assertRaises(AlchemyError):
+            metadata.result()
+        batch.execute()
+        self.assertEqual(metadata.result().symbol, 'TKN')
+
+    def test_make_batch_request_splits(self):
+        responses = self.core.provider.make_batch_request(
+            [('eth_chainId', [])] * 7, max_batch_size=2
+        )
+        self.assertEqual([r['result'] for r in responses], ['0x1'] * 7)
+
+    def test_concurrent_calls_are_batched(self):
+        config = AlchemyConfig(
+            'demo', None, url=self.server.url, batch_window=0.2, batch_window_size=10
+        )
+        core = AlchemyCore(Web3(provider=AlchemyProvider(config)))
+        addresses = [f'0x{i:040x}' for i in range(20)]
+        with ThreadPoolExecutor(max_workers=20) as executor:
+            results = list(executor.map(core.get_token_metadata, addresses))
+
+        self.assertEqual([r.name for r in results], addresses)
+        self.assertEqual(len(self.server.requests), 20)
+        self.assertLessEqual(self.server.http_requests, 4)
+
+    def test_closing_stops_the_dispatcher(self):
+        running = set(threading.enumerate())
+        alchemy = Alchemy(url=self.server.url, batch_window=0.05)
+        address = '0x' + '1' * 40
+        self.assertEqual(alchemy.core.get_token_metadata(address).name, address)
+        threads = [
+            thread
+            for thread in set(threading.enumerate()) - running
+            if thread.name.startswith('alchemy-batch')
+        ]
+        self.assertTrue(threads)
+        alchemy.close()
+        for thread in threads:
+            self.assertFalse(thread.is_alive())
+        with self.assertRaises(AlchemyError):
+            alchemy.provider.make_request('eth_chainId', [])
+
+
+class TestPagination(unittest.TestCase):
+    def setUp(self):
+        self.server = MockAlchemyServer().start()
+        self.alchemy = Alchemy(url=self.server.url, max_retries=1)
+        self.server.rpc('alchemy_getAssetTransfers', self.transfers)
+
+    def tearDown(self):
+        self.server.stop()
+
+    @staticmethod
+    def transfers(params):
+        start = int(params.get('pageKey', '0'))
+        count = int(params['maxCount'], 16)
+        page = {
+            'transfers': [
+                {
+                    'uniqueId': f'{index}:external',
+                    'category': 'external',
+                    'blockNum': hex(index),
+                    'hash': hex(index),
+                }
+                for index in range(start, min(start + count, 10))
+            ]
+        }
+        if start + count < 10:
+            page['pageKey'] = str(start + count)
+        return page
+
+    def test_pages_are_fetched_ahead(self):
+        fetched = []
+
+        def fetch(page_key):
+            index = int(page_key or 0)
+            fetched.append(index)
+            return [index], str(index + 1) if index < 9 else None
+
+        pages = iter_pages(fetch, prefetch=2)
+        self.assertEqual(next(pages), ([0], '1'))
+        time.sleep(0.1)
+        self.assertEqual(fetched, [0, 1, 2])
+        self.assertEqual([items for items, _ in pages], [[i] for i in range(1, 10)])
+        pages = iter_pages(fetch, prefetch=0)
+        self.assertEqual(len(list(pages)), 10)
+
+    def test_fetches_run_in_the_callers_context(self):
+        recorder = RequestRecorder()
+
+        def fetch(page_key):
+            index = int(page_key or 0)
+            return [current_recorder()], str(index + 1) if index < 2 else None
+
+        recorders = recording(recorder, lambda: list(iter_items(fetch)))
+        self.assertEqual(recorders, [recorder] * 3)
+        self.assertEqual(list(iter_items(fetch)), [None] * 3)
+
+    def test_fetching_stops_with_the_consumer(self):
+        fetched = []
+
+        def fetch(page_key):
+            fetched.append(page_key)
+            return [0], 'next'
+
+        pages = iter_pages(fetch, prefetch=1)
+        next(pages)
+        pages.close()
+        time.sleep(0.1)
+        self.assertLessEqual(len(fetched), 3)
+        self.assertEqual(list(iter_items(fetch, prefetch=0, limit=3)), [0, 0, 0])
+
+    def test_errors_are_raised_in_order(self):
+        def fetch(page_key):
+            if page_key:
+                raise AlchemyError('failed')
+            return [0], 'next'
+
+        items = iter_items(fetch)
+        self.assertEqual(next(items), 0)
+        with self.assertRaises(AlchemyError):
+            next(items)
+
+    def test_iter_asset_transfers(self):
+        transfers = self.alchemy.core.iter_asset_transfers(
+            category=['external'], max_count=3
+        )
+        self.assertEqual([t.block_num for t in transfers], [hex(i) for i in range(10)])
+        self.assertEqual(self.server.count('alchemy_getAssetTransfers'), 4)
+
+        transfers = self.alchemy.core.iter_asset_transfers(
+            category=['external'], max_count=3, limit=5
+        )
+        self.assertEqual(len(list(transfers)), 5)
+        self.assertEqual(self.server.count('alchemy_getAssetTransfers'), 6)
+
+
+class TestShardedTransfers(unittest.TestCase):
+    def setUp(self):
+        self.server = MockAlchemyServer().start()
+        self.alchemy = Alchemy(url=self.server.url, max_retries=1)
+        # dense between blocks 300 and 400, several transfers per block
+        self.history = [
+            {
+                'uniqueId': f'{block}:{index}',
+                'category': 'erc20',
+                'blockNum': hex(block),
+                'hash': hex(block),
+            }
+            for block in range(1000)
+            for index in range(7 if 300 <= block < 400 else int(block % 10 == 0))
+        ]
+        self.server.rpc('alchemy_getAssetTransfers', self.transfers)
+        self.server.rpc('eth_blockNumber', lambda: hex(999))
+
+    def tearDown(self):
+        self.server.stop()
+
+    def transfers(self, params):
+        start, end = int(params['fromBlock'], 16), int(params['toBlock'], 16)
+        matching = [t for t in self.history if start <= int(t['blockNum'], 16) <= end]
+        if params['order'] == 'desc':
+            matching.reverse()
+        offset = int(params.get('pageKey', '0'))
+        count = int(params['maxCount'], 16)
+        page = {'transfers': matching[offset : offset + count]}
+        if offset + count < len(matching):
+            page['pageKey'] = str(offset + count)
+        return page
+
+    def test_adaptive_sharding(self):
+        transfers = self.alchemy.core.iter_asset_transfers_sharded(
+            category=['erc20'], max_count=50, max_workers=4
+        )
+        ids = [t.unique_id for t in transfers]
+        self.assertEqual(ids, [t['uniqueId'] for t in self.history])
+        # the dense shard was split, some transfers were fetched twice
+        self.assertGreater(self.server.count('alchemy_getAssetTransfers'), 17)
+
+    def test_descending_order(self):
+        transfers = self.alchemy.core.iter_asset_transfers_sharded(
+            category=['erc20'], order='desc', max_count=50, max_workers=4
+        )
+        ids = [t.unique_id for t in transfers]
+        self.assertEqual(ids, [t['uniqueId'] for t in reversed(self.history)])
+
+    def test_fixed_size_shards(self):
+        transfers = self.alchemy.core.iter_asset_transfers_sharded(
+            category=['erc20'], from_block=250, to_block='0x1f3', shard_size=100
+        )
+        ids = [t.unique_id for t in transfers]
+        expected = [
+            t['uniqueId'] for t in self.history if 250 <= int(t['blockNum'], 16) <= 499
+        ]
+        self.assertEqual(ids, expected)
+        self.assertEqual(self.server.count('alchemy_getAssetTransfers'), 3)
+
+
+class TestTokenBalances(unittest.TestCase):
+    def setUp(self):
+        self.server = MockAlchemyServer().start()
+        self.alchemy = Alchemy(url=self.server.url, max_retries=1, metrics=True)
+        self.owner = '0x' + 'a' * 40
+        self.server.rpc('alchemy_getTokenBalances', self.balances)
+
+    def tearDown(self):
+        self.server.stop()
+
+    def balances(self, address, contracts):
+        return {
+            'address': address,
+            'tokenBalances': [
+                {'contractAddress': contract, 'tokenBalance': hex(int(contract, 16))}
+                for contract in contracts
+            ],
+        }
+
+    def test_long_contract_lists_are_chunked(self):
+        contracts = ['0x' + f'{index:040x}' for index in range(1, 4000)]
+        response = self.alchemy.core.get_token_balances(self.owner, contracts)
+        self.assertEqual(response['address'], self.owner)
+        self.assertEqual(
+            [balance.contract_address for balance in response['token_balances']],
+            contracts,
+        )
+        self.assertEqual(self.server.count('alchemy_getTokenBalances'), 3)
+        # chunks are calls of their own
+        snapshot = self.alchemy.config.metrics.snapshot()
+        self.assertEqual(snapshot['getTokenBalances']['requests'], 3)
+
+    def test_chunks_are_batched_together(self):
+        alchemy = Alchemy(url=self.server.url, batch_window=0.05)
+        contracts = ['0x' + f'{index:040x}' for index in range(1, 4000)]
+        response = alchemy.core.get_token_balances(self.owner, contracts)
+        self.assertEqual(len(response['token_balances']), len(contracts))
+        self.assertEqual(self.server.count('alchemy_getTokenBalances'), 3)
+        self.assertEqual(self.server.http_requests, 1)
+
+    def test_balances_of_many_owners(self):
+        owners = ['0x' + f'{index:040x}' for index in range(1, 21)] + ['invalid']
+
+        def erc20_balances(address, token_type, options=None):
+            start = int((options or {}).get('pageKey', '0'))
+            if address.endswith('13'):
+                raise ValueError('internal error')
+            if address.endswith('14'):
+                # malformed, without the address
+                return {'tokenBalances': []}
+            page = self.balances(address, [hex(start + 1)])
+            if start < 2:
+                page['pageKey'] = str(start + 1)
+            return page
+
+        self.server.rpc('alchemy_getTokenBalances', erc20_balances)
+        results = dict(self.alchemy.core.get_token_balances_many(owners))
+        self.assertEqual(set(results), set(owners))
+        failed = [a for a, r in results.items() if isinstance(r, AlchemyError)]
+        self.assertEqual(
+            sorted(failed), ['0x' + f'{19:040x}', '0x' + f'{20:040x}', 'invalid']
+        )
+        self.assertIsInstance(results['0x' + f'{20:040x}'].__cause__, KeyError)
+        balances = results[owners[0]]['token_balances']
+        self.assertEqual([b.contract_address for b in balances], ['0x1', '0x2', '0x3'])
+
+
+class TestCrawlRunner(unittest.TestCase):
+    def setUp(self):
+        self.server = MockAlchemyServer().start()
+        self.alchemy = Alchemy(url=self.server.url, max_retries=1)
+        self.history = [
+            {
+                'uniqueId': f'{block}:{index}',
+                'category': 'erc20',
+                'blockNum': hex(block),
+                'hash': hex(block),
+            }
+            for block in range(100)
+            for index in range(block % 3)
+        ]
+        self.failures = []
+        self.server.rpc('alchemy_getAssetTransfers', self.transfers)
+        self.server.rpc('eth_blockNumber', lambda: hex(99))
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'crawl.json')
+
+    def tearDown(self):
+        self.server.stop()
+        self.directory.cleanup()
+
+    def transfers(self, params):
+        if self.failures and self.failures.pop(0):
+            raise ValueError('internal error')
+        start, end = int(params['fromBlock'], 16), int(params['toBlock'], 16)
+        matching = [t for t in self.history if start <= int(t['blockNum'], 16) <= end]
+        offset = int(params.get('pageKey', '0'))
+        count = int(params['maxCount'], 16)
+        page = {'transfers': matching[offset : offset + count]}
+        if offset + count < len(matching):
+            page['pageKey'] = str(offset + count)
+        return page
+
+    def crawl(self):
+        return self.alchemy.core.crawl_asset_transfers(
+            self.path, category=['erc20'], max_count=7, range_size=30
+        )
+
+    def test_interrupted_crawl_resumes_without_duplicates(self):
+        ids = []
+        for stop in (5, 12, 40):
+            for transfer in self.crawl():
+                ids.append(transfer.unique_id)
+                if len(ids) == stop:
+                    break
+        # a failed request leaves the checkpoint of the last page
+        self.failures = [False, False, True]
+        with self.assertRaises(AlchemyError):
+            for transfer in self.crawl():
+                ids.append(transfer.unique_id)
+        crawl = self.crawl()
+        ids += [transfer.unique_id for transfer in crawl]
+        self.assertEqual(ids, [t['uniqueId'] for t in self.history])
+        self.assertTrue(crawl.cursor['done'])
+        self.assertEqual(crawl.cursor['items'], len(self.history))
+        self.assertEqual(crawl.cursor['end_block'], 99)
+        # a finished crawl yields nothing until it is reset
+        self.assertEqual(list(self.crawl()), [])
+        crawl.reset()
+        self.assertEqual(len(list(self.crawl())), len(self.history))
+
+    def test_checkpoint_is_written_atomically(self):
+        transfers = iter(self.crawl())
+        next(transfers)
+        transfers.close()
+        with open(self.path) as file:
+            state = json.load(file)
+        self.assertEqual(state['cursor']['offset'], 1)
+        self.assertEqual(state['cursor']['from_block'], 0)
+        self.assertEqual(state['cursor']['to_block'], 29)
+        self.assertEqual(os.listdir(self.directory.name), ['crawl.json'])
+
+    def test_checkpoint_of_another_crawl(self):
+        next(iter(self.crawl()))
+        crawl = self.alchemy.core.crawl_asset_transfers(self.path, category=['erc721'])
+        with self.assertRaises(AlchemyError):
+            list(crawl)
@@ -0,0 +1,923 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from hexbytes import HexBytes
+from requests.exceptions import ContentDecodingError
+
+from alchemy import Alchemy
+from alchemy.cache import DiskCache, ResponseCache
+from alchemy.codec import CODECS, get_codec, orjson
+from alchemy.config import AlchemyConfig
+from alchemy.dispatch import api_request, post_request, stream_api_request
+from alchemy.exceptions import AlchemyError, CircuitOpenError
+from alchemy.hedging import RequestHedger
+from alchemy.metrics import MetricsRegistry
+from alchemy.provider import AlchemyProvider
+from alchemy.ratelimit import ComputeUnitLimiter
+from alchemy.retry import RetryPolicy
+from alchemy.routing import Endpoint
+from alchemy.streaming import JsonArrayDecoder
+from alchemy.types import AlchemyApiType, Network
+from alchemy.transport import HTTPTransport, HTTP2Transport, brotli, httpx
+from tests.mock_server import MockAlchemyServer, MockHTTP2Server, h2, raw_nft
+
+
+class TestHTTPTransport(unittest.TestCase):
+    def setUp(self):
+        self.server = MockAlchemyServer().start()
+        self.server.rpc('eth_chainId', lambda: '0x1')
+        self.server.rest('getFloorPrice', lambda query: {'openSea': {}})
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_connections_are_reused(self):
+        config = AlchemyConfig('demo', None, url=self.server.url)
+        provider = AlchemyProvider(config)
+        for _ in range(5):
+            self.assertEqual(provider.make_request('eth_chainId', [])['result'], '0x1')
+            api_request(
+                f'{self.server.url}/getFloorPrice', 'getFloorPrice', config=config
+            )
+        self.assertEqual(len(self.server.requests), 10)
+        self.assertEqual(len(self.server.client_ports), 1)
+
+    def test_compressed_responses_are_counted_per_method(self):
+        self.server.compress = True
+        owners = ['0x' + '1' * 40] * 500
+        self.server.rest('getOwnersForContract', lambda query: {'owners': owners})
+        alchemy = Alchemy(url=self.server.url)
+        alchemy.nft.get_owners_for_contract('0x' + '2' * 40)
+        self.assertEqual(
+            list(alchemy.nft.stream_owners_for_contract('0x' + '2' * 40)), owners
+        )
+
+        self.assertEqual(
+            self.server.requests[0]['headers']['Accept-Encoding'],
+            'gzip,deflate,br' if brotli is not None else 'gzip,deflate',
+        )
+        stats = alchemy.config.transport.stats()
+        for method_name in ('getOwnersForContract', 'streamOwnersForContract'):
+            self.assertEqual(stats[method_name]['responses'], 1)
+            self.assertEqual(
+                stats[method_name]['uncompressed_bytes'],
+                len(json.dumps({'owners': owners})),
+            )
+            self.assertGreater(stats[method_name]['compression_ratio'], 10)
+
+    def test_transport_is_shared_between_configs(self):
+        transport = HTTPTransport(pool_maxsize=2)
+        first = AlchemyProvider(
+            AlchemyConfig('demo', None, url=self.server.url, transport=transport)
+        )
+        second = AlchemyProvider(
+            AlchemyConfig('demo', None, url=self.server.url, transport=transport)
+        )
+        first.make_request('eth_chainId', [])
+        second.make_request('eth_chainId', [])
+        self.assertIs(first.config.transport, second.config.transport)
+        self.assertEqual(len(self.server.client_ports), 1)
+
+    def test_requests_without_transport_share_one(self):
+        body = json.dumps({'jsonrpc': '2.0', 'id': 1, 'method': 'eth_chainId'})
+        for _ in range(3):
+            post_request(self.server.url, body.encode(), {})
+        self.assertEqual(self.server.count('eth_chainId'), 3)
+        self.assertEqual(len(self.server.client_ports), 1)
+
+    def test_idle_pools_are_evicted(self):
+        config = AlchemyConfig('demo', None, url=self.server.url, pool_idle_timeout=0)
+        provider = AlchemyProvider(config)
+        provider.make_request('eth_chainId', [])
+        provider.make_request('eth_chainId', [])
+        self.assertEqual(len(self.server.client_ports), 2)
+
+
+class TestSingleFlight(unittest.TestCase):
+    def setUp(self):
+        self.server = MockAlchemyServer().start()
+        self.server.rpc('eth_getBalance', lambda address, block: self.slow('0x10'))
+        self.server.rest('getContractMetadata', lambda query: self.slow(query))
+
+    def tearDown(self):
+        self.server.stop()
+
+    def slow(self, result):
+        time.sleep(0.2)
+        return result
+
+    def test_identical_calls_share_one_request(self):
+        config = AlchemyConfig('demo', None, url=self.server.url)
+        provider = AlchemyProvider(config)
+
+        def rpc(address):
+            return provider.make_request('eth_getBalance', [address, 'latest'])
+
+        def rest(address):
+            return api_request(
+                f'{self.server.url}/getContractMetadata',
+                'getContractMetadata',
+                config=config,
+                params={'contractAddress': address},
+            )
+
+        addresses = ['0x1'] * 8 + ['0x2'] * 2
+        with ThreadPoolExecutor(max_workers=10) as executor:
+            balances = list(executor.map(rpc, addresses))
+            contracts = list(executor.map(rest, addresses))
+
+        self.assertEqual({b['result'] for b in balances}, {'0x10'})
+        self.assertEqual([c['contractAddress'] for c in contracts], addresses)
+        self.assertEqual(self.server.count('eth_getBalance'), 2)
+        self.assertEqual(self.server.count('getContractMetadata'), 2)
+        # callers get their own decoded copy of the response
+        self.assertIsNot(contracts[0], contracts[1])
+
+    def test_disabled(self):
+        config = AlchemyConfig('demo', None, url=self.server.url, single_flight=False)
+        provider = AlchemyProvider(config)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            for _ in range(4):
+                executor.submit(
+                    provider.make_request, 'eth_getBalance', ['0x1', 'latest']
+                )
+        self.assertEqual(self.server.count('eth_getBalance'), 4)
+
+    def test_calls_with_side_effects_or_headers_are_not_shared(self):
+        self.server.rpc('eth_sendRawTransaction', lambda tx: self.slow('0x1'))
+        self.server.rpc('eth_getFilterChanges', lambda filter_id: self.slow([]))
+        provider = AlchemyProvider(AlchemyConfig('demo', None, url=self.server.url))
+        calls = [
+            ('eth_sendRawTransaction', ['0xaa'], None),
+            ('eth_getFilterChanges', ['0x1'], None),
+            ('eth_getBalance', ['0x1', 'latest'], {'X-Tenant': 'a'}),
+        ]
+        with ThreadPoolExecutor(max_workers=12) as executor:
+            for method, params, headers in calls * 4:
+                executor.submit(provider.make_request, method, params, None, headers)
+        for method, _, _ in calls:
+            self.assertEqual(self.server.count(method), 4)
+        self.assertEqual(provider.config.single_flight.shared, 0)
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.server = MockAlchemyServer().start()
+        self.server.rpc('eth_chainId', lambda: '0x1')
+        self.server.rpc('eth_blockNumber', lambda: hex(1000))
+        self.server.rpc('eth_getBalance', lambda address, block: '0x10')
+        self.server.rpc(
+            'eth_getBlockByHash', lambda block_hash, full: {'hash': block_hash}
+        )
+        self.server.rpc('eth_getTransactionByHash', self.transaction)
+        self.server.rest('getContractMetadata', lambda query: query)
+        self.cache = ResponseCache(latest_ttl=0)
+        self.config = AlchemyConfig('demo', None, url=self.server.url, cache=self.cache)
+        self.provider = AlchemyProvider(self.config)
+
+    def tearDown(self):
+        self.server.stop()
+
+    @staticmethod
+    def transaction(tx_hash):
+        block_number = {'0xa': hex(990), '0xb': hex(900)}.get(tx_hash)
+        return {'hash': tx_hash, 'blockNumber': block_number}
+
+    def call(self, method, *params):
+        return self.provider.make_request(method, list(params))['result']
+
+    def test_immutable_calls_are_cached(self):
+        block_hash = '0x' + 'ab' * 32
+        for _ in range(3):
+            self.assertEqual(self.call('eth_chainId'), '0x1')
+            self.assertEqual(
+                self.call('eth_getBlockByHash', block_hash, False)['hash'],
+                block_hash,
+            )
+        self.assertEqual(self.server.count('eth_chainId'), 1)
+        self.assertEqual(self.server.count('eth_getBlockByHash'), 1)
+        self.assertEqual(self.cache.stats()['hits'], 4)
+        self.assertEqual(self.cache.stats()['misses'], 2)
+
+    def test_latest_calls_bypass_the_cache(self):
+        for _ in range(3):
+            self.call('eth_getBalance', '0x1', 'latest')
+        self.assertEqual(self.server.count('eth_getBalance'), 3)
+        self.assertEqual(self.cache.stats()['misses'], 0)
+
+    def test_finalized_blocks_are_cached(self):
+        self.call('eth_blockNumber')
+        for _ in range(2):
+            self.call('eth_getBalance', '0x1', hex(900))
+            self.call('eth_getBalance', '0x1', hex(990))
+        # block 990 is less than `finality_depth` blocks behind the head
+        self.assertEqual(self.server.count('eth_getBalance'), 3)
+
+    def test_transactions_are_cached_once_final(self):
+        self.call('eth_blockNumber')
+        for tx_hash in ['0xa', '0xb', '0xc'] * 2:
+            self.call('eth_getTransactionByHash', tx_hash)
+        self.assertEqual(self.server.count('eth_getTransactionByHash'), 5)
+
+    def test_head_is_resolved_for_receipts_by_hash(self):
+        self.server.rpc(
+            'eth_getTransactionReceipt',
+            lambda tx_hash: {'transactionHash': tx_hash, 'blockNumber': hex(900)},
+        )
+        # a fresh process, which has not seen the head yet
+        for _ in range(3):
+            self.call('eth_getTransactionReceipt', '0xa')
+        self.assertEqual(self.server.count('eth_getTransactionReceipt'), 1)
+        self.assertEqual(self.server.count('eth_blockNumber'), 1)
+        self.assertEqual(self.cache.head, 1000)
+
+    def test_rest_calls_are_cached(self):
+        def contract_metadata(**params):
+            return api_request(
+                f'{self.server.url}/getContractMetadata',
+                'getContractMetadata',
+                config=self.config,
+                params=params,
+            )
+
+        first = contract_metadata(contractAddress='0x1')
+        second = contract_metadata(contractAddress='0x1')
+        contract_metadata(contractAddress='0x1', refreshCache=True)
+        self.assertEqual(first, second)
+        self.assertIsNot(first, second)
+        self.assertEqual(self.server.count('getContractMetadata'), 2)
+
+    def test_least_recently_used_entries_are_evicted(self):
+        self.cache.store.max_entries = 2
+        for block_hash in ['0x' + str(i) * 64 for i in (1, 2, 1, 3, 1, 2)]:
+            self.call('eth_getBlockByHash', block_hash, False)
+        self.assertEqual(self.server.count('eth_getBlockByHash'), 4)
+
+
+class TestDiskCache(unittest.TestCase):
+    def setUp(self):
+        self.server = MockAlchemyServer().start()
+        self.server.rpc(
+            'alchemy_getTransactionReceipts',
+            lambda block: {'receipts': [{'blockHash': block['blockHash']}]},
+        )
+        self.server.rpc('eth_getBalance', lambda address, block: '0x10')
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'cache.sqlite')
+
+    def tearDown(self):
+        self.server.stop()
+        self.directory.cleanup()
+
+    def provider(self, disk):
+        cache = ResponseCache(disk=disk)
+        config = AlchemyConfig('demo', None, url=self.server.url, cache=cache)
+        return AlchemyProvider(config)
+
+    def test_responses_survive_restarts(self):
+        params = [{'blockHash': '0x' + 'ab' * 32}]
+        first = self.provider(DiskCache(self.path))
+        first.make_request('alchemy_getTransactionReceipts', params)
+        first.make_request('eth_getBalance', ['0x1', 'latest'])
+
+        second = self.provider(DiskCache(self.path))
+        response = second.make_request('alchemy_getTransactionReceipts', params)
+        second.make_request('eth_getBalance', ['0x1', 'latest'])
+
+        self.assertEqual(
+            response['result']['receipts'][0]['blockHash'], params[0]['blockHash']
+        )
+        self.assertEqual(self.server.count('alchemy_getTransactionReceipts'), 1)
+        self.assertEqual(self.server.count('eth_getBalance'), 2)
+        self.assertEqual(second.config.cache.stats()['disk_hits'], 1)
+
+    def test_size_is_bounded(self):
+        disk = DiskCache(self.path, max_bytes=1000)
+        for i in range(20):
+            disk.set(('key', i), b'x' * 100, float('inf'))
+        disk.evict()
+        self.assertIsNone(disk.get(('key', 0)))
+        self.assertEqual(disk.get(('key', 19)), b'x' * 100)
+        stored = sum(disk.get(('key', i)) is not None for i in range(20))
+        self.assertLessEqual(stored, 9)
+
+    def test_expired_entries_are_ignored(self):
+        disk = DiskCache(self.path)
+        disk.set('key', b'value', 0.01)
+        time.sleep(0.02)
+        self.assertIsNone(disk.get('key'))
+
+    def test_shared_between_threads(self):
+        disk = DiskCache(self.path)
+
+        def write(i):
+            disk.set(('key', i), str(i).encode(), float('inf'))
+            return DiskCache(self.path).get(('key', i))
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            values = list(executor.map(write, range(32)))
+        self.assertEqual(values, [str(i).encode() for i in range(32)])
+
+
+class TestComputeUnitLimiter(unittest.TestCase):
+    def setUp(self):
+        self.server = MockAlchemyServer().start()
+        self.server.rpc('eth_call', lambda tx, block: '0x')
+        self.server.rpc('eth_chainId', lambda: '0x1')
+        self.server.rest('getNFTsForOwner', lambda query: {'ownedNfts': []})
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_requests_are_delayed(self):
+        limiter = ComputeUnitLimiter(260, burst=52)
+        provider = AlchemyProvider(
+            AlchemyConfig('demo', None, url=self.server.url, rate_limit=limiter)
+        )
+        start = time.monotonic()
+        for _ in range(4):
+            provider.make_request('eth_call', [{}, 'latest'])
+        # 2 calls fit in the burst, the others wait 26 / 260 s each
+        self.assertGreaterEqual(time.monotonic() - start, 0.18)
+        self.assertEqual(limiter.delayed, 2)
+        self.assertEqual(self.server.count('eth_call'), 4)
+
+    def test_methods_are_weighted(self):
+        limiter = ComputeUnitLimiter(1000)
+        self.assertEqual(limiter.cost(['eth_chainId']), 0)
+        self.assertEqual(limiter.cost(['eth_call', 'eth_call']), 52)
+        self.assertEqual(limiter.cost(['unknownMethod']), 26)
+
+        config = AlchemyConfig('demo', None, url=self.server.url, rate_limit=limiter)
+        api_request(f'{self.server.url}/getNFTsForOwner', 'getNFTsForOwner', config)
+        self.assertEqual(limiter.reserve(520), 0.0)
+        self.assertAlmostEqual(limiter.reserve(1), 0.001, delta=0.001)
+
+    def test_limiter_is_shared_between_clients(self):
+        limiter = ComputeUnitLimiter(100, costs={'eth_chainId': 50})
+        providers = [
+            AlchemyProvider(
+                AlchemyConfig('demo', None, url=self.server.url, rate_limit=limiter)
+            )
+            for _ in range(2)
+        ]
+        for provider in providers:
+            provider.make_request('eth_chainId', [])
+        self.assertEqual(limiter.delayed, 0)
+        providers[0].make_request('eth_chainId', [])
+        self.assertEqual(limiter.delayed, 1)
+
+
+class TestRetryPolicy(unittest.TestCase):
+    def setUp(self):
+        self.server = MockAlchemyServer().start()
+        self.statuses = []
+        self.server.rest('getFloorPrice', self.floor_price)
+        self.server.rest('getNFTSales', lambda query: (400, {'error': 'bad'}))
+
+    def tearDown(self):
+        self.server.stop()
+
+    def floor_price(self, query):
+        if self.statuses:
+            return self.statuses.pop(0)
+        return {'openSea': {}}
+
+    def request(self, method='getFloorPrice', **policy):
+        policy.setdefault('backoff_multiplier', 0.001)
+        config = AlchemyConfig(
+            'demo', None, url=self.server.url, retry_policy=RetryPolicy(**policy)
+        )
+        return api_request(f'{self.server.url}/{method}', method, config)
+
+    def test_retryable_errors_are_retried(self):
+        self.statuses = [(503, {}), (429, {}, {'Retry-After': '0.2'})]
+        start = time.monotonic()
+        self.assertEqual(self.request(), {'openSea': {}})
+        self.assertGreaterEqual(time.monotonic() - start, 0.2)
+        self.assertEqual(self.server.count('getFloorPrice'), 3)
+
+    def test_fatal_errors_are_not_retried(self):
+        with self.assertRaises(AlchemyError):
+            self.request('getNFTSales')
+        self.assertEqual(self.server.count('getNFTSales'), 1)
+
+    def test_retry_budget(self):
+        self.statuses = [(429, {}, {'Retry-After': '10'})]
+        start = time.monotonic()
+        with self.assertRaises(AlchemyError):
+            self.request(retry_budget=1)
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual(self.server.count('getFloorPrice'), 1)
+
+    def test_connection_errors_are_retried(self):
+        self.server.stop()
+        policy = RetryPolicy(max_attempts=3, backoff_multiplier=0.001)
+        provider = AlchemyProvider(
+            AlchemyConfig('demo', None, url=self.server.url, retry_policy=policy)
+        )
+        with self.assertRaises(AlchemyError):
+            provider.make_request('eth_chainId', [])
+        self.assertEqual(policy.breaker(self.server.url).failures, 3)
+
+    def test_circuit_breaker(self):
+        self.statuses = [(500, {})] * 3
+        policy = dict(max_attempts=1, failure_threshold=2, reset_timeout=0.2)
+        config = AlchemyConfig(
+            'demo', None, url=self.server.url, retry_policy=RetryPolicy(**policy)
+        )
+
+        def request():
+            url = f'{self.server.url}/getFloorPrice'
+            return api_request(url, 'getFloorPrice', config)
+
+        for _ in range(2):
+            self.assertRaises(AlchemyError, request)
+        self.assertRaises(CircuitOpenError, request)
+        self.assertEqual(self.server.count('getFloorPrice'), 2)
+
+        time.sleep(0.2)
+        # the probe fails and opens the circuit again
+        self.assertRaises(AlchemyError, request)
+        self.assertRaises(CircuitOpenError, request)
+        time.sleep(0.2)
+        self.assertEqual(request(), {'openSea': {}})
+        self.assertEqual(request(), {'openSea': {}})
+
+    def test_probe_raising_an_unretried_error(self):
+        policy = RetryPolicy(max_attempts=1, failure_threshold=1, reset_timeout=0.1)
+        response = requests.Response()
+        response.status_code = 200
+
+        def send(error=None):
+            if error is not None:
+                raise error
+            return response
+
+        endpoint = self.server.url
+        with self.assertRaises(requests.ConnectionError):
+            policy.call(endpoint, lambda: send(requests.ConnectionError()))
+        time.sleep(0.1)
+        with self.assertRaises(ContentDecodingError):
+            policy.call(endpoint, lambda: send(ContentDecodingError()))
+        self.assertRaises(CircuitOpenError, policy.call, endpoint, send)
+        time.sleep(0.1)
+        self.assertIs(policy.call(endpoint, send), response)
+
+    def test_backoff_options_are_rejected(self):
+        config = AlchemyConfig('demo', None, url=self.server.url)
+        url = f'{self.server.url}/getFloorPrice'
+        with self.assertRaises(AlchemyError):
+            api_request(url, 'getFloorPrice', config, backoff_multiplier=2)
+        with self.assertRaises(AlchemyError):
+            post_request(self.server.url, b'{}', {}, jitter=lambda value: value)
+        self.assertEqual(self.server.http_requests, 0)
+
+
+class TestRequestHedger(unittest.TestCase):
+    def setUp(self):
+        self.server = MockAlchemyServer().start()
+        self.slow = []
+        self.server.rpc('eth_call', lambda tx, block: self.respond('0x'))
+        self.server.rpc('eth_sendRawTransaction', lambda tx: self.respond('0x1'))
+        self.server.rest('getNFTsForOwner', lambda query: self.respond({}))
+        self.hedger = RequestHedger(min_samples=5)
+        self.config = AlchemyConfig(
+            'demo', None, url=self.server.url, hedging=self.hedger
+        )
+        self.provider = AlchemyProvider(self.config)
+
+    def tearDown(self):
+        self.server.stop()
+
+    def respond(self, result):
+        if self.slow and self.slow.pop():
+            time.sleep(1)
+        return result
+
+    def test_slow_calls_are_hedged(self):
+        for _ in range(5):
+            self.provider.make_request('eth_call', [{}, 'latest'])
+        self.assertIsNotNone(self.hedger.delay('eth_call'))
+
+        self.slow = [False, True]
+        start = time.monotonic()
+        self.provider.make_request('eth_call', [{}, 'latest'])
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertEqual(self.server.count('eth_call'), 7)
+        self.assertEqual(self.hedger.stats()['hedges'], 1)
+        self.assertEqual(self.hedger.stats()['wins'], 1)
+
+    def test_rest_calls_are_hedged(self):
+        url = f'{self.server.url}/getNFTsForOwner'
+        for _ in range(5):
+            api_request(url, 'getNFTsForOwner', self.config, params={'owner': '0x1'})
+        self.slow = [False, True]
+        api_request(url, 'getNFTsForOwner', self.config, params={'owner': '0x1'})
+        self.assertEqual(self.server.count('getNFTsForOwner'), 7)
+        self.assertEqual(self.hedger.wins, 1)
+
+    def test_writes_are_not_hedged(self):
+        for _ in range(5):
+            self.provider.make_request('eth_sendRawTransaction', ['0x'])
+        self.slow = [True]
+        self.provider.make_request('eth_sendRawTransaction', ['0x'])
+        self.assertEqual(self.server.count('eth_sendRawTransaction'), 6)
+        self.assertEqual(self.hedger.hedges, 0)
+
+
+class TestEndpointRouter(unittest.TestCase):
+    def setUp(self):
+        self.servers = [MockAlchemyServer().start() for _ in range(2)]
+        for server in self.servers:
+            server.rpc('eth_chainId', lambda: '0x1')
+            server.rest('getFloorPrice', lambda query: {'openSea': {}})
+            server.rest('getNFTSales', lambda query: (400, {'error': 'bad'}))
+
+    def tearDown(self):
+        for server in self.servers:
+            server.stop()
+
+    def config(self, *endpoints):
+        policy = RetryPolicy(max_attempts=1)
+        return AlchemyConfig('demo', None, retry_policy=policy, endpoints=endpoints)
+
+    def test_requests_follow_weights(self):
+        config = self.config(
+            Endpoint(url=self.servers[0].url, weight=4),
+            Endpoint(url=self.servers[1].url, weight=1),
+        )
+        provider = AlchemyProvider(config)
+        for _ in range(100):
+            provider.make_request('eth_chainId', [])
+        first, second = (s.count('eth_chainId') for s in self.servers)
+        self.assertEqual(first + second, 100)
+        self.assertGreater(first, second)
+
+    def test_failover(self):
+        self.servers[0].stop()
+        config = self.config(
+            Endpoint(url=self.servers[0].url, weight=100),
+            Endpoint(url=self.servers[1].url, weight=1),
+        )
+        provider = AlchemyProvider(config)
+        nft_url = config.get_request_url(AlchemyApiType.NFT)
+        for _ in range(5):
+            self.assertEqual(provider.make_request('eth_chainId', [])['result'], '0x1')
+            api_request(f'{nft_url}/getFloorPrice', 'getFloorPrice', config)
+        self.assertEqual(self.servers[1].count('eth_chainId'), 5)
+        self.assertEqual(self.servers[1].count('getFloorPrice'), 5)
+        # the dead endpoint is drained after the first failures
+        self.assertLess(config.router.failovers, 10)
+        self.assertTrue(config.router.stats()[0]['drained'])
+
+    def test_failover_is_not_retried_first(self):
+        self.servers[0].rest('getFloorPrice', lambda query: (503, {'error': 'down'}))
+        config = AlchemyConfig(
+            'demo',
+            None,
+            retry_policy=RetryPolicy(max_attempts=5, backoff_multiplier=10),
+            endpoints=[
+                Endpoint(url=self.servers[0].url, weight=1),
+                Endpoint(url=self.servers[1].url, weight=1e-9),
+            ],
+        )
+        nft_url = config.get_request_url(AlchemyApiType.NFT)
+        start = time.monotonic()
+        api_request(f'{nft_url}/getFloorPrice', 'getFloorPrice', config)
+        self.assertLess(time.monotonic() - start, 5)
+        self.assertEqual(self.servers[0].count('getFloorPrice'), 1)
+        self.assertEqual(self.servers[1].count('getFloorPrice'), 1)
+
+    def test_last_endpoint_is_retried(self):
+        for server in self.servers:
+            server.rest('getFloorPrice', lambda query: (503, {'error': 'down'}))
+        config = AlchemyConfig(
+            'demo',
+            None,
+            retry_policy=RetryPolicy(max_attempts=3, backoff_multiplier=0.01),
+            endpoints=[
+                Endpoint(url=self.servers[0].url, weight=1),
+                Endpoint(url=self.servers[1].url, weight=1e-9),
+            ],
+        )
+        nft_url = config.get_request_url(AlchemyApiType.NFT)
+        with self.assertRaises(AlchemyError):
+            api_request(f'{nft_url}/getFloorPrice', 'getFloorPrice', config)
+        self.assertEqual(self.servers[0].count('getFloorPrice'), 1)
+        self.assertEqual(self.servers[1].count('getFloorPrice'), 3)
+
+    def test_client_errors_do_not_fail_over(self):
+        config = self.config(
+            Endpoint(url=self.servers[0].url, weight=1),
+            Endpoint(url=self.servers[1].url, weight=1e-9),
+        )
+        with self.assertRaises(AlchemyError):
+            api_request(f'{self.servers[0].url}/getNFTSales', 'getNFTSales', config)
+        self.assertEqual(self.servers[0].count('getNFTSales'), 1)
+        self.assertEqual(self.servers[1].count('getNFTSales'), 0)
+
+    def test_endpoints_serving_some_apis(self):
+        config = self.config(
+            Endpoint(url=self.servers[0].url, apis=[AlchemyApiType.BASE]),
+            Endpoint('key', Network.ETH_GOERLI),
+        )
+        self.assertEqual(
+            config.get_request_url(AlchemyApiType.BASE), self.servers[0].url
+        )
+        self.assertEqual(
+            config.get_request_url(AlchemyApiType.NFT),
+            'https://eth-goerli.g.alchemy.com/nft/v3/key',
+        )
+
+
+class TestStreaming(unittest.TestCase):
+    def setUp(self):
+        self.server = MockAlchemyServer().start()
+        self.alchemy = Alchemy(url=self.server.url, max_retries=1)
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_decoder_handles_any_chunking(self):
+        document = {
+            'result': {
+                'receipts': [{'n': i, 's': 'a"\\]},[{' * i} for i in range(20)],
+                'more': [1, {'x': None}],
+            },
+            'id': 1,
+        }
+        data = json.dumps(document).encode()
+        for size in (1, 3, 7, 64, len(data)):
+            decoder = JsonArrayDecoder(('result', 'receipts'))
+            items = []
+            for start in range(0, len(data), size):
+                items += decoder.feed(data[start : start + size])
+            self.assertEqual(items, document['result']['receipts'])
+            rest = decoder.close()
+            self.assertEqual(rest['result'], {'receipts': [], 'more': [1, {'x': None}]})
+
+    def test_incomplete_document(self):
+        decoder = JsonArrayDecoder(('nfts',))
+        decoder.feed(b'{"nfts": [{"id": 1}, ')
+        with self.assertRaises(AlchemyError):
+            decoder.close()
+
+    def test_stream_transaction_receipts(self):
+        receipts = [{'transactionHash': hex(i)} for i in range(50)]
+        self.server.rpc(
+            'alchemy_getTransactionReceipts', lambda p: {'receipts': receipts}
+        )
+        stream = self.alchemy.core.stream_transaction_receipts(block_number=1)
+        self.assertEqual(list(stream), receipts)
+
+    def test_stream_error(self):
+        stream = self.alchemy.core.stream_transaction_receipts(block_number=1)
+        with self.assertRaises(AlchemyError):
+            list(stream)
+
+    def test_stream_nfts_for_contract_follows_pages(self):
+        address = '0x' + '1' * 40
+
+        def nfts(query):
+            start = int(query.get('startToken', 0))
+            page = {'nfts': [raw_nft(address, i) for i in range(start, start + 3)]}
+            if start < 6:
+                page['pageKey'] = str(start + 3)
+            return page
+
+        self.server.rest('getNFTsForContract', nfts)
+        tokens = [
+            nft.token_id for nft in self.alchemy.nft.stream_nfts_for_contract(address)
+        ]
+        self.assertEqual(tokens, [str(i) for i in range(9)])
+        self.assertEqual(self.server.count('getNFTsForContract'), 3)
+
+    def test_stream_owners_for_contract(self):
+        owners = ['0x' + str(i) * 40 for i in range(3)]
+        self.server.rest('getOwnersForContract', lambda query: {'owners': owners})
+        stream = self.alchemy.nft.stream_owners_for_contract('0x' + '1' * 40)
+        self.assertEqual(list(stream), owners)
+
+
+class TestJsonCodec(unittest.TestCase):
+    def setUp(self):
+        self.server = MockAlchemyServer().start()
+        self.server.rpc('eth_getBalance', lambda address, block: hex(2**70))
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_codecs_agree(self):
+        document = {'a': [1, -2.5, None, True, 'é"\\'], 'b': {'c': 2**63 - 1}}
+        for name in CODECS:
+            codec = get_codec(name)
+            self.assertEqual(codec.loads(codec.dumps(document)), document)
+            self.assertEqual(json.loads(codec.dumps([2**70])), [2**70])
+        self.assertEqual(
+            get_codec('orjson').dumps([HexBytes('0x01')]),
+            get_codec('json').dumps([HexBytes('0x01')]).replace(b' ', b''),
+        )
+
+    def test_wide_integers(self):
+        numbers = [2**64, -(2**63) - 1, 2**63 - 1]
+        data = json.dumps(numbers).encode()
+        self.assertEqual(get_codec('json').loads(data), numbers)
+        if orjson is not None:
+            # documented: orjson decodes them as floats, losing precision
+            decoded = get_codec('orjson').loads(data)
+            self.assertEqual([type(value) for value in decoded], [float, float, int])
+
+    def test_unknown_codec(self):
+        with self.assertRaises(AlchemyError):
+            get_codec('yaml')
+
+    def test_provider_uses_config_codec(self):
+        for name in CODECS:
+            config = AlchemyConfig('demo', None, url=self.server.url, codec=name)
+            self.assertEqual(config.codec.name, name)
+            response = AlchemyProvider(config).make_request(
+                'eth_getBalance', ['0x' + '1' * 40, 'latest']
+            )
+            self.assertEqual(response['result'], hex(2**70))
+
+
+@unittest.skipIf(httpx is None or h2 is None, 'httpx[http2] is not installed')
+class TestHTTP2Transport(unittest.TestCase):
+    def setUp(self):
+        self.server = MockHTTP2Server().start()
+        self.server.rpc('eth_getBalance', lambda address, block: hex(len(address)))
+        self.server.delay = 0.05
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_concurrent_requests_share_a_connection(self):
+        transport = HTTP2Transport(
+            max_connections=1, max_concurrent_streams=20, prior_knowledge=True
+        )
+        config = AlchemyConfig(
+            'demo', None, url=self.server.url, transport=transport, single_flight=False
+        )
+        provider = AlchemyProvider(config)
+        with ThreadPoolExecutor(max_workers=20) as executor:
+            start = time.monotonic()
+            responses = list(
+                executor.map(
+                    lambda i: provider.make_request(
+                        'eth_getBalance', [hex(i), 'latest']
+                    ),
+                    range(40),
+                )
+            )
+            elapsed = time.monotonic() - start
+        self.assertEqual(
+            [response['result'] for response in responses],
+            [hex(len(hex(i))) for i in range(40)],
+        )
+        self.assertEqual(len(self.server.client_ports), 1)
+        # 40 requests of 50ms, 20 at a time
+        self.assertLess(elapsed, 0.5)
+        self.assertEqual(sum(s['responses'] for s in transport.stats().values()), 40)
+        transport.close()
+
+    def test_streamed_responses(self):
+        self.server.rpc(
+            'alchemy_getTransactionReceipts',
+            lambda params: {'receipts': [{'n': i} for i in range(2000)]},
+        )
+        alchemy = Alchemy(
+            url=self.server.url,
+            transport=HTTP2Transport(max_concurrent_streams=1, prior_knowledge=True),
+        )
+        for _ in range(2):
+            receipts = list(alchemy.core.stream_transaction_receipts(block_number=1))
+            self.assertEqual(len(receipts), 2000)
+
+    def test_decoding_errors_are_translated(self):
+        transport = HTTP2Transport()
+        transport.run(transport.client.aclose())
+        transport.client = httpx.AsyncClient(
+            transport=httpx.MockTransport(
+                lambda request: httpx.Response(
+                    200, headers={'Content-Encoding': 'gzip'}, content=b'not gzip'
+                )
+            )
+        )
+        try:
+            for stream in (False, True):
+                with self.assertRaises(ContentDecodingError):
+                    response = transport.post(self.server.url, stream=stream)
+                    list(response.iter_content(1024))
+        finally:
+            transport.close()
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    def setUp(self):
+        self.server = MockAlchemyServer().start()
+        self.statuses = []
+        self.server.rpc('eth_chainId', lambda: '0x1')
+        self.server.rest('getFloorPrice', self.floor_price)
+        self.server.rest('getNFTSales', lambda query: (400, {'error': 'bad'}))
+        self.measurements = []
+        self.config = AlchemyConfig(
+            'demo',
+            None,
+            url=self.server.url,
+            retry_policy=RetryPolicy(backoff_multiplier=0.001),
+            metrics=MetricsRegistry(exporters=[self.measurements.append]),
+        )
+
+    def tearDown(self):
+        self.server.stop()
+
+    def floor_price(self, query):
+        if self.statuses:
+            return self.statuses.pop(0)
+        return {'openSea': {}}
+
+    def test_requests_are_recorded_per_method(self):
+        provider = AlchemyProvider(self.config)
+        for _ in range(3):
+            provider.make_request('eth_chainId', [], method_name='getChainId')
+        self.statuses = [(503, {})]
+        api_request(f'{self.server.url}/getFloorPrice', 'getFloorPrice', self.config)
+
+        snapshot = self.config.metrics.snapshot()
+        chain_id = snapshot['getChainId']
+        self.assertEqual(chain_id['requests'], 3)
+        self.assertEqual(chain_id['in_flight'], 0)
+        self.assertEqual(chain_id['latency']['count'], 3)
+        self.assertEqual(chain_id['latency']['buckets']['+Inf'], 3)
+        self.assertEqual(chain_id['response_bytes']['count'], 3)
+        self.assertGreater(chain_id['request_bytes']['sum'], 0)
+        floor_price = snapshot['getFloorPrice']
+        self.assertEqual(floor_price['retries'], 1)
+        self.assertEqual(floor_price['response_bytes']['count'], 2)
+        self.assertEqual(
+            [m.name for m in self.measurements], ['getChainId'] * 3 + ['getFloorPrice']
+        )
+
+    def test_errors_are_classified(self):
+        provider = AlchemyProvider(self.config)
+        with self.assertRaises(AlchemyError):
+            api_request(f'{self.server.url}/getNFTSales', 'getNFTSales', self.config)
+        with self.assertRaises(AlchemyError):
+            provider.make_request('eth_unknown', [])
+        snapshot = self.config.metrics.snapshot()
+        self.assertEqual(snapshot['getNFTSales']['errors'], {'http_400': 1})
+        self.assertEqual(snapshot['eth_unknown']['errors'], {'rpc_-32601': 1})
+        self.assertEqual(self.measurements[-1].error, 'rpc_-32601')
+
+    def test_streamed_requests_are_recorded(self):
+        self.server.rpc(
+            'alchemy_getTransactionReceipts',
+            lambda params: {'receipts': [{'n': i} for i in range(10)]},
+        )
+        self.server.rest('getOwnersForContract', lambda query: {'owners': ['0x1']})
+        provider = AlchemyProvider(self.config)
+        receipts = provider.stream_request(
+            'alchemy_getTransactionReceipts',
+            [{'blockNumber': '0x1'}],
+            ('result', 'receipts'),
+            method_name='streamTransactionReceipts',
+        )
+        self.assertEqual(len(list(receipts)), 10)
+        owners = stream_api_request(
+            f'{self.server.url}/getOwnersForContract',
+            'streamOwnersForContract',
+            self.config,
+            ('owners',),
+        )
+        self.assertEqual(list(owners), ['0x1'])
+
+        snapshot = self.config.metrics.snapshot()
+        for name in ('streamTransactionReceipts', 'streamOwnersForContract'):
+            self.assertEqual(snapshot[name]['requests'], 1)
+            self.assertEqual(snapshot[name]['request_bytes']['count'], 1)
+            # the size of a streamed body is not known
+            self.assertEqual(snapshot[name]['response_bytes']['count'], 0)
+
+    def test_in_flight_gauge(self):
+        self.server.rest('getFloorPrice', lambda query: time.sleep(0.3) or {})
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            for index in range(3):
+                executor.submit(
+                    api_request,
+                    f'{self.server.url}/getFloorPrice',
+                    'getFloorPrice',
+                    self.config,
+                    params={'n': index},
+                )
+            time.sleep(0.15)
+            in_flight = self.config.metrics.snapshot()['getFloorPrice']['in_flight']
+        self.assertEqual(in_flight, 3)
+        self.assertEqual(
+            self.config.metrics.snapshot()['getFloorPrice']['in_flight'], 0
+        )
@@ -1,4 +1,6 @@
 import os
+import tempfile
+import time
 import unittest
 
 from eth_utils import to_checksum_address
@@ -12,6 +14,7 @@ from alchemy.nft.types import (
     TransfersForOwnerTransferType,
     NftOrdering,
 )
+from tests.mock_server import MockAlchemyServer, raw_nft, raw_transfer
 
 
 class TestAlchemyNFT(unittest.TestCase):
@@ -485,3 +488,162 @@ class TestAlchemyNFT(unittest.TestCase):
             contract_address, page_size=10
         )
         self.assertEqual(len(with_limit['nfts']), 10)
+
+
+class TestAlchemyNFTIterators(unittest.TestCase):
+    def setUp(self):
+        self.server = MockAlchemyServer().start()
+        self.alchemy = Alchemy(url=self.server.url, max_retries=1)
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'crawl.json')
+
+    def tearDown(self):
+        self.server.stop()
+        self.directory.cleanup()
+
+    def test_iter_nfts_for_contract(self):
+        address = '0x' + '1' * 40
+        limits = []
+
+        def nfts(query):
+            start = int(query.get('startToken', 0))
+            limit = int(query['limit'])
+            limits.append(limit)
+            page = {'nfts': [raw_nft(address, i) for i in range(start, start + limit)]}
+            if start + limit < 500:
+                page['pageKey'] = str(start + limit)
+            return page
+
+        self.server.rest('getNFTsForContract', nfts)
+        nfts = self.alchemy.nft.iter_nfts_for_contract(address, page_size=1000)
+        self.assertEqual(len(list(nfts)), 500)
+        self.assertEqual(set(limits), {100})
+
+        limits.clear()
+        nfts = self.alchemy.nft.iter_nfts_for_contract(address, limit=30)
+        self.assertEqual([nft.token_id for nft in nfts], [str(i) for i in range(30)])
+        self.assertEqual(limits, [30])
+
+    def test_iter_owners_for_contract_stops_with_the_consumer(self):
+        def owners(query):
+            start = int(query.get('pageKey') or 0)
+            return {'owners': [hex(start)], 'pageKey': str(start + 1)}
+
+        self.server.rest('getOwnersForContract', owners)
+        owners = self.alchemy.nft.iter_owners_for_contract('0x' + '1' * 40)
+        self.assertEqual([next(owners) for _ in range(3)], ['0x0', '0x1', '0x2'])
+        owners.close()
+        time.sleep(0.1)
+        self.assertLessEqual(self.server.count('getOwnersForContract'), 5)
+
+    def test_metadata_batches_are_chunked(self):
+        sizes = []
+
+        def metadata(body):
+            sizes.append(len(body['tokens']))
+            time.sleep(0.05)
+            return {
+                'nfts': [
+                    raw_nft(token['contractAddress'], int(token['tokenId']))
+                    for token in body['tokens']
+                ]
+            }
+
+        self.server.rest('getNFTMetadataBatch', metadata)
+        tokens = [
+            {'contract_address': '0x' + '1' * 40, 'token_id': index}
+            for index in range(1050)
+        ]
+        start = time.monotonic()
+        response = self.alchemy.nft.get_nft_metadata_batch(tokens)
+        elapsed = time.monotonic() - start
+        self.assertEqual(
+            [nft.token_id for nft in response['nfts']], [str(i) for i in range(1050)]
+        )
+        self.assertEqual(sorted(sizes), [50] + [100] * 10)
+        # 11 requests, 4 at a time
+        self.assertLess(elapsed, 0.05 * 8)
+
+    def test_transfers_are_pipelined_with_metadata(self):
+        contract = '0x' + 'ab' * 20
+        events = []
+
+        def transfers(params):
+            events.append(('transfers', time.monotonic()))
+            page = int(params.get('pageKey', '0'))
+            # tokens 0-4 are transferred again on every page
+            page_transfers = {
+                'transfers': [
+                    raw_transfer(page, index, contract, token, '0x' + '1' * 40)
+                    for index, token in enumerate([0, 1, 2, 3, 4, 10 + page])
+                ]
+            }
+            if page < 2:
+                page_transfers['pageKey'] = str(page + 1)
+            return page_transfers
+
+        def metadata(body):
+            time.sleep(0.1)
+            events.append(('metadata', time.monotonic()))
+            return {
+                'nfts': [
+                    raw_nft(token['contractAddress'], int(token['tokenId'], 16))
+                    for token in body['tokens']
+                ]
+            }
+
+        self.server.rpc('alchemy_getAssetTransfers', transfers)
+        self.server.rest('getNFTMetadataBatch', metadata)
+        nfts = list(self.alchemy.nft.iter_transfers_for_contract(contract))
+        self.assertEqual(len(nfts), 18)
+        self.assertEqual(
+            [nft.token_id for nft in nfts[6:12]], ['0', '1', '2', '3', '4', '11']
+        )
+        self.assertEqual(nfts[6].block_number, '0x1')
+        # the next page of transfers is requested while metadata is loading
+        self.assertEqual(
+            [name for name, _ in events[:3]], ['transfers'] * 2 + ['metadata']
+        )
+        # metadata of tokens seen on earlier pages is reused
+        tokens = [
+            len(request['body']['tokens'])
+            for request in self.server.requests
+            if request['method'] == 'getNFTMetadataBatch'
+        ]
+        self.assertEqual(tokens, [6, 1, 1])
+
+    def test_crawl_owners_for_contract(self):
+        def owners(query):
+            start = int(query.get('pageKey') or 0)
+            page = {'owners': [hex(start), hex(start + 1)]}
+            if start < 8:
+                page['pageKey'] = str(start + 2)
+            return page
+
+        self.server.rest('getOwnersForContract', owners)
+        crawl = self.alchemy.nft.crawl_owners_for_contract(self.path, '0x' + '1' * 40)
+        seen = []
+        for owner in crawl:
+            seen.append(owner)
+            if len(seen) == 3:
+                break
+        seen += list(crawl)
+        self.assertEqual(seen, [hex(i) for i in range(10)])
+        self.assertEqual(crawl.cursor['pages'], 5)
+
+    def test_refresh_nft_metadata_skips_the_cache(self):
+        address = '0x' + '1' * 40
+        updates = ['2023-01-01T00:00:00Z']
+
+        def metadata(query):
+            if query['refreshCache'] == 'true':
+                updates.append('2023-01-02T00:00:00Z')
+            return {**raw_nft(address, 1), 'timeLastUpdated': updates[-1]}
+
+        self.server.rest('getNFTMetadata', metadata)
+        alchemy = Alchemy(url=self.server.url, max_retries=1, cache=True)
+        alchemy.nft.get_nft_metadata(address, 1)
+        self.assertTrue(alchemy.nft.refresh_nft_metadata(address, 1))
+        # the refreshed metadata is seen, not the response cached before
+        self.assertFalse(alchemy.nft.refresh_nft_metadata(address, 1))
+        self.assertEqual(self.server.count('getNFTMetadata'), 5)
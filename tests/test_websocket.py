@@ -136,3 +136,15 @@ class TestAlchemyWebSocket(unittest.TestCase):
     def tearDown(self):
         self.loop.call_soon_threadsafe(self.loop.stop)
         self.server_thread.join()
+
+
+class TestAlchemyStartup(unittest.TestCase):
+    def test_init_does_not_connect(self):
+        start = time.perf_counter()
+        alchemy = Alchemy(url='ws://127.0.0.1:9')
+        elapsed = time.perf_counter() - start
+
+        self.assertLess(elapsed, 0.5)
+        self.assertIsNone(alchemy.ws_provider.connection)
+        # the event loop and its listener thread are created on connect
+        self.assertIsNone(alchemy.ws_provider.loop)